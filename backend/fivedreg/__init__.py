@@ -1,2 +1,9 @@
-from .data import load_dataset, split_data, standardize_data
-from .model import FiveDNet
+from .data import kfold_indices, load_dataset, prepare_dataset, split_data, split_indices, standardize_data
+
+
+def __getattr__(name):
+    # FiveDNet pulls in TensorFlow, so it is only imported on first use
+    if name == "FiveDNet":
+        from .model import FiveDNet
+        return FiveDNet
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
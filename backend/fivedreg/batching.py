@@ -0,0 +1,177 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+def _bucket(value):
+    """
+    Returns the power-of-two histogram bucket label for a non-negative count.
+    """
+    if value <= 1:
+        return str(value)
+    upper = 1 << (int(value) - 1).bit_length()
+    lower = upper // 2 + 1
+    return str(upper) if lower == upper else f"{lower}-{upper}"
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row prediction requests into batched forward passes.
+
+    Requests are queued and a worker thread collects them until either
+    ``max_batch_size`` rows are waiting or ``max_wait_ms`` has passed since the
+    first row arrived. Rows targeting the same model are stacked and sent to
+    ``predict_fn`` in one call, and every caller receives its own result through
+    a ``concurrent.futures.Future``.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=2.0):
+        """
+        Args:
+            predict_fn (callable): Function ``(model, X) -> np.ndarray`` returning one prediction (or one
+                row of values, delivered as a tuple) per row of X.
+            max_batch_size (int): Maximum number of rows in a single forward pass.
+            max_wait_ms (float): Maximum time to wait for more rows after the first one arrives.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be non-negative.")
+
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.n_requests = 0
+        self.n_batches = 0
+        self.batch_size_histogram = {}
+        self.queue_depth_histogram = {}
+
+    def start(self):
+        """
+        Starts the worker thread if it is not already running.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stops the worker thread after the rows already queued have been served.
+        """
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def submit(self, model, features):
+        """
+        Queues a single feature vector for prediction.
+
+        Args:
+            model: The model the row should be evaluated with.
+            features (array-like): A single feature vector.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the prediction as a float.
+        """
+        self.start()
+        future = Future()
+        self._queue.put((model, np.asarray(features, dtype=np.float64), future))
+        return future
+
+    def stats(self):
+        """
+        Returns counters and histograms describing the batching behaviour so far.
+        """
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "queue_depth": self._queue.qsize(),
+                "n_requests": self.n_requests,
+                "n_batches": self.n_batches,
+                "mean_batch_size": self.n_requests / self.n_batches if self.n_batches else 0.0,
+                "batch_size_histogram": dict(self.batch_size_histogram),
+                "queue_depth_histogram": dict(self.queue_depth_histogram),
+            }
+
+    def reset_stats(self):
+        """
+        Clears all counters and histograms.
+        """
+        with self._lock:
+            self._reset_counters()
+
+    def _collect(self, first):
+        """
+        Collects queued rows until the batch is full or the wait budget is spent.
+        Returns the batch and whether a stop request was seen.
+        """
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch, stopping = self._collect(item)
+
+            with self._lock:
+                self.n_requests += len(batch)
+                self.n_batches += 1
+                size_bucket = _bucket(len(batch))
+                depth_bucket = _bucket(self._queue.qsize())
+                self.batch_size_histogram[size_bucket] = self.batch_size_histogram.get(size_bucket, 0) + 1
+                self.queue_depth_histogram[depth_bucket] = self.queue_depth_histogram.get(depth_bucket, 0) + 1
+
+            self._process(batch)
+            if stopping:
+                return
+
+    def _process(self, batch):
+        # Group rows by target model so each model gets a single forward pass
+        groups = {}
+        for model, row, future in batch:
+            groups.setdefault(id(model), (model, []))[1].append((row, future))
+
+        for model, items in groups.values():
+            futures = [future for _, future in items]
+            try:
+                predictions = self.predict_fn(model, np.stack([row for row, _ in items]))
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for future, prediction in zip(futures, predictions):
+                if not future.done():
+                    # One value per row, or a row of values (e.g. prediction and spread)
+                    if np.ndim(prediction):
+                        future.set_result(tuple(float(value) for value in prediction))
+                    else:
+                        future.set_result(float(prediction))
@@ -0,0 +1,143 @@
+import itertools
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded least-recently-used cache with hit/miss counters.
+
+    Entries can be tied to an owner (e.g. the model that produced them) and are
+    only served to lookups with the same owner, so several models share the cache
+    without invalidating each other. Owners are told apart by a token that is never
+    reused, so a new model allocated where an old one was cannot be served the old
+    one's results; entries of models that are gone age out of the LRU order.
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+        Args:
+            maxsize (int): Maximum number of entries. 0 disables the cache.
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative.")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        # Owner token by owner, held weakly so the cache does not keep models alive
+        self._owners = weakref.WeakKeyDictionary()
+        self._tokens = itertools.count()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def _full_key(self, key, owner):
+        if owner is None:
+            return None, key
+        token = self._owners.get(owner)
+        if token is None:
+            token = self._owners[owner] = next(self._tokens)
+        return token, key
+
+    def get(self, key, owner=None):
+        """
+        Returns the value cached for ``key`` by ``owner``, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            key = self._full_key(key, owner)
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, owner=None):
+        """
+        Stores a value, evicting the least recently used entry if the cache is full.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            key = self._full_key(key, owner)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drops all entries.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """
+        Returns the size and hit/miss counters of the cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class PredictionCache(LRUCache):
+    """
+    LRU cache of single-point predictions keyed on feature vectors quantized to a tolerance.
+    """
+
+    def __init__(self, maxsize=1024, tolerance=1e-6):
+        """
+        Args:
+            maxsize (int): Maximum number of cached predictions. 0 disables the cache.
+            tolerance (float): Feature vectors are rounded to multiples of this value before lookup.
+        """
+        if tolerance <= 0:
+            raise ValueError("tolerance must be positive.")
+        super().__init__(maxsize)
+        self.tolerance = tolerance
+
+    def make_key(self, features):
+        """
+        Quantizes a feature vector into a hashable key.
+        """
+        quantized = np.round(np.asarray(features, dtype=np.float64) / self.tolerance)
+        # Adding 0.0 maps -0.0 to 0.0 so both round to the same key
+        return (quantized + 0.0).tobytes()
+
+    def get_prediction(self, model, features):
+        """
+        Returns the cached prediction of ``model`` for ``features``, or None.
+        """
+        if not self.enabled:
+            return None
+        return self.get(self.make_key(features), owner=model)
+
+    def put_prediction(self, model, features, prediction):
+        """
+        Caches the prediction of ``model`` for ``features``.
+        """
+        if not self.enabled:
+            return
+        self.put(self.make_key(features), prediction, owner=model)
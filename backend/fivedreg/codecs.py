@@ -0,0 +1,148 @@
+import io
+
+import numpy as np
+
+# Media types understood by the binary prediction endpoints
+MEDIA_JSON = "application/json"
+MEDIA_OCTET_STREAM = "application/octet-stream"
+MEDIA_NPY = "application/x-npy"
+MEDIA_ARROW = "application/vnd.apache.arrow.stream"
+
+BINARY_MEDIA_TYPES = (MEDIA_OCTET_STREAM, MEDIA_NPY, MEDIA_ARROW)
+RAW_DTYPES = ("float32", "float64")
+
+
+def parse_media_type(content_type):
+    """
+    Strips parameters (e.g. ``; charset=utf-8``) from a Content-Type or Accept entry.
+    """
+    return (content_type or "").split(";")[0].strip().lower()
+
+
+def _check_raw_dtype(dtype):
+    if dtype not in RAW_DTYPES:
+        raise ValueError(f"dtype must be one of {RAW_DTYPES}, got {dtype!r}")
+    return np.dtype(dtype)
+
+
+def _decode_npy(body):
+    """
+    Decodes a ``.npy`` payload without copying the array data.
+    """
+    stream = io.BytesIO(body)
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+    elif version == (2, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    else:
+        raise ValueError(f"Unsupported .npy format version: {version}")
+
+    if dtype.hasobject:
+        raise ValueError("Object arrays are not supported.")
+
+    count = int(np.prod(shape))
+    if len(body) - stream.tell() < count * dtype.itemsize:
+        raise ValueError("The .npy payload is truncated.")
+    array = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+    return array.reshape(shape, order="F" if fortran_order else "C")
+
+
+def _decode_arrow(body, n_features):
+    """
+    Decodes an Arrow IPC stream with one numeric column per feature.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Arrow IPC payloads require the optional 'pyarrow' package.")
+
+    table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    if table.num_columns != n_features:
+        raise ValueError(f"Expected {n_features} columns, got {table.num_columns}")
+
+    # Each column converts without copying; stacking into rows is the only copy.
+    features = np.empty((table.num_rows, n_features), dtype=np.float64)
+    for i, column in enumerate(table.columns):
+        features[:, i] = column.to_numpy()
+    return features
+
+
+def decode_features(body, content_type, dtype="float32", n_features=5):
+    """
+    Decodes a binary request body into an (N, n_features) feature matrix.
+
+    Args:
+        body (bytes): Raw request body.
+        content_type (str): Media type of the body.
+        dtype (str): Element type of raw ``application/octet-stream`` bodies.
+        n_features (int): Expected number of features per row.
+
+    Returns:
+        np.ndarray: A (possibly read-only) view of the body where the format allows it.
+    """
+    media_type = parse_media_type(content_type)
+
+    if media_type == MEDIA_OCTET_STREAM:
+        raw_dtype = _check_raw_dtype(dtype)
+        if len(body) % (raw_dtype.itemsize * n_features) != 0:
+            raise ValueError(
+                f"Body length {len(body)} is not a multiple of {n_features} {dtype} values."
+            )
+        features = np.frombuffer(body, dtype=raw_dtype).reshape(-1, n_features)
+    elif media_type == MEDIA_NPY:
+        features = _decode_npy(body)
+    elif media_type == MEDIA_ARROW:
+        features = _decode_arrow(body, n_features)
+    else:
+        raise TypeError(f"Unsupported content type: {content_type!r}")
+
+    if features.ndim != 2 or features.shape[1] != n_features:
+        raise ValueError(f"Expected an (N, {n_features}) feature matrix, got shape {features.shape}")
+    if features.dtype.kind not in "fiu":
+        raise ValueError(f"Expected a numeric feature matrix, got dtype {features.dtype}")
+    return features
+
+
+def encode_predictions(predictions, media_type, dtype="float32"):
+    """
+    Encodes a 1D prediction array in the requested binary media type.
+
+    Args:
+        predictions (np.ndarray): Predicted values.
+        media_type (str): One of ``BINARY_MEDIA_TYPES``.
+        dtype (str): Element type of the encoded values.
+
+    Returns:
+        bytes: The encoded response body.
+    """
+    values = np.ascontiguousarray(predictions, dtype=_check_raw_dtype(dtype))
+
+    if media_type == MEDIA_OCTET_STREAM:
+        return values.tobytes()
+    if media_type == MEDIA_NPY:
+        buffer = io.BytesIO()
+        np.save(buffer, values, allow_pickle=False)
+        return buffer.getvalue()
+    if media_type == MEDIA_ARROW:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Arrow IPC responses require the optional 'pyarrow' package.")
+        table = pa.table({"prediction": values})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    raise TypeError(f"Unsupported media type: {media_type!r}")
+
+
+def negotiate_media_type(accept, default):
+    """
+    Picks the first supported binary media type from an Accept header, or the default.
+    """
+    for entry in (accept or "").split(","):
+        media_type = parse_media_type(entry)
+        if media_type in BINARY_MEDIA_TYPES:
+            return media_type
+    return default
@@ -0,0 +1,198 @@
+import os
+import time
+from concurrent.futures import CancelledError, as_completed
+
+import numpy as np
+
+# Files of the dataset shared by all folds of a cross-validation run
+CV_ARRAYS = ("X", "y")
+
+# Metrics reported for every fold and aggregated over the folds
+CV_METRICS = ("mse", "mae", "r2")
+
+
+def prepare_cv(data_path, output_dir, chunk_size=65536):
+    """
+    Loads a dataset once and stores it as float32 arrays for all folds to memory-map.
+
+    The rows are converted and written ``chunk_size`` at a time, skipping rows with
+    missing values, so no float32 copy of the whole dataset is held in memory.
+
+    Args:
+        data_path (str): Path of the dataset file, readable by ``load_dataset``.
+        output_dir (str): Existing directory to write the arrays to.
+        chunk_size (int): Rows converted and written at a time.
+
+    Returns:
+        int: Number of rows in the stored arrays.
+    """
+    from .data import _missing_mask, load_dataset
+
+    X, y = load_dataset(data_path, drop_missing=False)
+    missing = _missing_mask(X, y, chunk_size)
+    n_dropped = int(missing.sum()) if missing is not None else 0
+    if n_dropped:
+        print(f"Warning: Found {n_dropped} rows with missing values. Dropping them.")
+
+    n_rows = X.shape[0] - n_dropped
+    X_out, y_out = (
+        np.lib.format.open_memmap(os.path.join(output_dir, name + ".npy"), mode="w+", dtype=np.float32, shape=shape)
+        for name, shape in zip(CV_ARRAYS, ((n_rows, X.shape[1]), (n_rows,)))
+    )
+    offset = 0
+    for start in range(0, X.shape[0], chunk_size):
+        X_chunk, y_chunk = X[start:start + chunk_size], y[start:start + chunk_size]
+        if missing is not None:
+            keep = ~missing[start:start + chunk_size]
+            X_chunk, y_chunk = X_chunk[keep], y_chunk[keep]
+        X_out[offset:offset + X_chunk.shape[0]] = X_chunk
+        y_out[offset:offset + y_chunk.shape[0]] = y_chunk
+        offset += X_chunk.shape[0]
+    X_out.flush()
+    y_out.flush()
+    return n_rows
+
+
+def regression_metrics(y_true, y_pred):
+    """
+    Returns the mean squared error, mean absolute error and R² of a set of predictions.
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    errors = np.asarray(y_pred, dtype=np.float64) - y_true
+    total = np.sum((y_true - y_true.mean()) ** 2)
+    return {
+        "mse": float(np.mean(errors ** 2)),
+        "mae": float(np.mean(np.abs(errors))),
+        "r2": float(1 - np.sum(errors ** 2) / total) if total > 0 else None,
+    }
+
+
+def run_fold(data_dir, fold, n_splits, params, max_epochs, patience=5, shuffle=True, seed=42, cancel_event=None):
+    """
+    Trains and evaluates one fold on the arrays written by ``prepare_cv``.
+
+    The fold's rows are selected by index from the memory-mapped arrays and the
+    inputs are standardized with statistics of the training rows only, so nothing
+    about the held-out rows leaks into training.
+
+    Args:
+        data_dir (str): Directory written by ``prepare_cv``.
+        fold (int): Index of the fold to hold out.
+        n_splits (int): Number of folds.
+        params (dict): ``hidden_layers``, ``learning_rate``, ``batch_size`` and ``n_members`` of the model.
+        max_epochs (int): Maximum number of training epochs.
+        patience (int): Epochs without improvement before the fold stops early.
+        shuffle (bool): Passed on to ``kfold_indices``.
+        seed (int): Passed on to ``kfold_indices``.
+        cancel_event: Optional event; once set, the fold stops at the next batch boundary.
+
+    Returns:
+        dict: ``fold``, ``status`` ("completed" or "cancelled"), ``n_train``, ``n_val``,
+        ``epochs``, ``train_time`` and the validation ``metrics``.
+    """
+    from .data import Scaler, kfold_indices
+    from .model import CancelCallback, FiveDNet
+
+    result = {"fold": fold, "status": "cancelled", "n_train": 0, "n_val": 0, "epochs": 0,
+              "train_time": None, "metrics": None}
+    if cancel_event is not None and cancel_event.is_set():
+        return result
+
+    # Memory-mapped, so concurrent folds share the page cache and only gather their own rows
+    X, y = (np.load(os.path.join(data_dir, name + ".npy"), mmap_mode="r") for name in CV_ARRAYS)
+    train_idx, val_idx = kfold_indices(X.shape[0], n_splits, fold=fold, shuffle=shuffle, seed=seed)
+    result["n_train"], result["n_val"] = len(train_idx), len(val_idx)
+
+    X_train, y_train = X[train_idx], y[train_idx]
+    X_val, y_val = X[val_idx], y[val_idx]
+    # The gathered rows are float32 copies already, so they are standardized in place
+    scaler = Scaler()
+    scaler.fit(X_train)
+    scaler.transform(X_train, copy=False)
+    scaler.transform(X_val, copy=False)
+
+    model = FiveDNet(
+        hidden_layers=params.get("hidden_layers", [64, 32, 16]),
+        learning_rate=params.get("learning_rate", 0.001),
+        batch_size=params.get("batch_size", 32),
+        n_members=params.get("n_members", 1),
+        max_epochs=max_epochs,
+        patience=patience,
+        verbose=0,
+    )
+    callbacks = []
+    cancel = None
+    if cancel_event is not None:
+        cancel = CancelCallback(cancel_event.is_set)
+        callbacks.append(cancel)
+
+    start = time.perf_counter()
+    history = model.fit(X_train, y_train, callbacks=callbacks, validation_data=(X_val, y_val))
+    result["train_time"] = time.perf_counter() - start
+    result["epochs"] = len(history.history.get("loss", []))
+    if cancel is not None and cancel.cancelled:
+        return result
+
+    result["status"] = "completed"
+    result["metrics"] = regression_metrics(y_val, model.predict(X_val, batch_size=1024))
+    return result
+
+
+def aggregate_metrics(results):
+    """
+    Summarizes the metrics of the completed folds.
+
+    Returns:
+        dict: For each metric, its ``mean``, ``std``, ``min`` and ``max`` over the folds,
+        or None for a metric no fold reported.
+    """
+    summary = {}
+    for name in CV_METRICS:
+        values = [r["metrics"][name] for r in results
+                  if r["status"] == "completed" and r["metrics"][name] is not None]
+        summary[name] = {
+            "mean": float(np.mean(values)),
+            "std": float(np.std(values)),
+            "min": float(np.min(values)),
+            "max": float(np.max(values)),
+        } if values else None
+    return summary
+
+
+def cross_validate(executor, data_dir, n_splits, params, max_epochs, patience=5, shuffle=True, seed=42,
+                   cancel_event=None, on_result=None):
+    """
+    Runs every fold on ``executor`` and aggregates their metrics.
+
+    Args:
+        executor: ``concurrent.futures`` executor running the folds, typically a process pool.
+        data_dir (str): Directory written by ``prepare_cv``.
+        n_splits (int): Number of folds.
+        params (dict): Model hyperparameters shared by all folds.
+        on_result (callable): Called with the results so far whenever a fold finishes.
+        Other arguments are passed on to ``run_fold``.
+
+    Returns:
+        dict: ``folds``, the per-fold results ordered by fold, and ``summary``,
+        the aggregated metrics of the completed folds.
+    """
+    futures = {
+        executor.submit(run_fold, data_dir, fold, n_splits, params, max_epochs, patience, shuffle, seed,
+                        cancel_event): fold
+        for fold in range(n_splits)
+    }
+
+    results = []
+    for future in as_completed(futures):
+        fold = futures[future]
+        try:
+            result = future.result()
+        except CancelledError:
+            result = {"fold": fold, "status": "cancelled", "metrics": None}
+        except Exception as e:
+            result = {"fold": fold, "status": "failed", "metrics": None, "error": str(e)}
+        results.append(result)
+        results.sort(key=lambda r: r["fold"])
+        if on_result is not None:
+            on_result(list(results))
+    return {"folds": results, "summary": aggregate_metrics(results)}
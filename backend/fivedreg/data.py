@@ -1,49 +1,290 @@
 import pickle
+import tracemalloc
 import numpy as np
 import os
 
-def load_dataset(filepath):
+# Number of input features of every dataset
+N_FEATURES = 5
+
+# Formats load_dataset reads, by file extension. A directory holding X.npy and y.npy is read too.
+DATASET_EXTENSIONS = (".pkl", ".pickle", ".npy", ".npz", ".csv", ".parquet", ".arrow", ".feather", ".h5", ".hdf5")
+
+def _validate(X, y):
+    """
+    Checks the shapes of a feature matrix and its target vector.
     """
-    Loads the dataset from a pickle file.
+    if X.ndim != 2 or X.shape[1] != N_FEATURES:
+        raise ValueError(f"X must be a 2D array with {N_FEATURES} features. Got shape {X.shape}")
+        
+    if y.ndim != 1:
+        raise ValueError(f"y must be a 1D array. Got shape {y.shape}")
+        
+    if X.shape[0] != y.shape[0]:
+        raise ValueError(f"X and y must have the same number of samples. Got X:{X.shape[0]}, y:{y.shape[0]}")
+
+def _missing_mask(X, y, chunk_size):
+    """
+    Returns a boolean mask of the rows with a NaN in X or y, or None if there are none.
+    Scans in chunks, so memory-mapped arrays are never read in full at once.
+    """
+    mask = None
+    for start in range(0, X.shape[0], chunk_size):
+        stop = start + chunk_size
+        chunk_mask = np.isnan(X[start:stop]).any(axis=1) | np.isnan(y[start:stop])
+        if chunk_mask.any():
+            if mask is None:
+                mask = np.zeros(X.shape[0], dtype=bool)
+            mask[start:stop] = chunk_mask
+    return mask
+
+def _allocate(n_rows, cache_dir, dtype):
+    """
+    Returns empty X and y arrays, as .npy memory maps in ``cache_dir`` if one is given.
+    """
+    if cache_dir is None:
+        return np.empty((n_rows, N_FEATURES), dtype=dtype), np.empty(n_rows, dtype=dtype)
+    os.makedirs(cache_dir, exist_ok=True)
+    return (
+        np.lib.format.open_memmap(os.path.join(cache_dir, "X.npy"), mode="w+", dtype=dtype, shape=(n_rows, N_FEATURES)),
+        np.lib.format.open_memmap(os.path.join(cache_dir, "y.npy"), mode="w+", dtype=dtype, shape=(n_rows,)),
+    )
+
+def _collect(chunks, n_rows, cache_dir, dtype):
+    """
+    Writes ``(X, y)`` chunks into preallocated arrays, dropping rows with missing values on the way.
     
     Args:
-        filepath (str): Path to the .pkl file.
+        n_rows (int): Upper bound on the number of rows the chunks hold.
         
     Returns:
-        tuple: (X, y) where X is the feature matrix and y is the target vector.
+        tuple: (X, y, n_dropped). X and y are views of the rows that were kept.
     """
-    if not os.path.exists(filepath):
-        raise FileNotFoundError(f"File not found: {filepath}")
-        
+    X, y = _allocate(n_rows, cache_dir, dtype)
+    n_valid = 0
+    n_dropped = 0
+    for X_chunk, y_chunk in chunks:
+        if X_chunk.ndim != 2 or X_chunk.shape[1] != N_FEATURES:
+            raise ValueError(f"X must be a 2D array with {N_FEATURES} features. Got shape {X_chunk.shape}")
+        if n_valid + X_chunk.shape[0] > n_rows:
+            raise ValueError(f"The file holds more than the expected {n_rows} rows.")
+        valid = ~(np.isnan(X_chunk).any(axis=1) | np.isnan(y_chunk))
+        n_chunk = int(valid.sum())
+        X[n_valid:n_valid + n_chunk] = X_chunk[valid]
+        y[n_valid:n_valid + n_chunk] = y_chunk[valid]
+        n_valid += n_chunk
+        n_dropped += X_chunk.shape[0] - n_chunk
+    if isinstance(X, np.memmap):
+        X.flush()
+        y.flush()
+    return X[:n_valid], y[:n_valid], n_dropped
+
+def _split_columns(names, target):
+    """
+    Returns the feature column names and the target column name of a table.
+    The target is the column named ``target``, or else the last column.
+    """
+    names = [str(name) for name in names]
+    target_name = target if target in names else names[-1]
+    features = [name for name in names if name != target_name]
+    if len(features) != N_FEATURES:
+        raise ValueError(f"Expected {N_FEATURES} feature columns and a target column. Got columns {names}")
+    return features, target_name
+
+def _has_header(filepath):
+    with open(filepath, 'rb') as f:
+        first_line = f.readline().decode().strip()
+    try:
+        [float(value) for value in first_line.split(",")]
+        return False
+    except ValueError:
+        return True
+
+def _count_lines(filepath, block_size=1 << 24):
+    """
+    Counts the lines of a text file by scanning it in blocks.
+    """
+    n_lines = 0
+    last = b"\n"
     with open(filepath, 'rb') as f:
-        data = pickle.load(f)
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            n_lines += block.count(b"\n")
+            last = block[-1:]
+    return n_lines + (last != b"\n")
+
+def _csv_chunks(filepath, target, chunk_size):
+    """
+    Returns an upper bound on the number of data rows of a numeric CSV file (with or
+    without a header row) and an iterator over its ``(X, y)`` chunks.
+    """
+    import pandas as pd
+    
+    header = _has_header(filepath)
+    n_rows = _count_lines(filepath) - header
+    
+    def chunks():
+        features, target_name = None, None
+        for frame in pd.read_csv(filepath, header=0 if header else None, chunksize=chunk_size):
+            if features is None:
+                features, target_name = _split_columns(frame.columns, target)
+                if not header:
+                    features, target_name = [int(name) for name in features], int(target_name)
+            yield frame[features].to_numpy(dtype=np.float64), frame[target_name].to_numpy(dtype=np.float64)
+    return n_rows, chunks()
+
+def _arrow_batch_arrays(batch, features, target_name):
+    X = np.empty((batch.num_rows, N_FEATURES), dtype=np.float64)
+    for i, name in enumerate(features):
+        # Nulls become NaN and are dropped like any other missing value
+        X[:, i] = batch.column(name).to_numpy(zero_copy_only=False)
+    return X, batch.column(target_name).to_numpy(zero_copy_only=False).astype(np.float64)
+
+def _parquet_chunks(filepath, target, chunk_size):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet datasets require the optional 'pyarrow' package.")
         
-    if not isinstance(data, dict) or 'X' not in data or 'y' not in data:
-        raise ValueError("Dataset must be a dictionary containing 'X' and 'y' keys.")
+    parquet_file = pq.ParquetFile(filepath)
+    features, target_name = _split_columns(parquet_file.schema_arrow.names, target)
+    
+    def chunks():
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=features + [target_name]):
+            yield _arrow_batch_arrays(batch, features, target_name)
+    return parquet_file.metadata.num_rows, chunks()
+
+def _arrow_chunks(filepath, target, chunk_size):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Arrow and Feather datasets require the optional 'pyarrow' package.")
         
-    X = data['X']
-    y = data['y']
+    # Memory-mapped, so only the record batches being converted are paged in
+    reader = pa.ipc.open_file(pa.memory_map(filepath))
+    features, target_name = _split_columns(reader.schema.names, target)
+    n_rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
     
-    # Validate dimensions
-    if X.ndim != 2 or X.shape[1] != 5:
-        raise ValueError(f"X must be a 2D array with 5 features. Got shape {X.shape}")
+    def chunks():
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            for start in range(0, batch.num_rows, chunk_size):
+                yield _arrow_batch_arrays(batch.slice(start, chunk_size), features, target_name)
+    return n_rows, chunks()
+
+def _hdf5_dataset(filepath, h5_file, name):
+    """
+    Returns an HDF5 dataset as a read-only memory map if it is stored contiguously
+    and uncompressed, otherwise as the (lazily read) h5py dataset itself.
+    """
+    dataset = h5_file[name]
+    offset = dataset.id.get_offset()
+    if dataset.chunks is None and dataset.compression is None and offset is not None:
+        return np.memmap(filepath, dtype=dataset.dtype, mode='r', offset=offset, shape=dataset.shape)
+    return dataset
+
+def _load_hdf5(filepath, target, cache_dir, chunk_size, dtype):
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("HDF5 datasets require the optional 'h5py' package.")
         
-    if y.ndim != 1:
-        raise ValueError(f"y must be a 1D array. Got shape {y.shape}")
+    with h5py.File(filepath, 'r') as h5_file:
+        if 'X' not in h5_file or target not in h5_file:
+            raise ValueError(f"HDF5 dataset must contain 'X' and '{target}' datasets.")
+        X = _hdf5_dataset(filepath, h5_file, 'X')
+        y = _hdf5_dataset(filepath, h5_file, target)
+        if isinstance(X, np.memmap) and isinstance(y, np.memmap):
+            return X, y, None
         
-    if X.shape[0] != y.shape[0]:
-        raise ValueError(f"X and y must have the same number of samples. Got X:{X.shape[0]}, y:{y.shape[0]}")
+        _validate(X, y)
+        n_rows = X.shape[0]
+        chunks = ((X[start:start + chunk_size], y[start:start + chunk_size]) for start in range(0, n_rows, chunk_size))
+        return _collect(chunks, n_rows, cache_dir, dtype)
+
+def load_dataset(filepath, target='y', cache_dir=None, chunk_size=65536, dtype=np.float64, drop_missing=True):
+    """
+    Loads a dataset of 5 features and a target.
+    
+    ``.npy`` files and contiguous HDF5 datasets are memory-mapped rather than read,
+    and CSV, Parquet, Arrow/Feather and chunked HDF5 files are read ``chunk_size``
+    rows at a time, so no format needs an eager load of the whole file plus a copy.
+    
+    Supported formats:
+    
+    - a directory holding ``X.npy`` and ``y.npy``, or an ``(N, 6)`` ``.npy`` array
+      whose last column is the target; both are memory-mapped
+    - ``.npz`` archives with ``X`` and ``y`` arrays (read into memory; NumPy cannot
+      memory-map inside an archive)
+    - ``.csv`` with or without a header row, ``.parquet`` and ``.arrow``/``.feather``:
+      the target is the column named ``target``, or else the last column
+    - ``.h5``/``.hdf5`` files with ``X`` and ``target`` datasets
+    - ``.pkl``/``.pickle`` dicts with ``X`` and ``y`` (loaded in full; only open trusted files)
+    
+    Args:
+        filepath (str): Path to the dataset file or directory.
+        target (str): Name of the target column or dataset.
+        cache_dir (str): Optional directory for the arrays of chunked formats. They are
+            then written to ``.npy`` memory maps there instead of being held in memory,
+            so datasets larger than RAM can be loaded.
+        chunk_size (int): Rows read (and checked for missing values) at a time.
+        dtype: Dtype of the arrays of chunked formats. Memory-mapped arrays keep their own.
+        drop_missing (bool): Drop rows with missing values from memory-mapped and pickled
+            data, which copies it. Pass False when the rows are selected by index later
+            anyway, as ``prepare_dataset`` does. Chunked formats drop them while reading either way.
+        
+    Returns:
+        tuple: (X, y) where X is the feature matrix and y is the target vector.
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"File not found: {filepath}")
         
-    # Handle missing values (NaNs)
-    # Check for NaNs in X or y
-    nan_mask_X = np.isnan(X).any(axis=1)
-    nan_mask_y = np.isnan(y)
-    nan_mask = nan_mask_X | nan_mask_y
+    extension = os.path.splitext(filepath)[1].lower()
+    n_dropped = None
+    if os.path.isdir(filepath):
+        X = np.load(os.path.join(filepath, 'X.npy'), mmap_mode='r')
+        y = np.load(os.path.join(filepath, 'y.npy'), mmap_mode='r')
+    elif extension == '.npy':
+        data = np.load(filepath, mmap_mode='r')
+        if data.ndim != 2 or data.shape[1] != N_FEATURES + 1:
+            raise ValueError(f"A .npy dataset must be an (N, {N_FEATURES + 1}) array of features and target. Got shape {data.shape}")
+        X, y = data[:, :N_FEATURES], data[:, N_FEATURES]
+    elif extension == '.npz':
+        with np.load(filepath) as data:
+            if 'X' not in data or 'y' not in data:
+                raise ValueError("Dataset must be an archive containing 'X' and 'y' arrays.")
+            X, y = data['X'], data['y']
+    elif extension in ('.csv', '.parquet', '.arrow', '.feather'):
+        readers = {'.csv': _csv_chunks, '.parquet': _parquet_chunks, '.arrow': _arrow_chunks, '.feather': _arrow_chunks}
+        n_rows, chunks = readers[extension](filepath, target, chunk_size)
+        X, y, n_dropped = _collect(chunks, n_rows, cache_dir, dtype)
+    elif extension in ('.h5', '.hdf5'):
+        X, y, n_dropped = _load_hdf5(filepath, target, cache_dir, chunk_size, dtype)
+    elif extension in ('.pkl', '.pickle', ''):
+        with open(filepath, 'rb') as f:
+            data = pickle.load(f)
+            
+        if not isinstance(data, dict) or 'X' not in data or 'y' not in data:
+            raise ValueError("Dataset must be a dictionary containing 'X' and 'y' keys.")
+            
+        X = np.asarray(data['X'])
+        y = np.asarray(data['y'])
+    else:
+        raise ValueError(f"Unsupported dataset format {extension!r}. Expected one of {DATASET_EXTENSIONS}")
+        
+    _validate(X, y)
     
-    if np.any(nan_mask):
-        print(f"Warning: Found {np.sum(nan_mask)} rows with missing values. Dropping them.")
-        X = X[~nan_mask]
-        y = y[~nan_mask]
+    # Handle missing values (NaNs). Chunked formats already dropped them while reading.
+    if n_dropped is None and drop_missing:
+        nan_mask = _missing_mask(X, y, chunk_size)
+        n_dropped = 0
+        if nan_mask is not None:
+            n_dropped = int(nan_mask.sum())
+            X = X[~nan_mask]
+            y = y[~nan_mask]
+    if n_dropped:
+        print(f"Warning: Found {n_dropped} rows with missing values. Dropping them.")
         
     return X, y
 
@@ -62,54 +303,201 @@ def split_data(X, y, train_ratio=0.7, val_ratio=0.15, test_ratio=0.15, seed=42):
     Returns:
         tuple: (X_train, y_train, X_val, y_val, X_test, y_test)
     """
+    train_idx, val_idx, test_idx = split_indices(X.shape[0], train_ratio, val_ratio, test_ratio, seed)
+    
+    X_train = X[train_idx]
+    y_train = y[train_idx]
+    
+    X_val = X[val_idx]
+    y_val = y[val_idx]
+    
+    X_test = X[test_idx]
+    y_test = y[test_idx]
+    
+    return X_train, y_train, X_val, y_val, X_test, y_test
+
+def split_indices(n_samples, train_ratio=0.7, val_ratio=0.15, test_ratio=0.15, seed=42, rows=None):
+    """
+    Generates the row indices of a train/validation/test split.
+    
+    The three index arrays are views of a single permutation, identical to the
+    order ``split_data`` uses. A local generator is used, so the global NumPy
+    random state is left alone.
+    
+    Args:
+        n_samples (int): Number of rows to split.
+        train_ratio (float): Proportion of data for training.
+        val_ratio (float): Proportion of data for validation.
+        test_ratio (float): Proportion of data for testing.
+        seed (int): Random seed for reproducibility.
+        rows (np.ndarray): Optional row numbers to split instead of ``range(n_samples)``,
+            e.g. the rows without missing values.
+        
+    Returns:
+        tuple: (train_indices, val_indices, test_indices)
+    """
     if not np.isclose(train_ratio + val_ratio + test_ratio, 1.0):
         raise ValueError("Split ratios must sum to 1.0")
         
-    np.random.seed(seed)
-    indices = np.arange(X.shape[0])
-    np.random.shuffle(indices)
-    
-    X = X[indices]
-    y = y[indices]
-    
-    n_samples = X.shape[0]
+    order = np.random.RandomState(seed).permutation(n_samples)
+    if rows is not None:
+        order = rows[order]
+    # 4 bytes per row instead of 8 wherever the row numbers fit
+    if n_samples and order.max() < np.iinfo(np.int32).max:
+        order = order.astype(np.int32)
+        
     n_train = int(n_samples * train_ratio)
     n_val = int(n_samples * val_ratio)
+    return order[:n_train], order[n_train:n_train + n_val], order[n_train + n_val:]
+
+def kfold_indices(n_samples, n_splits=5, fold=None, shuffle=True, seed=42):
+    """
+    Generates the row indices of k-fold cross-validation folds.
     
-    X_train = X[:n_train]
-    y_train = y[:n_train]
-    
-    X_val = X[n_train:n_train + n_val]
-    y_val = y[n_train:n_train + n_val]
+    Only index arrays are produced, so the dataset itself is never copied or
+    reordered. The first ``n_samples % n_splits`` folds hold one extra row.
     
-    X_test = X[n_train + n_val:]
-    y_test = y[n_train + n_val:]
+    Args:
+        n_samples (int): Number of rows in the dataset.
+        n_splits (int): Number of folds.
+        fold (int): If given, only the indices of this fold are returned.
+        shuffle (bool): Assign rows to folds in random order instead of in blocks.
+        seed (int): Random seed for reproducibility. Uses a local generator, so the
+            global NumPy random state is left alone.
+        
+    Returns:
+        list: One ``(train_indices, val_indices)`` tuple per fold, or a single
+        tuple if ``fold`` is given.
+    """
+    if n_splits < 2 or n_splits > n_samples:
+        raise ValueError(f"n_splits must be between 2 and the number of samples ({n_samples}). Got {n_splits}")
+    if fold is not None and not 0 <= fold < n_splits:
+        raise ValueError(f"fold must be between 0 and {n_splits - 1}. Got {fold}")
+        
+    order = np.random.default_rng(seed).permutation(n_samples) if shuffle else np.arange(n_samples)
+    sizes = np.full(n_splits, n_samples // n_splits)
+    sizes[:n_samples % n_splits] += 1
+    bounds = np.concatenate(([0], np.cumsum(sizes)))
     
-    return X_train, y_train, X_val, y_val, X_test, y_test
+    def indices(k):
+        start, stop = bounds[k], bounds[k + 1]
+        return np.concatenate((order[:start], order[stop:])), order[start:stop]
+        
+    if fold is not None:
+        return indices(fold)
+    return [indices(k) for k in range(n_splits)]
 
 import json
+import struct
+
+# Binary scaler files: magic, number of features and samples, then the mean, std
+# and sum of squared deviations as little-endian float64
+SCALER_MAGIC = b"FDSC"
+_SCALER_HEADER = struct.Struct("<4sIq")
+
+def _moments(X):
+    """
+    Returns the row count, mean and sum of squared deviations of each column, in float64.
+    """
+    mean = np.sum(X, axis=0, dtype=np.float64) / X.shape[0]
+    deviations = X - mean
+    return X.shape[0], mean, np.einsum('ij,ij->j', deviations, deviations)
 
 class Scaler:
     def __init__(self):
         self.mean = None
         self.std = None
+        # Running statistics for partial_fit and merge. A scaler loaded from a file
+        # written before they were saved has n_samples 0 and cannot be updated.
+        self.n_samples = 0
+        self.m2 = None
         
-    def fit(self, X):
+    def _update(self, n, mean, m2):
         """
-        Computes the mean and std to be used for later scaling.
+        Adds the statistics of ``n`` more rows, combining moments as in Chan et al.'s
+        parallel form of Welford's algorithm.
         """
-        self.mean = np.mean(X, axis=0)
-        self.std = np.std(X, axis=0)
+        if n == 0:
+            return
+        if self.mean is not None and self.n_samples == 0:
+            raise ValueError("Scaler has no sample count (saved by an older version) and cannot be updated.")
+        if self.mean is None:
+            self.n_samples, self.mean, self.m2 = n, np.array(mean, dtype=np.float64), np.array(m2, dtype=np.float64)
+        else:
+            total = self.n_samples + n
+            delta = mean - self.mean
+            self.mean = self.mean + delta * (n / total)
+            self.m2 = self.m2 + m2 + delta ** 2 * (self.n_samples * n / total)
+            self.n_samples = total
+        self.std = np.sqrt(self.m2 / self.n_samples)
         # Avoid division by zero
         self.std[self.std == 0] = 1.0
         
-    def transform(self, X):
+    def partial_fit(self, X, chunk_size=65536):
+        """
+        Updates the mean and std with a batch of rows.
+        
+        Each chunk of ``chunk_size`` rows is reduced to its count, mean and sum of
+        squared deviations in float64 and merged into the running statistics, which
+        stays accurate where accumulating sums of squares would cancel. Feeding the
+        batches of a stream gives the same scaler as fitting their concatenation.
+        
+        Returns:
+            Scaler: self.
+        """
+        for start in range(0, X.shape[0], chunk_size):
+            self._update(*_moments(X[start:start + chunk_size]))
+        return self
+        
+    def merge(self, other):
+        """
+        Adds the statistics of another scaler, e.g. one fitted on a different chunk
+        of the data in another process.
+        
+        Returns:
+            Scaler: self.
+        """
+        if other.mean is not None and other.n_samples == 0:
+            raise ValueError("Scaler has no sample count (saved by an older version) and cannot be merged.")
+        if other.mean is not None:
+            self._update(other.n_samples, other.mean, other.m2)
+        return self
+        
+    def fit(self, X, chunk_size=65536):
+        """
+        Computes the mean and std to be used for later scaling.
+        
+        Works over ``chunk_size`` rows at a time with float64 accumulators, so
+        float32 and memory-mapped data are neither copied nor summed at low precision.
+        """
+        if X.shape[0] == 0:
+            raise ValueError("Cannot fit a scaler on an empty array.")
+        self.mean = self.std = self.m2 = None
+        self.n_samples = 0
+        return self.partial_fit(X, chunk_size=chunk_size)
+        
+    def transform(self, X, copy=True, chunk_size=65536):
         """
         Performs standardization by centering and scaling.
+        
+        Args:
+            X (np.ndarray): Features to standardize.
+            copy (bool): Return a new array. With False, the writable floating-point
+                array ``X`` is standardized in place, ``chunk_size`` rows at a time,
+                and returned.
         """
         if self.mean is None or self.std is None:
             raise ValueError("Scaler has not been fitted yet.")
-        return (X - self.mean) / self.std
+        if copy:
+            return (X - self.mean) / self.std
+            
+        mean = self.mean.astype(X.dtype)
+        std = self.std.astype(X.dtype)
+        for start in range(0, X.shape[0], chunk_size):
+            chunk = X[start:start + chunk_size]
+            chunk -= mean
+            chunk /= std
+        return X
     
     def fit_transform(self, X):
         """
@@ -118,9 +506,9 @@ class Scaler:
         self.fit(X)
         return self.transform(X)
         
-    def save(self, filepath):
+    def to_dict(self):
         """
-        Saves the scaler parameters to a JSON file.
+        Returns the scaler parameters as a JSON-serializable dictionary.
         """
         if self.mean is None or self.std is None:
             raise ValueError("Scaler has not been fitted yet.")
@@ -129,21 +517,58 @@ class Scaler:
             "mean": self.mean.tolist(),
             "std": self.std.tolist()
         }
-        with open(filepath, 'w') as f:
-            json.dump(data, f)
+        if self.n_samples:
+            data["n_samples"] = self.n_samples
+            data["m2"] = self.m2.tolist()
+        return data
+    
+    def from_dict(self, data):
+        """
+        Sets the scaler parameters from a dictionary produced by ``to_dict``.
+        """
+        self.mean = np.array(data["mean"])
+        self.std = np.array(data["std"])
+        self.n_samples = data.get("n_samples", 0)
+        self.m2 = np.array(data["m2"]) if "m2" in data else None
+        return self
+        
+    def save(self, filepath):
+        """
+        Saves the scaler parameters. Paths ending in ``.json`` get JSON; any other
+        path gets the binary format, which holds the exact float64 values and
+        loads without parsing text.
+        """
+        data = self.to_dict()
+        if filepath.endswith(".json"):
+            with open(filepath, 'w') as f:
+                json.dump(data, f)
+            return
+            
+        m2 = self.m2 if self.n_samples else np.zeros_like(self.mean)
+        with open(filepath, 'wb') as f:
+            f.write(_SCALER_HEADER.pack(SCALER_MAGIC, self.mean.shape[0], self.n_samples))
+            f.write(np.stack([self.mean, self.std, m2]).astype('<f8').tobytes())
             
     def load(self, filepath):
         """
-        Loads scaler parameters from a JSON file.
+        Loads scaler parameters from a file written by ``save``, in either format.
         """
         if not os.path.exists(filepath):
             raise FileNotFoundError(f"File not found: {filepath}")
             
-        with open(filepath, 'r') as f:
-            data = json.load(f)
+        with open(filepath, 'rb') as f:
+            content = f.read()
             
-        self.mean = np.array(data["mean"])
-        self.std = np.array(data["std"])
+        if not content.startswith(SCALER_MAGIC):
+            self.from_dict(json.loads(content))
+            return self
+            
+        _, n_features, n_samples = _SCALER_HEADER.unpack_from(content)
+        values = np.frombuffer(content, dtype='<f8', offset=_SCALER_HEADER.size).reshape(3, n_features)
+        self.mean, self.std = values[0].copy(), values[1].copy()
+        self.n_samples = n_samples
+        self.m2 = values[2].copy() if n_samples else None
+        return self
 
 def standardize_data(X_train, X_val, X_test, save_path="scaler_params.json"):
     """
@@ -173,3 +598,101 @@ def standardize_data(X_train, X_val, X_test, save_path="scaler_params.json"):
     
     return X_train_scaled, X_val_scaled, X_test_scaled
 
+def prepare_dataset(X, y, train_ratio=0.7, val_ratio=0.15, test_ratio=0.15, seed=42, scaler=None,
+                    save_path=None, dtype=np.float32, chunk_size=65536, report_memory=False):
+    """
+    Splits and standardizes a dataset while making a single copy of it.
+    
+    Gives the same split as ``split_data`` followed by ``standardize_data``, but:
+    the rows are gathered once, ``chunk_size`` at a time, into one ``dtype`` array
+    whose train, validation and test sets are views; rows with missing values are
+    skipped by index instead of being filtered out first; and the standardization
+    is applied in place. Peak memory is therefore
+    about one copy of the data in ``dtype`` plus 4 bytes per row of indices,
+    whether ``X`` is in memory or memory-mapped.
+    
+    Args:
+        X (np.ndarray): Feature matrix, e.g. from ``load_dataset(..., drop_missing=False)``.
+        y (np.ndarray): Target vector.
+        train_ratio (float): Proportion of data for training.
+        val_ratio (float): Proportion of data for validation.
+        test_ratio (float): Proportion of data for testing.
+        seed (int): Random seed for reproducibility.
+        scaler (Scaler): Optional fitted scaler to apply instead of fitting one on the training set.
+        save_path (str): Optional path to save the scaler parameters to.
+        dtype: Dtype of the prepared arrays; float32 halves the memory of float64 data.
+        chunk_size (int): Rows gathered and standardized at a time.
+        report_memory (bool): Measure the peak memory with ``tracemalloc``. This slows
+            every allocation down, so it is meant for tests and benchmarks.
+        
+    Returns:
+        dict: ``X_train``, ``y_train``, ``X_val``, ``y_val``, ``X_test``, ``y_test``,
+        the ``scaler``, ``n_dropped`` (rows with missing values), ``data_mb`` (size of the
+        prepared arrays) and ``peak_mb`` (peak memory allocated while preparing, or None
+        unless ``report_memory`` is set and ``tracemalloc`` was not already tracing).
+    """
+    _validate(X, y)
+    tracking = report_memory and not tracemalloc.is_tracing()
+    if tracking:
+        tracemalloc.start()
+    try:
+        nan_mask = _missing_mask(X, y, chunk_size)
+        rows = np.flatnonzero(~nan_mask) if nan_mask is not None else None
+        del nan_mask
+        n_samples = X.shape[0] if rows is None else rows.shape[0]
+        train_idx, val_idx, test_idx = split_indices(n_samples, train_ratio, val_ratio, test_ratio, seed, rows=rows)
+        del rows
+        
+        X_out = np.empty((n_samples, X.shape[1]), dtype=dtype)
+        y_out = np.empty(n_samples, dtype=dtype)
+        # Reading a memory-mapped file in ascending row order lets the OS read ahead
+        sort_reads = isinstance(X, np.memmap)
+        offset = 0
+        for indices in (train_idx, val_idx, test_idx):
+            for start in range(0, indices.shape[0], chunk_size):
+                chunk = indices[start:start + chunk_size]
+                rows_out = slice(offset + start, offset + start + chunk.shape[0])
+                if sort_reads:
+                    ascending = np.argsort(chunk)
+                    chunk = chunk[ascending]
+                    X_out[rows_out][ascending] = X[chunk]
+                    y_out[rows_out][ascending] = y[chunk]
+                else:
+                    X_out[rows_out] = X[chunk]
+                    y_out[rows_out] = y[chunk]
+            offset += indices.shape[0]
+        n_train, n_val = train_idx.shape[0], val_idx.shape[0]
+        del train_idx, val_idx, test_idx
+        
+        if scaler is None:
+            scaler = Scaler()
+            scaler.fit(X_out[:n_train], chunk_size=chunk_size)
+        scaler.transform(X_out, copy=False, chunk_size=chunk_size)
+        if save_path:
+            scaler.save(save_path)
+            
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024 if tracking else None
+    finally:
+        if tracking:
+            tracemalloc.stop()
+            
+    data_mb = (X_out.nbytes + y_out.nbytes) / 1024 / 1024
+    n_dropped = X.shape[0] - n_samples
+    if n_dropped:
+        print(f"Warning: Found {n_dropped} rows with missing values. Dropping them.")
+    if peak_mb is not None:
+        print(f"Prepared {n_samples} rows ({data_mb:.1f} MB): peak memory {peak_mb:.1f} MB")
+        
+    return {
+        "X_train": X_out[:n_train],
+        "y_train": y_out[:n_train],
+        "X_val": X_out[n_train:n_train + n_val],
+        "y_val": y_out[n_train:n_train + n_val],
+        "X_test": X_out[n_train + n_val:],
+        "y_test": y_out[n_train + n_val:],
+        "scaler": scaler,
+        "n_dropped": n_dropped,
+        "data_mb": data_mb,
+        "peak_mb": peak_mb,
+    }
+
@@ -0,0 +1,320 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from .data import DATASET_EXTENSIONS, load_dataset
+
+# Files of a stored dataset: the uploaded bytes as SOURCE_NAME plus their extension,
+# the parsed arrays (readable by ``load_dataset`` as a directory) and the metadata
+SOURCE_NAME = "source"
+ARRAY_FILES = ("X.npy", "y.npy")
+METADATA_FILE = "metadata.json"
+
+# Files in the store root: one maps dataset names to content hashes, the other maps
+# the file names linked into ``link_dir`` to the hash and file identity of the link
+NAMES_FILE = "names.json"
+LINKS_FILE = "links.json"
+
+
+def _check_name(name, kind):
+    if not name or os.sep in name or (os.altsep and os.altsep in name) or name.startswith("."):
+        raise ValueError(f"Invalid {kind}: {name!r}")
+
+
+def _save_arrays(directory, X, y, chunk_size=65536):
+    """
+    Writes ``X`` and ``y`` to ``.npy`` files chunk by chunk, so memory-mapped
+    inputs are never read into memory at once.
+    """
+    for name, array in zip(ARRAY_FILES, (X, y)):
+        out = np.lib.format.open_memmap(os.path.join(directory, name), mode="w+", dtype=array.dtype,
+                                        shape=array.shape)
+        for start in range(0, array.shape[0], chunk_size):
+            out[start:start + chunk_size] = array[start:start + chunk_size]
+        out.flush()
+        del out
+
+
+def dataset_digest(path, chunk_size=1 << 20):
+    """
+    Returns the SHA-256 of a dataset file, or of the files of a dataset directory
+    in name order, read ``chunk_size`` bytes at a time.
+    """
+    if os.path.isdir(path):
+        files = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+    else:
+        files = [path]
+    digest = hashlib.sha256()
+    for filepath in files:
+        if not os.path.isfile(filepath):
+            continue
+        with open(filepath, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DatasetStore:
+    """
+    Content-addressed store of uploaded datasets.
+
+    An upload is streamed to disk in chunks while its SHA-256 is computed, and kept
+    in a directory named after the hash together with its parsed arrays as ``.npy``
+    files. Uploading the same bytes again only adds a name: nothing is parsed or
+    copied, and the cached arrays are memory-mapped. Names map to hashes in a
+    ``names.json`` file that is replaced atomically, so re-uploading under a name
+    points it at the new content while the old content stays addressable by its hash.
+    """
+
+    def __init__(self, root_dir, link_dir=None, chunk_size=1 << 20):
+        """
+        Args:
+            root_dir (str): Directory holding one sub-directory per content hash.
+            link_dir (str): Optional directory in which each upload is also linked under
+                its file name, for clients that pass a ``data_path``.
+            chunk_size (int): Bytes read, hashed and written at a time.
+        """
+        self.root_dir = root_dir
+        self.link_dir = link_dir
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _entry_dir(self, digest):
+        _check_name(digest, "dataset hash")
+        return os.path.join(self.root_dir, digest)
+
+    def _read_json(self, filename):
+        try:
+            with open(os.path.join(self.root_dir, filename)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_json(self, filename, data):
+        tmp_path = os.path.join(self.root_dir, f".{filename}-{uuid.uuid4().hex}")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, os.path.join(self.root_dir, filename))
+
+    def _read_names(self):
+        return self._read_json(NAMES_FILE)
+
+    def _write_names(self, names):
+        self._write_json(NAMES_FILE, names)
+
+    def _linked_path(self, links, filename):
+        """
+        Returns ``link_dir/filename`` if the store created the file there, or None.
+        """
+        path = os.path.join(self.link_dir, filename)
+        record = links.get(filename)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if record is None or [stat.st_dev, stat.st_ino] != record["file_id"]:
+            return None
+        return path
+
+    def _link(self, digest, filename):
+        """
+        Points ``link_dir/filename`` at the stored source file, via a temporary name so
+        a file that is still memory-mapped is replaced rather than truncated. A file
+        the store did not create there is never replaced; the upload is then only
+        reachable through the store.
+        """
+        if self.link_dir is None:
+            return
+        os.makedirs(self.link_dir, exist_ok=True)
+        links = self._read_json(LINKS_FILE)
+        target = os.path.join(self.link_dir, filename)
+        if os.path.lexists(target) and self._linked_path(links, filename) is None:
+            print(f"Warning: Not linking dataset {digest[:12]} as {target}: a file the dataset store did not create is there.")
+            return
+
+        source = self.source_path(digest)
+        tmp_path = os.path.join(self.link_dir, f".link-{uuid.uuid4().hex}-{filename}")
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            # No hard links across file systems (or on some platforms): fall back to a copy
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, target)
+        stat = os.stat(target)
+        links[filename] = {"sha256": digest, "file_id": [stat.st_dev, stat.st_ino]}
+        self._write_json(LINKS_FILE, links)
+
+    def add(self, fileobj, filename, name=None):
+        """
+        Stores an upload, or only names it if the same content is already stored.
+
+        Args:
+            fileobj: Binary file object to read the upload from.
+            filename (str): Original file name; its extension selects the dataset format.
+            name (str): Name to store the dataset under. Defaults to ``filename``.
+
+        Returns:
+            dict: The dataset's metadata (see ``metadata``) with ``deduplicated`` set
+            if the content was already stored.
+
+        Raises:
+            ValueError: If the name or format is invalid or the file cannot be parsed.
+        """
+        _check_name(filename, "file name")
+        name = name or filename
+        _check_name(name, "dataset name")
+        extension = os.path.splitext(filename)[1].lower()
+        if extension not in DATASET_EXTENSIONS:
+            raise ValueError(f"Unsupported dataset format {extension!r}. Expected one of {DATASET_EXTENSIONS}")
+
+        tmp_dir = os.path.join(self.root_dir, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        try:
+            source = os.path.join(tmp_dir, SOURCE_NAME + extension)
+            digest = hashlib.sha256()
+            size = 0
+            with open(source, "wb") as f:
+                while True:
+                    chunk = fileobj.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            digest = digest.hexdigest()
+
+            deduplicated = self.exists(digest)
+            if not deduplicated:
+                # Chunked formats are parsed into memory maps in a scratch directory
+                try:
+                    X, y = load_dataset(source, cache_dir=os.path.join(tmp_dir, "parse"))
+                except (OSError, ValueError, EOFError, pickle.UnpicklingError) as e:
+                    raise ValueError(f"Could not read {filename}: {e}") from e
+                _save_arrays(tmp_dir, X, y)
+                metadata = {
+                    "sha256": digest,
+                    "filename": filename,
+                    "format": extension,
+                    "size_bytes": size,
+                    "n_samples": int(X.shape[0]),
+                    "n_features": int(X.shape[1]),
+                    "dtype": str(X.dtype),
+                    "created_at": time.time(),
+                }
+                del X, y
+                shutil.rmtree(os.path.join(tmp_dir, "parse"), ignore_errors=True)
+                with open(os.path.join(tmp_dir, METADATA_FILE), "w") as f:
+                    json.dump(metadata, f)
+                try:
+                    os.rename(tmp_dir, self._entry_dir(digest))
+                except OSError:
+                    # A concurrent upload of the same content was stored first
+                    if not self.exists(digest):
+                        raise
+                    deduplicated = True
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        with self._lock:
+            names = self._read_names()
+            names[name] = {"sha256": digest, "filename": filename, "updated_at": time.time()}
+            self._write_names(names)
+            self._link(digest, filename)
+        return {**self.metadata(name), "deduplicated": deduplicated}
+
+    def exists(self, digest):
+        try:
+            return os.path.exists(os.path.join(self._entry_dir(digest), METADATA_FILE))
+        except ValueError:
+            return False
+
+    def resolve(self, key):
+        """
+        Returns the content hash of a dataset name, or of a hash itself.
+
+        Raises:
+            KeyError: If no dataset has that name or hash.
+        """
+        entry = self._read_names().get(key)
+        if entry is not None:
+            return entry["sha256"]
+        if self.exists(key):
+            return key
+        raise KeyError(f"Unknown dataset: {key}")
+
+    def path(self, key):
+        """
+        Returns the directory of a dataset's cached arrays, readable by ``load_dataset``.
+        """
+        return self._entry_dir(self.resolve(key))
+
+    def source_path(self, key):
+        """
+        Returns the path of the uploaded file of a dataset.
+        """
+        directory = self.path(key)
+        with open(os.path.join(directory, METADATA_FILE)) as f:
+            extension = json.load(f)["format"]
+        return os.path.join(directory, SOURCE_NAME + extension)
+
+    def metadata(self, key):
+        """
+        Returns the metadata of a dataset: ``sha256``, ``filename``, ``format``, ``size_bytes``,
+        ``n_samples``, ``n_features``, ``dtype`` and ``created_at``, plus its ``name`` if
+        ``key`` is a name.
+        """
+        with open(os.path.join(self.path(key), METADATA_FILE)) as f:
+            metadata = json.load(f)
+        if key in self._read_names():
+            metadata["name"] = key
+        return metadata
+
+    def load(self, key):
+        """
+        Returns the memory-mapped ``(X, y)`` arrays of a dataset.
+        """
+        # The cached arrays were written without the rows with missing values
+        return load_dataset(self.path(key), drop_missing=False)
+
+    def datasets(self):
+        """
+        Returns the metadata of every named dataset, ordered by name.
+        """
+        return [self.metadata(name) for name in sorted(self._read_names())]
+
+    def remove(self, name):
+        """
+        Removes a dataset name, and the stored content once no name refers to it.
+        Arrays already memory-mapped from it stay readable until they are released.
+
+        Raises:
+            KeyError: If no dataset has that name.
+        """
+        with self._lock:
+            names = self._read_names()
+            if name not in names:
+                raise KeyError(f"Unknown dataset: {name}")
+            entry = names.pop(name)
+            self._write_names(names)
+
+            digest = entry["sha256"]
+            if self.link_dir is not None:
+                links = self._read_json(LINKS_FILE)
+                link = self._linked_path(links, entry["filename"])
+                if link is not None and links[entry["filename"]]["sha256"] == digest:
+                    os.remove(link)
+                    del links[entry["filename"]]
+                    self._write_json(LINKS_FILE, links)
+            if all(other["sha256"] != digest for other in names.values()):
+                shutil.rmtree(self._entry_dir(digest), ignore_errors=True)
@@ -0,0 +1,156 @@
+import os
+
+import numpy as np
+
+# This module must stay free of TensorFlow imports so that the API can serve
+# predictions from exported weights without loading TensorFlow at all.
+
+_ACTIVATIONS = {
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "linear": lambda x: x,
+}
+
+
+class NumpyMLP:
+    """
+    Dependency-free forward pass for a dense ReLU network exported from FiveDNet.
+
+    Ensembles exported with stacked (n_members, in, out) kernels are evaluated for
+    all members at once through broadcast matrix products.
+    """
+
+    def __init__(self, layers=None):
+        """
+        Args:
+            layers (list): (kernel, bias, activation) tuples ordered from input to output,
+                as returned by ``FiveDNet.export_weights``.
+        """
+        self.layers = None
+        if layers is not None:
+            self._set_layers(layers)
+
+    def _set_layers(self, layers):
+        checked = []
+        for kernel, bias, activation in layers:
+            if activation not in _ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {activation}")
+            checked.append((
+                np.ascontiguousarray(kernel, dtype=np.float32),
+                np.ascontiguousarray(bias, dtype=np.float32),
+                activation,
+            ))
+        self.layers = checked
+
+    @property
+    def n_members(self):
+        if self.layers is None or self.layers[0][0].ndim == 2:
+            return 1
+        return self.layers[0][0].shape[0]
+
+    @classmethod
+    def from_fivednet(cls, model, scaler=None):
+        """
+        Builds an engine from a trained FiveDNet.
+
+        Args:
+            model (FiveDNet): Trained model.
+            scaler (Scaler): Optional fitted scaler to fold into the first layer.
+
+        Returns:
+            NumpyMLP: Engine that expects raw features if a scaler was given, scaled features otherwise.
+        """
+        engine = cls(model.export_weights())
+        if scaler is not None:
+            engine.fold_scaler(scaler.mean, scaler.std)
+        return engine
+
+    def fold_scaler(self, mean, std):
+        """
+        Folds standardization ``(X - mean) / std`` into the first layer so the
+        engine can be fed raw features directly.
+        """
+        if self.layers is None:
+            raise ValueError("Model has not been loaded yet.")
+
+        kernel, bias, activation = self.layers[0]
+        mean = np.asarray(mean, dtype=np.float64)
+        std = np.asarray(std, dtype=np.float64)
+
+        # Broadcasts over the leading member axis of ensemble kernels
+        folded_kernel = kernel.astype(np.float64) / std[:, None]
+        folded_bias = bias.astype(np.float64) - mean @ folded_kernel
+        self.layers[0] = (folded_kernel.astype(np.float32), folded_bias.astype(np.float32), activation)
+
+    def predict(self, X, batch_size=None):
+        """
+        Generates predictions for the input samples.
+
+        Args:
+            X (np.ndarray): Feature matrix.
+            batch_size (int): Ignored, accepted for interface compatibility with FiveDNet.
+
+        Returns:
+            np.ndarray: Predicted values. For an ensemble, the mean over its members.
+        """
+        if self.layers is None:
+            raise ValueError("Model has not been loaded yet.")
+
+        if self.n_members > 1:
+            return self.predict_members(X).mean(axis=1)
+
+        out = np.asarray(X, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            out = out @ kernel
+            out += bias
+            out = _ACTIVATIONS[activation](out)
+        return out.reshape(-1)
+
+    def predict_members(self, X, batch_size=None):
+        """
+        Generates the predictions of every ensemble member.
+
+        Args:
+            X (np.ndarray): Feature matrix.
+            batch_size (int): Ignored, accepted for interface compatibility with FiveDNet.
+
+        Returns:
+            np.ndarray: (n_samples, n_members) predicted values.
+        """
+        if self.layers is None:
+            raise ValueError("Model has not been loaded yet.")
+
+        out = np.asarray(X, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            # (batch, in) or (members, batch, in) @ (members, in, out) -> (members, batch, out)
+            out = out @ kernel
+            out += bias[..., None, :] if bias.ndim == 2 else bias
+            out = _ACTIVATIONS[activation](out)
+        return out[..., 0].T if out.ndim == 3 else out.reshape(-1, 1)
+
+    def save(self, filepath):
+        """
+        Saves the weights to a ``.npz`` file.
+        """
+        if self.layers is None:
+            raise ValueError("Model has not been loaded yet.")
+
+        arrays = {"activations": np.array([activation for _, _, activation in self.layers])}
+        for i, (kernel, bias, _) in enumerate(self.layers):
+            arrays[f"kernel_{i}"] = kernel
+            arrays[f"bias_{i}"] = bias
+        with open(filepath, "wb") as f:
+            np.savez(f, **arrays)
+
+    def load(self, filepath):
+        """
+        Loads weights from a ``.npz`` file written by ``save``.
+        """
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(f"File not found: {filepath}")
+
+        with np.load(filepath) as data:
+            activations = [str(a) for a in data["activations"]]
+            self._set_layers([
+                (data[f"kernel_{i}"], data[f"bias_{i}"], activation)
+                for i, activation in enumerate(activations)
+            ])
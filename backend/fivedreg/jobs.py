@@ -0,0 +1,204 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """
+    Raised when a job is submitted while the queue is at capacity.
+    """
+
+
+class JobCancelled(Exception):
+    """
+    Raised by a job function that stopped early because cancellation was requested.
+    """
+
+
+class Job:
+    """
+    State of a single background job.
+    """
+
+    def __init__(self, kind, params=None, total_epochs=0, cancel_event=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.current_epoch = 0
+        self.total_epochs = total_epochs
+        self.loss_history = []
+        self.final_loss = None
+        self.error = None
+        self.result = None
+        # Shared with the worker so it can stop at the next batch boundary
+        self.cancel_event = cancel_event if cancel_event is not None else threading.Event()
+
+    @property
+    def cancel_requested(self):
+        return self.cancel_event.is_set()
+
+    def record_epoch(self, epoch, logs):
+        """
+        Records the logs of a finished epoch. Epochs replayed by a resumed run
+        replace the entries recorded for them before.
+        """
+        while self.loss_history and self.loss_history[-1]["epoch"] > epoch:
+            self.loss_history.pop()
+        self.current_epoch = epoch + 1
+        loss = logs.get("loss")
+        if loss is not None:
+            self.loss_history.append({"epoch": epoch + 1, "loss": float(loss)})
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": self.params,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "current_epoch": self.current_epoch,
+            "total_epochs": self.total_epochs,
+            "loss_history": list(self.loss_history),
+            "final_loss": self.final_loss,
+            "error": self.error,
+            "result": self.result,
+        }
+
+
+class JobManager:
+    """
+    Bounded FIFO job queue with a concurrency limit and cooperative cancellation.
+
+    Jobs are created with ``create`` and executed with ``run``, which blocks the
+    calling thread until a slot is free, runs the job and records its outcome.
+    """
+
+    def __init__(self, max_concurrent=1, max_queued=8, max_history=100, cancel_event_factory=None):
+        """
+        Args:
+            max_concurrent (int): Maximum number of jobs running at the same time.
+            max_queued (int): Maximum number of jobs waiting for a slot.
+            max_history (int): Number of finished jobs kept for status queries.
+            cancel_event_factory (callable): Creates the per-job cancellation event.
+                Use a multiprocessing manager's ``Event`` to share it with worker processes.
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1.")
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_history = max_history
+        self.cancel_event_factory = cancel_event_factory or threading.Event
+        self._jobs = OrderedDict()
+        self._pending = deque()
+        self._running = 0
+        self._cond = threading.Condition()
+
+    def create(self, kind, params=None, total_epochs=0):
+        """
+        Registers a new queued job.
+
+        Raises:
+            QueueFullError: If ``max_queued`` jobs are already waiting.
+        """
+        with self._cond:
+            if len(self._pending) >= self.max_queued:
+                raise QueueFullError(f"Job queue is full ({self.max_queued} jobs waiting).")
+            job = Job(kind, params, total_epochs, cancel_event=self.cancel_event_factory())
+            self._jobs[job.id] = job
+            self._pending.append(job.id)
+            self._trim_history()
+            return job
+
+    def get(self, job_id):
+        """
+        Returns the job with the given ID, or None.
+        """
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        """
+        Returns all known jobs, oldest first.
+        """
+        with self._cond:
+            return list(self._jobs.values())
+
+    def counts(self):
+        """
+        Returns the number of queued and running jobs.
+        """
+        with self._cond:
+            return {"queued": len(self._pending), "running": self._running}
+
+    def cancel(self, job_id):
+        """
+        Requests cancellation. Queued jobs are cancelled at once; running jobs
+        stop at their next cooperative check.
+
+        Returns:
+            Job: The job, or None if it does not exist.
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return job
+            job.cancel_event.set()
+            if job.status == QUEUED:
+                self._pending.remove(job.id)
+                job.status = CANCELLED
+                job.finished_at = time.time()
+            self._cond.notify_all()
+            return job
+
+    def run(self, job, fn):
+        """
+        Waits for a free slot, then runs ``fn(job)`` and records the outcome.
+        ``fn`` should return the job's result, or raise ``JobCancelled`` if it
+        stopped early because ``job.cancel_requested`` was set.
+        """
+        with self._cond:
+            while job.status == QUEUED and not (
+                self._running < self.max_concurrent and self._pending[0] == job.id
+            ):
+                self._cond.wait()
+            if job.status != QUEUED:
+                return
+            self._pending.popleft()
+            self._running += 1
+            job.status = RUNNING
+            job.started_at = time.time()
+            self._cond.notify_all()
+
+        try:
+            job.result = fn(job)
+            job.status = COMPLETED
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
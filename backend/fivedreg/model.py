@@ -1,9 +1,145 @@
 import tensorflow as tf
 import numpy as np
+import json
 import os
+import time
+import zipfile
+
+from .data import Scaler
+
+# Name of the archive entry holding the scaler parameters inside a saved .keras file
+SCALER_ENTRY = "scaler.json"
+
+# Keras dtype policies FiveDNet accepts. The mixed policies compute in 16 bits but keep
+# the weights, and the output layer, in float32.
+PRECISIONS = ("float32", "mixed_bfloat16", "mixed_float16")
+
+class ProgressCallback(tf.keras.callbacks.Callback):
+    """
+    Keras callback that forwards per-epoch logs to a plain function.
+    """
+    def __init__(self, on_epoch):
+        """
+        Args:
+            on_epoch (callable): Called as ``on_epoch(epoch, logs)`` at the end of every epoch.
+        """
+        super().__init__()
+        self.on_epoch = on_epoch
+        
+    def on_epoch_end(self, epoch, logs=None):
+        self.on_epoch(epoch, logs or {})
+
+
+class CancelCallback(tf.keras.callbacks.Callback):
+    """
+    Keras callback that stops training at the next batch boundary once cancellation is requested.
+    """
+    def __init__(self, should_stop, check_interval=0.1):
+        """
+        Args:
+            should_stop (callable): Returns True when training should stop.
+            check_interval (float): Minimum number of seconds between two checks, since
+                ``should_stop`` may be a round trip to another process.
+        """
+        super().__init__()
+        self.should_stop = should_stop
+        self.check_interval = check_interval
+        self.cancelled = False
+        self._last_check = 0.0
+
+    def on_train_batch_end(self, batch, logs=None):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        if self.should_stop():
+            self.cancelled = True
+            self.model.stop_training = True
+
+
+class CheckpointCallback(tf.keras.callbacks.Callback):
+    """
+    Keras callback that periodically hands the training progress to a save function,
+    so an interrupted run can be resumed from the last checkpoint.
+    """
+    def __init__(self, save, every=1, history=None):
+        """
+        Args:
+            save (callable): Called as ``save(epochs_done, loss_history)`` at each checkpoint.
+            every (int): Save after every ``every`` epochs.
+            history (list): Loss history of earlier epochs, when resuming.
+        """
+        super().__init__()
+        self.save = save
+        self.every = every
+        self.history = list(history or [])
+
+    def on_epoch_end(self, epoch, logs=None):
+        loss = (logs or {}).get('loss')
+        if loss is not None:
+            self.history.append({"epoch": epoch + 1, "loss": float(loss)})
+        if (epoch + 1) % self.every == 0:
+            self.save(epoch + 1, self.history)
+
+
+@tf.keras.utils.register_keras_serializable(package="fivedreg")
+class EnsembleDense(tf.keras.layers.Layer):
+    """
+    Dense layer holding the weights of ``n_members`` independent networks in stacked tensors.
+    
+    Maps ``(batch, in)`` (shared input) or ``(n_members, batch, in)`` to
+    ``(n_members, batch, units)`` with a single batched matrix product, so all
+    members are trained and evaluated in the same steps.
+    """
+    def __init__(self, units, n_members, activation=None, **kwargs):
+        """
+        Args:
+            units (int): Number of neurons per member.
+            n_members (int): Number of ensemble members.
+            activation (str): Name of the activation function, e.g. "relu".
+        """
+        super().__init__(**kwargs)
+        self.units = units
+        self.n_members = n_members
+        self.activation_name = activation or "linear"
+        self.activation = tf.keras.activations.get(self.activation_name)
+
+    def build(self, input_shape):
+        fan_in = input_shape[-1]
+        # Glorot uniform per member; the stacked shape would otherwise inflate the fan
+        limit = np.sqrt(6.0 / (fan_in + self.units))
+        self.kernel = self.add_weight(
+            name="kernel", shape=(self.n_members, fan_in, self.units),
+            initializer=tf.keras.initializers.RandomUniform(-limit, limit),
+        )
+        self.bias = self.add_weight(name="bias", shape=(self.n_members, self.units), initializer="zeros")
+
+    def call(self, inputs):
+        if len(inputs.shape) == 2:
+            outputs = tf.einsum("bi,kio->kbo", inputs, self.kernel)
+        else:
+            outputs = tf.einsum("kbi,kio->kbo", inputs, self.kernel)
+        return self.activation(outputs + self.bias[:, None, :])
+
+    def get_config(self):
+        config = super().get_config()
+        config.update({"units": self.units, "n_members": self.n_members, "activation": self.activation_name})
+        return config
+
+
+@tf.keras.utils.register_keras_serializable(package="fivedreg")
+class MemberOutputs(tf.keras.layers.Layer):
+    """
+    Turns the ``(n_members, batch, 1)`` output of an ensemble into ``(batch, n_members)``.
+    """
+    def call(self, inputs):
+        return tf.transpose(inputs[..., 0])
+
 
 class FiveDNet:
-    def __init__(self, hidden_layers=[64, 32, 16], learning_rate=0.001, max_epochs=100, batch_size=32, verbose=1):
+    def __init__(self, hidden_layers=[64, 32, 16], learning_rate=0.001, max_epochs=100, batch_size=32, verbose=1,
+                 seed=None, patience=10, n_members=1, jit_compile="auto", precision="float32",
+                 steps_per_execution=1):
         """
         Initialize the FiveDNet model.
         
@@ -13,13 +149,34 @@ class FiveDNet:
             max_epochs (int): Maximum number of training epochs.
             batch_size (int): Batch size for training.
             verbose (int): Verbosity mode. 0 = silent, 1 = progress bar, 2 = one line per epoch.
+            seed (int): Optional seed for the order in which training rows are visited.
+            patience (int): Epochs without improvement before training stops early.
+            n_members (int): Number of ensemble members. Members share the architecture
+                but not the weights, are trained together in one fused model, and their
+                spread is an estimate of the prediction uncertainty.
+            jit_compile (bool or str): Compile the training and prediction steps with XLA.
+                "auto" leaves the choice to Keras, which disables XLA on CPU-only machines.
+            precision (str): Dtype policy of the hidden layers, one of ``PRECISIONS``.
+                "mixed_bfloat16" is the one to try on CPUs with native bfloat16 support.
+            steps_per_execution (int): Number of batches run per call into the compiled step,
+                which amortizes the per-step Python overhead of small batches.
         """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision {precision!r}. Expected one of {PRECISIONS}")
         self.hidden_layers = hidden_layers
         self.learning_rate = learning_rate
         self.max_epochs = max_epochs
         self.batch_size = batch_size
         self.verbose = verbose
+        self.seed = seed
+        self.patience = patience
+        self.n_members = n_members
+        self.jit_compile = jit_compile
+        self.precision = precision
+        self.steps_per_execution = steps_per_execution
         self.model = None
+        # Fitted Scaler for the model's inputs, saved and loaded together with the weights
+        self.scaler = None
         
     def _build_model(self, input_shape):
         """
@@ -28,36 +185,141 @@ class FiveDNet:
         model = tf.keras.Sequential()
         model.add(tf.keras.layers.Input(shape=(input_shape,)))
         
-        for units in self.hidden_layers:
-            model.add(tf.keras.layers.Dense(units, activation='relu'))
-            
-        model.add(tf.keras.layers.Dense(1, activation='linear'))
+        # Set per layer rather than globally, so other models in the process are unaffected.
+        # The output stays float32 to keep the loss accurate.
+        policy = tf.keras.DTypePolicy(self.precision)
+        if self.n_members > 1:
+            for units in self.hidden_layers:
+                model.add(EnsembleDense(units, self.n_members, activation='relu', dtype=policy))
+            model.add(EnsembleDense(1, self.n_members, activation='linear', dtype="float32"))
+            model.add(MemberOutputs())
+        else:
+            for units in self.hidden_layers:
+                model.add(tf.keras.layers.Dense(units, activation='relu', dtype=policy))
+            model.add(tf.keras.layers.Dense(1, activation='linear', dtype="float32"))
         
-        optimizer = tf.keras.optimizers.Adam(learning_rate=self.learning_rate)
-        model.compile(optimizer=optimizer, loss='mse', metrics=['mae'])
+        self.compile(model)
         return model
 
-    def fit(self, X, y, validation_split=0.2, callbacks=None):
+    def compile(self, model=None):
+        """
+        Compiles the Keras model with a fresh optimizer at the current learning rate.
+        Use this after ``load`` to fine-tune a trained model with a new learning rate.
+        """
+        model = model if model is not None else self.model
+        optimizer = tf.keras.optimizers.Adam(learning_rate=self.learning_rate)
+        if self.precision == "mixed_float16":
+            # float16 gradients underflow without loss scaling
+            optimizer = tf.keras.optimizers.LossScaleOptimizer(optimizer)
+        model.compile(
+            optimizer=optimizer, loss='mse', metrics=['mae'],
+            jit_compile=self.jit_compile, steps_per_execution=self.steps_per_execution
+        )
+
+    def make_dataset(self, X, y, shuffle=False, cache=False):
+        """
+        Builds a batched ``tf.data`` pipeline over in-memory arrays.
+        
+        Batches are gathered from the arrays one whole batch at a time, so the
+        per-row cost of element-wise pipelines is avoided.
+        
+        Args:
+            X (np.ndarray): Feature matrix.
+            y (np.ndarray): Target vector.
+            shuffle (bool): Visit the rows in a new random order every epoch.
+            cache (bool): Keep the batches after the first epoch instead of gathering them again.
+            
+        Returns:
+            tf.data.Dataset: Batches of ``(features, targets)`` in float32.
+        """
+        # Converting once up front avoids a per-batch cast inside the pipeline;
+        # arrays that are already float32 are used without a copy
+        targets = np.asarray(y, dtype=np.float32)
+        if self.n_members > 1:
+            # A column, so every member's (batch, n_members) output is compared to the same target
+            targets = targets.reshape(-1, 1)
+        data = (
+            tf.convert_to_tensor(np.asarray(X, dtype=np.float32)),
+            tf.convert_to_tensor(targets),
+        )
+        n_samples = X.shape[0]
+        batch_size = self.batch_size
+        n_full_batches = n_samples // batch_size
+        # A stateful generator hands every pass over the dataset its own shuffle seed. A fixed
+        # op seed would repeat the same order each epoch, since the map is re-run from scratch.
+        if shuffle:
+            generator = (tf.random.Generator.from_seed(self.seed) if self.seed is not None
+                         else tf.random.Generator.from_non_deterministic_state())
+
+        def epoch_order(_):
+            # Evaluated on every pass over the dataset, so each epoch gets a new order
+            order = tf.range(n_samples, dtype=tf.int64)
+            if shuffle:
+                order = tf.random.experimental.stateless_shuffle(order, seed=generator.make_seeds(1)[:, 0])
+            return order
+
+        def batch_indices(order):
+            # Reshaping the full batches at once is much cheaper than slicing per batch
+            full = tf.reshape(order[:n_full_batches * batch_size], [n_full_batches, batch_size])
+            batches = tf.data.Dataset.from_tensor_slices(full)
+            if n_samples % batch_size:
+                batches = batches.concatenate(tf.data.Dataset.from_tensors(order[n_full_batches * batch_size:]))
+            return batches
+
+        def gather(rows, data):
+            return tf.gather(data[0], rows), tf.gather(data[1], rows)
+
+        indices = tf.data.Dataset.range(1).map(epoch_order).prefetch(1).flat_map(batch_indices)
+        dataset = tf.data.Dataset.zip((indices, tf.data.Dataset.from_tensors(data).repeat()))
+        dataset = dataset.map(gather, num_parallel_calls=tf.data.AUTOTUNE)
+        # flat_map hides the length; declaring it lets Keras size epochs up front
+        n_batches = n_full_batches + (1 if n_samples % batch_size else 0)
+        dataset = dataset.apply(tf.data.experimental.assert_cardinality(n_batches))
+        if cache:
+            dataset = dataset.cache()
+
+        # The pipeline is already minimal; skipping the static graph rewrites saves their overhead
+        options = tf.data.Options()
+        options.experimental_optimization.apply_default_optimizations = False
+        if shuffle:
+            options.experimental_external_state_policy = tf.data.experimental.ExternalStatePolicy.IGNORE
+        dataset = dataset.with_options(options)
+        return dataset.prefetch(tf.data.AUTOTUNE)
+
+    def fit(self, X, y, validation_split=0.2, callbacks=None, validation_data=None, initial_epoch=0):
         """
         Trains the model on the provided data.
         
         Args:
             X (np.ndarray): Feature matrix.
             y (np.ndarray): Target vector.
-            validation_split (float): Fraction of data to use for validation.
+            validation_split (float): Fraction of data to use for validation if no
+                ``validation_data`` is given. The last rows are held out, as Keras does.
             callbacks (list): List of Keras callbacks.
+            validation_data (tuple): Optional ``(X_val, y_val)`` held-out set, e.g. from ``split_data``.
+            initial_epoch (int): Epoch to start from when resuming an interrupted run.
             
         Returns:
             history: Training history.
         """
         if self.model is None:
-            self._build_model(X.shape[1])
             self.model = self._build_model(X.shape[1])
+
+        if validation_data is None and validation_split:
+            # Slicing gives views, so holding out rows does not copy the data
+            n_train = int(X.shape[0] * (1 - validation_split))
+            validation_data = (X[n_train:], y[n_train:])
+            X, y = X[:n_train], y[:n_train]
+
+        train_dataset = self.make_dataset(X, y, shuffle=True)
+        val_dataset = None
+        if validation_data is not None:
+            val_dataset = self.make_dataset(*validation_data, cache=True)
             
         # Early stopping to prevent overfitting and save time
         early_stopping = tf.keras.callbacks.EarlyStopping(
-            monitor='val_loss',
-            patience=10,
+            monitor='val_loss' if val_dataset is not None else 'loss',
+            patience=self.patience,
             restore_best_weights=True
         )
         
@@ -66,43 +328,101 @@ class FiveDNet:
             final_callbacks.extend(callbacks)
         
         history = self.model.fit(
-            X, y,
+            train_dataset,
             epochs=self.max_epochs,
-            batch_size=self.batch_size,
-            validation_split=validation_split,
+            initial_epoch=initial_epoch,
+            validation_data=val_dataset,
             callbacks=final_callbacks,
+            # The dataset already reshuffles every epoch; Keras cannot shuffle a tf.data.Dataset
+            shuffle=False,
             verbose=self.verbose
         )
         
         return history
 
-    def predict(self, X):
+    def predict(self, X, batch_size=None):
         """
         Generates predictions for the input samples.
         
         Args:
             X (np.ndarray): Feature matrix.
+            batch_size (int): Number of samples per forward pass. Defaults to the Keras default (32).
+            
+        Returns:
+            np.ndarray: Predicted values. For an ensemble, the mean over its members.
+        """
+        if self.model is None:
+            raise ValueError("Model has not been trained yet.")
+            
+        if self.n_members > 1:
+            return self.predict_members(X, batch_size=batch_size).mean(axis=1)
+        return self.model.predict(X, batch_size=batch_size, verbose=0).flatten()
+
+    def predict_members(self, X, batch_size=None):
+        """
+        Generates the predictions of every ensemble member in one forward pass.
+        
+        Args:
+            X (np.ndarray): Feature matrix.
+            batch_size (int): Number of samples per forward pass. Defaults to the Keras default (32).
+            
+        Returns:
+            np.ndarray: (n_samples, n_members) predicted values.
+        """
+        if self.model is None:
+            raise ValueError("Model has not been trained yet.")
             
+        return self.model.predict(X, batch_size=batch_size, verbose=0).reshape(len(X), -1)
+    
+    def export_weights(self):
+        """
+        Exports the kernels, biases and activations of the Dense layers.
+        
         Returns:
-            np.ndarray: Predicted values.
+            list: (kernel, bias, activation) tuples ordered from input to output.
+            For an ensemble, kernels are (n_members, in, out) and biases (n_members, out).
         """
         if self.model is None:
             raise ValueError("Model has not been trained yet.")
             
-        return self.model.predict(X, verbose=1).flatten()
+        return [
+            (layer.kernel.numpy(), layer.bias.numpy(), layer.get_config()["activation"])
+            for layer in self._dense_layers()
+        ]
+
+    def _dense_layers(self):
+        return [
+            layer for layer in self.model.layers
+            if isinstance(layer, (tf.keras.layers.Dense, EnsembleDense))
+        ]
     
     def save(self, filepath):
         """
         Saves the model to the specified filepath.
+        If a scaler is attached, its parameters are stored inside the same archive
+        so the weights and the standardization can never drift apart.
         """
         if self.model is None:
             raise ValueError("Model has not been trained yet.")
         self.model.save(filepath)
         
+        if self.scaler is not None:
+            with zipfile.ZipFile(filepath, 'a') as archive:
+                archive.writestr(SCALER_ENTRY, json.dumps(self.scaler.to_dict()))
+        
     def load(self, filepath):
         """
-        Loads the model from the specified filepath.
+        Loads the model, and its scaler if one was saved with it, from the specified filepath.
         """
         if not os.path.exists(filepath):
              raise FileNotFoundError(f"File not found: {filepath}")
         self.model = tf.keras.models.load_model(filepath)
+        dense_layers = self._dense_layers()
+        self.hidden_layers = [layer.units for layer in dense_layers][:-1]
+        self.n_members = getattr(dense_layers[0], "n_members", 1)
+        self.precision = dense_layers[0].dtype_policy.name
+        
+        self.scaler = None
+        with zipfile.ZipFile(filepath) as archive:
+            if SCALER_ENTRY in archive.namelist():
+                self.scaler = Scaler().from_dict(json.loads(archive.read(SCALER_ENTRY)))
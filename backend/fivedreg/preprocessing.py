@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+
+from .data import Scaler, load_dataset, prepare_dataset
+from .datasets import ARRAY_FILES, dataset_digest
+
+# Files of a cache entry: the prepared arrays (train, validation and test rows in
+# that order), the scaler fitted on the training rows and the metadata
+SCALER_FILE = "scaler.bin"
+METADATA_FILE = "metadata.json"
+
+
+class PreprocessingCache:
+    """
+    On-disk cache of split and standardized datasets, shared by training runs.
+
+    An entry is keyed by the dataset's content hash, the split ratios, the seed and
+    the dtype, and holds the output of ``prepare_dataset`` as ``.npy`` files that
+    are memory-mapped on a hit, so a repeat run on the same data skips straight to
+    fitting. Entries are written to a temporary directory and renamed into place,
+    so worker processes can share the cache. Once the entries exceed ``budget_bytes``
+    the least recently used ones are deleted.
+    """
+
+    def __init__(self, root_dir, budget_bytes=2 * 1024 * 1024 * 1024):
+        """
+        Args:
+            root_dir (str): Directory holding one sub-directory per entry.
+            budget_bytes (int): Total size of the entries kept on disk.
+        """
+        self.root_dir = root_dir
+        self.budget_bytes = budget_bytes
+        os.makedirs(root_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(dataset_hash, train_ratio=0.7, val_ratio=0.15, test_ratio=0.15, seed=42, dtype=np.float32):
+        """
+        Returns the key of a dataset prepared with the given split and dtype.
+        """
+        parts = [dataset_hash, train_ratio, val_ratio, test_ratio, seed, np.dtype(dtype).name]
+        return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+    def _entry_dir(self, key):
+        if not key or os.sep in key or key.startswith("."):
+            raise KeyError(f"Invalid cache key: {key!r}")
+        return os.path.join(self.root_dir, key)
+
+    def get(self, key):
+        """
+        Returns the cached arrays for ``key`` in the form ``prepare_dataset`` returns them,
+        memory-mapped, or None on a miss.
+        """
+        entry_dir = self._entry_dir(key)
+        metadata_path = os.path.join(entry_dir, METADATA_FILE)
+        try:
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+            X, y = (np.load(os.path.join(entry_dir, name), mmap_mode="r") for name in ARRAY_FILES)
+            scaler = Scaler().load(os.path.join(entry_dir, SCALER_FILE))
+            # The modification time of the metadata records the last use, for eviction
+            os.utime(metadata_path)
+        except FileNotFoundError:
+            # Not cached, or evicted while being read
+            return None
+
+        n_train, n_val = metadata["n_train"], metadata["n_val"]
+        return {
+            "X_train": X[:n_train],
+            "y_train": y[:n_train],
+            "X_val": X[n_train:n_train + n_val],
+            "y_val": y[n_train:n_train + n_val],
+            "X_test": X[n_train + n_val:],
+            "y_test": y[n_train + n_val:],
+            "scaler": scaler,
+            "n_dropped": metadata["n_dropped"],
+            "data_mb": metadata["size_bytes"] / 1024 / 1024,
+            "peak_mb": None,
+        }
+
+    def put(self, key, data):
+        """
+        Stores the output of ``prepare_dataset`` under ``key`` and evicts old entries.
+        An entry larger than the whole budget is not stored.
+        """
+        size_bytes = sum(data[name].nbytes for name in ("X_train", "X_val", "X_test", "y_train", "y_val", "y_test"))
+        if size_bytes > self.budget_bytes:
+            return
+
+        tmp_dir = os.path.join(self.root_dir, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        try:
+            for name, parts in zip(ARRAY_FILES, (("X_train", "X_val", "X_test"), ("y_train", "y_val", "y_test"))):
+                first = data[parts[0]]
+                n_rows = sum(data[part].shape[0] for part in parts)
+                out = np.lib.format.open_memmap(os.path.join(tmp_dir, name), mode="w+", dtype=first.dtype,
+                                                shape=(n_rows,) + first.shape[1:])
+                offset = 0
+                for part in parts:
+                    out[offset:offset + data[part].shape[0]] = data[part]
+                    offset += data[part].shape[0]
+                out.flush()
+                del out
+            data["scaler"].save(os.path.join(tmp_dir, SCALER_FILE))
+            with open(os.path.join(tmp_dir, METADATA_FILE), "w") as f:
+                json.dump({"key": key, "n_train": data["X_train"].shape[0], "n_val": data["X_val"].shape[0],
+                           "n_dropped": data["n_dropped"], "size_bytes": size_bytes, "created_at": time.time()}, f)
+            os.rename(tmp_dir, self._entry_dir(key))
+        except OSError:
+            # Another process stored the same entry first
+            if not os.path.isdir(self._entry_dir(key)):
+                raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict(keep=key)
+
+    def entries(self):
+        """
+        Returns the metadata of every entry, least recently used first, with its ``last_used`` time.
+        """
+        result = []
+        for name in os.listdir(self.root_dir):
+            metadata_path = os.path.join(self.root_dir, name, METADATA_FILE)
+            if name.startswith("."):
+                continue
+            try:
+                with open(metadata_path) as f:
+                    metadata = json.load(f)
+                metadata["last_used"] = os.path.getmtime(metadata_path)
+            except FileNotFoundError:
+                continue
+            result.append(metadata)
+        return sorted(result, key=lambda metadata: metadata["last_used"])
+
+    def usage(self):
+        """
+        Returns the total size in bytes of the cached arrays.
+        """
+        return sum(metadata["size_bytes"] for metadata in self.entries())
+
+    def evict(self, keep=None):
+        """
+        Deletes the least recently used entries, other than ``keep``, until the rest fit the budget.
+        Arrays already memory-mapped from a deleted entry stay readable until they are released.
+        """
+        entries = self.entries()
+        total = sum(metadata["size_bytes"] for metadata in entries)
+        for metadata in entries:
+            if total <= self.budget_bytes:
+                break
+            if metadata["key"] == keep:
+                continue
+            shutil.rmtree(self._entry_dir(metadata["key"]), ignore_errors=True)
+            total -= metadata["size_bytes"]
+
+    def clear(self):
+        """
+        Deletes every entry.
+        """
+        for metadata in self.entries():
+            shutil.rmtree(self._entry_dir(metadata["key"]), ignore_errors=True)
+
+    def prepare(self, data_path, dataset_hash=None, train_ratio=0.7, val_ratio=0.15, test_ratio=0.15, seed=42,
+                dtype=np.float32):
+        """
+        Returns a dataset split and standardized by ``prepare_dataset``, from the cache if possible.
+
+        Args:
+            data_path (str): Path of the dataset, readable by ``load_dataset``.
+            dataset_hash (str): Content hash of the dataset, if known (e.g. from the dataset
+                store). Otherwise the file is hashed, which reads it once but does not parse it.
+            Other arguments are passed on to ``prepare_dataset``.
+
+        Returns:
+            dict: As returned by ``prepare_dataset``, with ``cached`` set on a hit.
+        """
+        if dataset_hash is None:
+            dataset_hash = dataset_digest(data_path)
+        key = self.make_key(dataset_hash, train_ratio, val_ratio, test_ratio, seed, dtype)
+        data = self.get(key)
+        if data is not None:
+            print(f"Using preprocessed data from cache entry {key[:12]}")
+            return {**data, "cached": True}
+
+        X, y = load_dataset(data_path, drop_missing=False)
+        data = prepare_dataset(X, y, train_ratio, val_ratio, test_ratio, seed, dtype=dtype)
+        del X, y
+        self.put(key, data)
+        return {**data, "cached": False}
@@ -0,0 +1,200 @@
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# Name of the file in the registry root that holds the promoted version
+ACTIVE_FILE = "ACTIVE"
+METADATA_FILE = "metadata.json"
+
+
+def directory_size(path):
+    """
+    Returns the total size in bytes of the files below ``path``.
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def read_metadata(artifact_dir):
+    """
+    Returns the metadata stored with a published version.
+    """
+    with open(os.path.join(artifact_dir, METADATA_FILE)) as f:
+        return json.load(f)
+
+
+class ModelRegistry:
+    """
+    Versioned, immutable model artifacts on disk with an in-memory LRU of loaded models.
+
+    Each version is a directory under ``root_dir`` that is fully written to a
+    temporary location and then renamed into place, so readers never see a
+    partially written artifact. The promoted version is recorded in an
+    ``ACTIVE`` file that is replaced atomically. Loaded models are kept in
+    memory until their estimated size pushes the total over ``memory_budget_bytes``,
+    at which point the least recently used ones are dropped.
+    """
+
+    def __init__(self, root_dir, loader, memory_budget_bytes=512 * 1024 * 1024, sizeof=None):
+        """
+        Args:
+            root_dir (str): Directory holding one sub-directory per version.
+            loader (callable): Function ``(artifact_dir) -> model`` that loads a version.
+            memory_budget_bytes (int): Budget for the estimated size of all loaded models.
+            sizeof (callable): Function ``(artifact_dir, model) -> int`` estimating a loaded
+                model's size. Defaults to the size of the artifact on disk.
+        """
+        self.root_dir = root_dir
+        self.loader = loader
+        self.memory_budget_bytes = memory_budget_bytes
+        self.sizeof = sizeof or (lambda artifact_dir, model: directory_size(artifact_dir))
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _version_dir(self, version):
+        if not version or os.sep in version or version.startswith("."):
+            raise KeyError(f"Invalid model version: {version!r}")
+        return os.path.join(self.root_dir, version)
+
+    def artifact_path(self, version, name):
+        """
+        Returns the path of a file inside a published version.
+        """
+        return os.path.join(self._version_dir(version), name)
+
+    def publish(self, files, metadata=None):
+        """
+        Copies artifact files into a new immutable version.
+
+        Args:
+            files (dict): Mapping of artifact file name to the source path to copy.
+            metadata (dict): Optional JSON-serializable information stored with the version.
+
+        Returns:
+            str: The new version identifier.
+        """
+        version = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:8]
+        tmp_dir = os.path.join(self.root_dir, f".tmp-{version}")
+        os.makedirs(tmp_dir)
+        try:
+            for name, source in files.items():
+                shutil.copyfile(source, os.path.join(tmp_dir, name))
+            with open(os.path.join(tmp_dir, METADATA_FILE), "w") as f:
+                json.dump({"version": version, "created_at": time.time(), **(metadata or {})}, f)
+            os.rename(tmp_dir, self._version_dir(version))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return version
+
+    def versions(self):
+        """
+        Returns the metadata of every published version, oldest first.
+        """
+        result = []
+        for name in os.listdir(self.root_dir):
+            metadata_path = os.path.join(self.root_dir, name, METADATA_FILE)
+            if not name.startswith(".") and os.path.exists(metadata_path):
+                result.append(read_metadata(os.path.join(self.root_dir, name)))
+        # Names only have second resolution, so order by the recorded creation time
+        return sorted(result, key=lambda metadata: (metadata["created_at"], metadata["version"]))
+
+    def metadata(self, version):
+        """
+        Returns the metadata of a published version.
+        """
+        if not self.exists(version):
+            raise KeyError(f"Unknown model version: {version}")
+        return read_metadata(self._version_dir(version))
+
+    def exists(self, version):
+        try:
+            return os.path.exists(os.path.join(self._version_dir(version), METADATA_FILE))
+        except KeyError:
+            return False
+
+    def active_version(self):
+        """
+        Returns the promoted version, or None if nothing has been promoted yet.
+        """
+        try:
+            with open(os.path.join(self.root_dir, ACTIVE_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def promote(self, version):
+        """
+        Records ``version`` as the active version with a single atomic file replace.
+        """
+        if not self.exists(version):
+            raise KeyError(f"Unknown model version: {version}")
+        tmp_path = os.path.join(self.root_dir, f".{ACTIVE_FILE}-{uuid.uuid4().hex}")
+        with open(tmp_path, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self.root_dir, ACTIVE_FILE))
+
+    def get(self, version):
+        """
+        Returns the loaded model for ``version``, loading it if needed.
+        """
+        with self._lock:
+            if version in self._loaded:
+                self._loaded.move_to_end(version)
+                return self._loaded[version][0]
+
+        if not self.exists(version):
+            raise KeyError(f"Unknown model version: {version}")
+
+        # Load outside the lock so other versions stay available meanwhile
+        artifact_dir = self._version_dir(version)
+        model = self.loader(artifact_dir)
+        if model is None:
+            raise RuntimeError(f"Failed to load model version {version}")
+        size = self.sizeof(artifact_dir, model)
+
+        with self._lock:
+            if version in self._loaded:
+                return self._loaded[version][0]
+            self._loaded[version] = (model, size)
+            self._evict(keep=version)
+        return model
+
+    def _evict(self, keep):
+        total = sum(size for _, size in self._loaded.values())
+        for version in list(self._loaded):
+            if total <= self.memory_budget_bytes:
+                break
+            if version == keep:
+                continue
+            total -= self._loaded.pop(version)[1]
+            print(f"Evicted model version {version} from memory.")
+
+    def loaded_versions(self):
+        """
+        Returns the versions currently held in memory, least recently used first.
+        """
+        with self._lock:
+            return list(self._loaded)
+
+    def memory_usage(self):
+        """
+        Returns the estimated size in bytes of all loaded models.
+        """
+        with self._lock:
+            return sum(size for _, size in self._loaded.values())
+
+    def unload_all(self):
+        """
+        Drops every loaded model from memory. Artifacts on disk are kept.
+        """
+        with self._lock:
+            self._loaded.clear()
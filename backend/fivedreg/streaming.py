@@ -0,0 +1,149 @@
+import os
+import pickle
+import queue
+import threading
+
+import numpy as np
+
+# Extensions accepted by iter_feature_chunks
+SUPPORTED_EXTENSIONS = (".npy", ".csv", ".pkl", ".pickle")
+
+
+def _iter_npy_chunks(fileobj, chunk_size, n_features):
+    """
+    Reads a C-ordered ``.npy`` stream row block by row block.
+    Only ``chunk_size`` rows are held in memory at a time.
+    """
+    version = np.lib.format.read_magic(fileobj)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fileobj)
+    elif version == (2, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fileobj)
+    else:
+        raise ValueError(f"Unsupported .npy format version: {version}")
+
+    if len(shape) != 2 or shape[1] != n_features:
+        raise ValueError(f"Expected an (N, {n_features}) array, got shape {shape}")
+    if fortran_order:
+        raise ValueError("Fortran-ordered .npy files cannot be streamed; save them in C order.")
+    if dtype.hasobject:
+        raise ValueError("Object arrays are not supported.")
+
+    row_bytes = dtype.itemsize * n_features
+    remaining = shape[0]
+    while remaining > 0:
+        n_rows = min(chunk_size, remaining)
+        data = fileobj.read(n_rows * row_bytes)
+        if len(data) != n_rows * row_bytes:
+            raise ValueError("The .npy file is truncated.")
+        yield np.frombuffer(data, dtype=dtype).reshape(n_rows, n_features)
+        remaining -= n_rows
+
+
+def _iter_csv_chunks(fileobj, chunk_size, n_features):
+    """
+    Reads a numeric CSV file (with or without a header row) in chunks.
+    """
+    import pandas as pd
+
+    first_line = fileobj.readline()
+    fileobj.seek(0)
+    try:
+        [float(value) for value in first_line.decode().strip().split(",")]
+        header = None
+    except ValueError:
+        header = 0
+
+    for frame in pd.read_csv(fileobj, header=header, chunksize=chunk_size):
+        if frame.shape[1] != n_features:
+            raise ValueError(f"Expected {n_features} columns, got {frame.shape[1]}")
+        yield frame.to_numpy(dtype=np.float64)
+
+
+def _iter_pickle_chunks(fileobj, chunk_size, n_features):
+    """
+    Loads a pickled array (or a dict with an 'X' entry) and yields it in chunks.
+    Pickles cannot be read partially, so the whole array is loaded first, and
+    unpickling runs arbitrary code, so only trusted files may be read this way.
+    """
+    data = pickle.load(fileobj)
+    X = np.asarray(data["X"] if isinstance(data, dict) else data)
+    if X.ndim != 2 or X.shape[1] != n_features:
+        raise ValueError(f"Expected an (N, {n_features}) array, got shape {X.shape}")
+    for start in range(0, X.shape[0], chunk_size):
+        yield X[start:start + chunk_size]
+
+
+def iter_feature_chunks(fileobj, filename, chunk_size, n_features=5, allow_pickle=False):
+    """
+    Yields (n_rows, n_features) blocks of a feature file.
+
+    Args:
+        fileobj: Binary file-like object positioned at the start of the file.
+        filename (str): Name of the file, used to pick the format from its extension.
+        chunk_size (int): Maximum number of rows per block.
+        n_features (int): Expected number of features per row.
+        allow_pickle (bool): Accept pickle files. Loading a pickle can execute arbitrary
+            code and is not memory-bounded, so only enable this for trusted input.
+
+    Yields:
+        np.ndarray: Feature blocks in file order.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".npy":
+        return _iter_npy_chunks(fileobj, chunk_size, n_features)
+    if extension == ".csv":
+        return _iter_csv_chunks(fileobj, chunk_size, n_features)
+    if extension in (".pkl", ".pickle"):
+        if not allow_pickle:
+            raise ValueError("Pickle files are not accepted; upload a .npy or .csv file instead.")
+        return _iter_pickle_chunks(fileobj, chunk_size, n_features)
+    raise ValueError(f"Unsupported file type {extension!r}. Expected one of {SUPPORTED_EXTENSIONS}")
+
+
+_END = object()
+
+
+def prefetch(iterable, depth=2):
+    """
+    Runs an iterator in a background thread, keeping up to ``depth`` items ready.
+    This overlaps producing the next item (e.g. reading a chunk) with consuming the current one.
+    Exceptions raised by the iterator are re-raised in the consumer.
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        # Give up if the consumer has gone away, instead of blocking forever
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_END)
+        except BaseException as e:
+            put(e)
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,316 @@
+import itertools
+import json
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from .data import Scaler
+
+# Every model backend implements the FiveDNet regressor interface:
+#   fit(X, y), predict(X, batch_size=None) -> (n,) predictions, save(filepath),
+#   and the ``scaler`` and ``n_members`` attributes.
+# Like FiveDNet, fit and predict take standardized features; the fitted scaler
+# is kept on the model and saved with it. SciPy is only imported when a
+# surrogate is fitted or loaded.
+
+# Name of the neural network backend, trained by ``train_fivednet``
+FIVEDNET_BACKEND = "fivednet"
+
+
+class SurrogateRegressor(ABC):
+    """
+    Base class of the closed-form and interpolating alternatives to FiveDNet.
+
+    Subclasses set ``name``, implement ``fit`` and ``predict`` and describe their
+    fitted state through ``get_params``, ``_arrays`` and ``_restore``.
+    """
+    name = None
+    n_members = 1
+
+    def __init__(self):
+        # Fitted Scaler for the model's inputs, saved and loaded together with the model
+        self.scaler = None
+
+    @abstractmethod
+    def get_params(self):
+        """
+        Returns the constructor arguments of the model.
+        """
+
+    @abstractmethod
+    def fit(self, X, y):
+        """
+        Fits the model to standardized features and returns it.
+        """
+
+    @abstractmethod
+    def predict(self, X, batch_size=None):
+        """
+        Returns the (n,) predictions for standardized features.
+        """
+
+    @abstractmethod
+    def _arrays(self):
+        """
+        Returns the arrays needed to restore the fitted model.
+        """
+
+    @abstractmethod
+    def _restore(self, arrays):
+        """
+        Restores the fitted model from the arrays returned by ``_arrays``.
+        """
+
+    def save(self, filepath):
+        """
+        Saves the fitted model, and its scaler if one is attached, to a ``.npz`` file.
+        """
+        arrays = self._arrays()
+        config = {"backend": self.name, "params": self.get_params()}
+        if self.scaler is not None:
+            config["scaler"] = self.scaler.to_dict()
+        with open(filepath, "wb") as f:
+            np.savez(f, config=np.array(json.dumps(config)), **arrays)
+
+
+class RBFRegressor(SurrogateRegressor):
+    """
+    Radial basis function interpolation with ``scipy.interpolate.RBFInterpolator``.
+
+    Global interpolation solves a dense system over all training points, so it is
+    limited to ``max_points`` rows; set ``neighbors`` to interpolate from the nearest
+    points only on larger datasets. The training points are saved and the
+    interpolant is rebuilt when the model is loaded.
+    """
+    name = "rbf"
+
+    def __init__(self, kernel="thin_plate_spline", neighbors=None, smoothing=0.0, epsilon=None, degree=1,
+                 max_points=5000):
+        """
+        Args:
+            kernel (str): RBF kernel, e.g. "thin_plate_spline", "cubic" or "gaussian".
+            neighbors (int): Number of nearest points each prediction uses. None uses all points.
+            smoothing (float): Smoothing parameter; 0 interpolates the training targets exactly.
+            epsilon (float): Shape parameter, required by kernels that are not scale-invariant.
+            degree (int): Degree of the added polynomial.
+            max_points (int): Largest training set accepted for global interpolation.
+        """
+        super().__init__()
+        self.kernel = kernel
+        self.neighbors = neighbors
+        self.smoothing = smoothing
+        self.epsilon = epsilon
+        self.degree = degree
+        self.max_points = max_points
+        self._points = None
+        self._values = None
+        self._interpolator = None
+
+    def get_params(self):
+        return {"kernel": self.kernel, "neighbors": self.neighbors, "smoothing": self.smoothing,
+                "epsilon": self.epsilon, "degree": self.degree, "max_points": self.max_points}
+
+    def fit(self, X, y):
+        if self.neighbors is None and X.shape[0] > self.max_points:
+            raise ValueError(
+                f"Global RBF interpolation is limited to {self.max_points} points, got {X.shape[0]}. "
+                "Set neighbors to interpolate locally."
+            )
+        self._restore({"points": X, "values": y})
+        return self
+
+    def predict(self, X, batch_size=None):
+        if self._interpolator is None:
+            raise ValueError("Model has not been trained yet.")
+        return self._interpolator(np.asarray(X, dtype=np.float64))
+
+    def _arrays(self):
+        return {"points": self._points, "values": self._values}
+
+    def _restore(self, arrays):
+        from scipy.interpolate import RBFInterpolator
+
+        self._points = np.asarray(arrays["points"], dtype=np.float64)
+        self._values = np.asarray(arrays["values"], dtype=np.float64)
+        self._interpolator = RBFInterpolator(
+            self._points, self._values, neighbors=self.neighbors, smoothing=self.smoothing,
+            kernel=self.kernel, epsilon=self.epsilon, degree=self.degree
+        )
+
+
+class KNNRegressor(SurrogateRegressor):
+    """
+    k-nearest-neighbour interpolation over a ``scipy.spatial.cKDTree``.
+
+    Training only builds the tree; the tree is rebuilt when the model is loaded.
+    """
+    name = "knn"
+
+    def __init__(self, k=8, weights="distance", workers=1):
+        """
+        Args:
+            k (int): Number of neighbours averaged per prediction.
+            weights (str): "uniform" for a plain mean, "distance" for inverse-distance weights.
+            workers (int): Threads used per query (-1 for all cores).
+        """
+        super().__init__()
+        if weights not in ("uniform", "distance"):
+            raise ValueError(f"Unknown weights {weights!r}. Expected 'uniform' or 'distance'.")
+        self.k = k
+        self.weights = weights
+        self.workers = workers
+        self._values = None
+        self._tree = None
+
+    def get_params(self):
+        return {"k": self.k, "weights": self.weights, "workers": self.workers}
+
+    def fit(self, X, y):
+        if not 1 <= self.k <= X.shape[0]:
+            raise ValueError(f"k must be between 1 and the number of samples ({X.shape[0]}). Got {self.k}")
+        self._restore({"points": X, "values": y})
+        return self
+
+    def predict(self, X, batch_size=None):
+        if self._tree is None:
+            raise ValueError("Model has not been trained yet.")
+
+        distances, indices = self._tree.query(np.asarray(X, dtype=np.float64), k=self.k, workers=self.workers)
+        if self.k == 1:
+            return self._values[indices]
+        neighbours = self._values[indices]
+        if self.weights == "uniform":
+            return neighbours.mean(axis=1)
+
+        exact = distances == 0
+        with np.errstate(divide="ignore"):
+            weights = 1.0 / distances
+        # A query that coincides with training points takes their value
+        hits = exact.any(axis=1)
+        weights[hits] = exact[hits]
+        return np.sum(weights * neighbours, axis=1) / np.sum(weights, axis=1)
+
+    def _arrays(self):
+        return {"points": self._tree.data, "values": self._values}
+
+    def _restore(self, arrays):
+        from scipy.spatial import cKDTree
+
+        self._values = np.asarray(arrays["values"], dtype=np.float64)
+        self._tree = cKDTree(np.asarray(arrays["points"], dtype=np.float64))
+
+
+class RidgeRegressor(SurrogateRegressor):
+    """
+    Closed-form ridge regression on polynomial features of the inputs.
+
+    The normal equations are accumulated in chunks, so the feature matrix of a
+    large dataset is never materialized. The intercept is not penalized.
+    """
+    name = "ridge"
+
+    def __init__(self, alpha=1e-3, degree=2, chunk_size=65536):
+        """
+        Args:
+            alpha (float): L2 penalty on the coefficients.
+            degree (int): Highest total degree of the polynomial features (1 is linear).
+            chunk_size (int): Rows expanded into features at a time.
+        """
+        super().__init__()
+        if degree < 1:
+            raise ValueError(f"degree must be at least 1. Got {degree}")
+        self.alpha = alpha
+        self.degree = degree
+        self.chunk_size = chunk_size
+        self._exponents = None
+        self._coefficients = None
+
+    def get_params(self):
+        return {"alpha": self.alpha, "degree": self.degree, "chunk_size": self.chunk_size}
+
+    def _features(self, X):
+        # Products of the inputs selected by each term, e.g. (0, 0, 3) is x0 * x0 * x3
+        features = np.ones((X.shape[0], len(self._exponents)))
+        for i, term in enumerate(self._exponents):
+            for j in term:
+                features[:, i] *= X[:, j]
+        return features
+
+    def fit(self, X, y):
+        n_features = X.shape[1]
+        self._exponents = [
+            term for degree in range(self.degree + 1)
+            for term in itertools.combinations_with_replacement(range(n_features), degree)
+        ]
+        n_terms = len(self._exponents)
+        gram = np.zeros((n_terms, n_terms))
+        moments = np.zeros(n_terms)
+        for start in range(0, X.shape[0], self.chunk_size):
+            features = self._features(np.asarray(X[start:start + self.chunk_size], dtype=np.float64))
+            gram += features.T @ features
+            moments += features.T @ np.asarray(y[start:start + self.chunk_size], dtype=np.float64)
+
+        penalty = np.full(n_terms, self.alpha)
+        penalty[0] = 0.0
+        self._coefficients = np.linalg.solve(gram + np.diag(penalty), moments)
+        return self
+
+    def predict(self, X, batch_size=None):
+        if self._coefficients is None:
+            raise ValueError("Model has not been trained yet.")
+        return self._features(np.asarray(X, dtype=np.float64)) @ self._coefficients
+
+    def _arrays(self):
+        # Terms have different lengths, so they are padded with -1
+        exponents = np.full((len(self._exponents), self.degree), -1, dtype=np.int64)
+        for i, term in enumerate(self._exponents):
+            exponents[i, :len(term)] = term
+        return {"exponents": exponents, "coefficients": self._coefficients}
+
+    def _restore(self, arrays):
+        self._exponents = [tuple(int(j) for j in row if j >= 0) for row in arrays["exponents"]]
+        self._coefficients = np.asarray(arrays["coefficients"], dtype=np.float64)
+
+
+# Surrogate backends by name
+SURROGATES = {cls.name: cls for cls in (RBFRegressor, KNNRegressor, RidgeRegressor)}
+
+# Every backend /train can select
+BACKENDS = (FIVEDNET_BACKEND,) + tuple(SURROGATES)
+
+
+def make_surrogate(backend, params=None):
+    """
+    Creates an unfitted surrogate.
+
+    Args:
+        backend (str): Name of the backend, one of ``SURROGATES``.
+        params (dict): Constructor arguments of the backend.
+
+    Raises:
+        ValueError: If the backend is unknown or the arguments are invalid.
+    """
+    if backend not in SURROGATES:
+        raise ValueError(f"Unknown surrogate backend {backend!r}. Expected one of {tuple(SURROGATES)}")
+    try:
+        return SURROGATES[backend](**(params or {}))
+    except TypeError as e:
+        raise ValueError(f"Invalid parameters for {backend}: {e}")
+
+
+def load_surrogate(filepath):
+    """
+    Loads a surrogate, and its scaler if one was saved with it, from a file written by ``save``.
+    """
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"File not found: {filepath}")
+
+    with np.load(filepath) as data:
+        config = json.loads(str(data["config"]))
+        arrays = {name: data[name] for name in data.files if name != "config"}
+    model = make_surrogate(config["backend"], config["params"])
+    model._restore(arrays)
+    if "scaler" in config:
+        model.scaler = Scaler().from_dict(config["scaler"])
+    return model
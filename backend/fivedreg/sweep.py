@@ -0,0 +1,239 @@
+import itertools
+import math
+import os
+import random
+import time
+from concurrent.futures import CancelledError, as_completed
+
+import numpy as np
+
+from .training import MODEL_ARTIFACT, NUMPY_ARTIFACT, SCALER_ARTIFACT, measure_latency
+
+# Hyperparameters a search space may vary
+SEARCH_PARAMETERS = ("hidden_layers", "learning_rate", "batch_size")
+
+# Files of the preprocessed split shared by all trials of a sweep
+SPLIT_ARRAYS = ("X_train", "y_train", "X_val", "y_val")
+
+
+def _sample(values, rng):
+    """
+    Draws one value from a list of candidates or a ``{"low", "high", "log"}`` range.
+    """
+    if isinstance(values, dict):
+        low, high = values["low"], values["high"]
+        if values.get("log"):
+            value = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            value = rng.uniform(low, high)
+        return int(round(value)) if isinstance(low, int) and isinstance(high, int) else value
+    return rng.choice(values)
+
+
+def expand_search_space(space, strategy="grid", n_trials=None, seed=None):
+    """
+    Turns a search space into the list of trial configurations to run.
+
+    Args:
+        space (dict): Maps each hyperparameter in ``SEARCH_PARAMETERS`` to a list of candidate
+            values. For random search a numeric parameter may instead be a range
+            ``{"low": ..., "high": ..., "log": bool}``.
+        strategy (str): "grid" for every combination, "random" for ``n_trials`` samples.
+        n_trials (int): Number of random samples, or an optional cap on the grid size.
+        seed (int): Seed for random search.
+
+    Returns:
+        list: Dicts of hyperparameters, one per trial.
+    """
+    unknown = set(space) - set(SEARCH_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown hyperparameters {sorted(unknown)}. Expected some of {SEARCH_PARAMETERS}")
+    for name, values in space.items():
+        if isinstance(values, dict):
+            if strategy != "random" or not {"low", "high"} <= set(values):
+                raise ValueError(f"{name}: ranges need 'low' and 'high' and are only supported for random search.")
+        elif not isinstance(values, list) or not values:
+            raise ValueError(f"{name}: expected a non-empty list of candidate values.")
+
+    names = list(space)
+    if strategy == "grid":
+        trials = [dict(zip(names, combination)) for combination in itertools.product(*space.values())]
+        return trials[:n_trials] if n_trials else trials
+    if strategy == "random":
+        if not n_trials or n_trials < 1:
+            raise ValueError("Random search needs a positive n_trials.")
+        rng = random.Random(seed)
+        return [{name: _sample(space[name], rng) for name in names} for _ in range(n_trials)]
+    raise ValueError(f"Unknown search strategy {strategy!r}. Expected 'grid' or 'random'.")
+
+
+def prepare_split(data_path, output_dir):
+    """
+    Loads, splits and standardizes a dataset once and stores the result for all trials.
+
+    Args:
+        data_path (str): Path of the dataset file, readable by ``load_dataset``.
+        output_dir (str): Existing directory to write the arrays and the scaler to.
+
+    Returns:
+        str: ``output_dir``, to be passed to ``run_trial``.
+    """
+    from .data import load_dataset, prepare_dataset
+
+    X, y = load_dataset(data_path, drop_missing=False)
+    data = prepare_dataset(X, y, save_path=os.path.join(output_dir, SCALER_ARTIFACT), dtype=np.float32)
+    for name in SPLIT_ARRAYS:
+        np.save(os.path.join(output_dir, name + ".npy"), data[name])
+    return output_dir
+
+
+def run_trial(split_dir, trial_dir, params, max_epochs, patience=5, prune_after=10, prune_ratio=3.0,
+              best_loss=None, cancel_event=None):
+    """
+    Trains one configuration on a split written by ``prepare_split``.
+
+    A trial is pruned when, after ``prune_after`` epochs, its validation loss is still
+    more than ``prune_ratio`` times the best validation loss of the finished trials.
+
+    Args:
+        split_dir (str): Directory written by ``prepare_split``.
+        trial_dir (str): Existing directory to write the trial's artifacts to.
+        params (dict): Hyperparameters of the trial.
+        max_epochs (int): Maximum number of training epochs.
+        patience (int): Epochs without improvement before the trial stops early.
+        prune_after (int): Epochs before a trial may be pruned.
+        prune_ratio (float): How much worse than the best trial a trial may be before it is pruned.
+        best_loss: Object whose ``value`` is the best validation loss so far,
+            e.g. a multiprocessing manager ``Value``. Pruning is off without it.
+        cancel_event: Optional event; once set, the trial stops at the next batch boundary.
+
+    Returns:
+        dict: ``params``, ``status`` ("completed", "pruned" or "cancelled"), ``val_loss``,
+        ``epochs``, ``train_time``, ``inference_latency_ms`` and the artifact ``files``.
+    """
+    import tensorflow as tf
+    from .data import Scaler
+    from .inference import NumpyMLP
+    from .model import CancelCallback, FiveDNet
+
+    result = {"params": params, "status": "cancelled", "val_loss": None, "epochs": 0,
+              "train_time": None, "inference_latency_ms": None, "files": {}}
+    if cancel_event is not None and cancel_event.is_set():
+        return result
+
+    # Memory-mapped, so concurrent trials share the page cache instead of each reading a copy
+    X_train, y_train, X_val, y_val = (
+        np.load(os.path.join(split_dir, name + ".npy"), mmap_mode="r") for name in SPLIT_ARRAYS
+    )
+
+    model = FiveDNet(
+        hidden_layers=params.get("hidden_layers", [64, 32, 16]),
+        learning_rate=params.get("learning_rate", 0.001),
+        batch_size=params.get("batch_size", 32),
+        max_epochs=max_epochs,
+        patience=patience,
+        verbose=0,
+    )
+
+    pruned = []
+
+    def prune(epoch, logs):
+        val_loss = (logs or {}).get("val_loss")
+        if best_loss is None or val_loss is None or epoch + 1 < prune_after:
+            return
+        if val_loss > prune_ratio * best_loss.value:
+            pruned.append(epoch + 1)
+            model.model.stop_training = True
+
+    callbacks = [tf.keras.callbacks.LambdaCallback(on_epoch_end=prune)]
+    cancel = None
+    if cancel_event is not None:
+        cancel = CancelCallback(cancel_event.is_set)
+        callbacks.append(cancel)
+
+    start = time.perf_counter()
+    history = model.fit(X_train, y_train, callbacks=callbacks, validation_data=(X_val, y_val))
+    result["train_time"] = time.perf_counter() - start
+
+    val_losses = history.history.get("val_loss", [])
+    result["epochs"] = len(history.history.get("loss", []))
+    result["val_loss"] = float(min(val_losses)) if val_losses else None
+    if cancel is not None and cancel.cancelled:
+        return result
+    result["status"] = "pruned" if pruned else "completed"
+
+    model.scaler = Scaler()
+    model.scaler.load(os.path.join(split_dir, SCALER_ARTIFACT))
+    engine = NumpyMLP.from_fivednet(model, model.scaler)
+    result["inference_latency_ms"] = measure_latency(engine, X_train.shape[1])
+
+    if result["status"] == "completed":
+        files = {
+            MODEL_ARTIFACT: os.path.join(trial_dir, MODEL_ARTIFACT),
+            NUMPY_ARTIFACT: os.path.join(trial_dir, NUMPY_ARTIFACT),
+            SCALER_ARTIFACT: os.path.join(trial_dir, SCALER_ARTIFACT),
+        }
+        model.save(files[MODEL_ARTIFACT])
+        engine.save(files[NUMPY_ARTIFACT])
+        model.scaler.save(files[SCALER_ARTIFACT])
+        result["files"] = files
+    return result
+
+
+def leaderboard(results):
+    """
+    Orders trial results: completed trials by validation loss, then pruned, cancelled and failed ones.
+    """
+    rank = {"completed": 0, "pruned": 1, "cancelled": 2, "failed": 3}
+
+    def key(result):
+        val_loss = result.get("val_loss")
+        return rank.get(result["status"], 4), val_loss if val_loss is not None else math.inf
+
+    return sorted(results, key=key)
+
+
+def run_sweep(executor, split_dir, output_dir, trials, max_epochs, patience=5, prune_after=10, prune_ratio=3.0,
+              best_loss=None, cancel_event=None, on_result=None):
+    """
+    Runs every trial on ``executor`` and collects the leaderboard.
+
+    Args:
+        executor: ``concurrent.futures`` executor running the trials, typically a process pool.
+        split_dir (str): Directory written by ``prepare_split``.
+        output_dir (str): Directory to create one sub-directory per trial in.
+        trials (list): Hyperparameter dicts, e.g. from ``expand_search_space``.
+        best_loss: Shared object whose ``value`` tracks the best validation loss, used for pruning.
+        on_result (callable): Called with the current leaderboard whenever a trial finishes.
+        Other arguments are passed on to ``run_trial``.
+
+    Returns:
+        list: The final leaderboard, one result dict (with its ``trial`` index) per trial.
+    """
+    futures = {}
+    for i, params in enumerate(trials):
+        trial_dir = os.path.join(output_dir, f"trial-{i}")
+        os.makedirs(trial_dir, exist_ok=True)
+        future = executor.submit(
+            run_trial, split_dir, trial_dir, params, max_epochs, patience, prune_after, prune_ratio,
+            best_loss, cancel_event
+        )
+        futures[future] = (i, params)
+
+    results = []
+    for future in as_completed(futures):
+        i, params = futures[future]
+        try:
+            result = future.result()
+        except CancelledError:
+            result = {"params": params, "status": "cancelled", "val_loss": None}
+        except Exception as e:
+            result = {"params": params, "status": "failed", "val_loss": None, "error": str(e)}
+        result["trial"] = i
+
+        if result["status"] == "completed" and best_loss is not None and result["val_loss"] is not None:
+            best_loss.value = min(best_loss.value, result["val_loss"])
+        results.append(result)
+        if on_result is not None:
+            on_result(leaderboard(results))
+    return leaderboard(results)
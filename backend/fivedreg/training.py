@@ -0,0 +1,328 @@
+import json
+import os
+import time
+
+import numpy as np
+
+# Functions in this module, prepare_split and run_trial in fivedreg.sweep, and
+# prepare_cv and run_fold in fivedreg.cv run inside training worker processes.
+# They must be importable without side effects, import TensorFlow only in their
+# bodies so the serving process never loads it, and only talk to the serving
+# process through their arguments, return values and the progress queue.
+
+# File names of the artifacts written by train_fivednet
+MODEL_ARTIFACT = "model.keras"
+NUMPY_ARTIFACT = "model.npz"
+SCALER_ARTIFACT = "scaler.bin"
+
+# File name of a trained surrogate (see ``fivedreg.surrogates``), which embeds its scaler
+SURROGATE_ARTIFACT = "surrogate.npz"
+
+# File names of a training checkpoint: the model (with its optimizer state) and the progress so far
+CHECKPOINT_MODEL = "checkpoint.keras"
+CHECKPOINT_STATE = "checkpoint.json"
+
+
+def parse_cpu_list(spec):
+    """
+    Parses a CPU list such as ``"0-3,6"`` into a set of CPU indices.
+    """
+    cpus = set()
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, stop = part.split("-")
+            cpus.update(range(int(start), int(stop) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def configure_worker(n_threads=None, cpus=None):
+    """
+    Process pool initializer limiting the CPUs and threads a training worker may use.
+
+    Args:
+        n_threads (int): Maximum number of threads for TensorFlow and OpenMP.
+        cpus (set): CPU indices the worker is pinned to (Linux only).
+    """
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+    if n_threads:
+        for var in ("OMP_NUM_THREADS", "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS"):
+            os.environ[var] = str(n_threads)
+
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(n_threads)
+
+
+def measure_latency(model, n_features, repeats=50):
+    """
+    Returns the median time in milliseconds of a single-row prediction.
+    """
+    row = np.zeros((1, n_features), dtype=np.float32)
+    model.predict(row)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+def save_checkpoint(model, directory, epoch, history):
+    """
+    Writes a checkpoint of a FiveDNet after ``epoch`` completed epochs.
+    Files are written under temporary names and renamed into place, so a crash
+    while saving leaves the previous checkpoint intact.
+    """
+    model_path = os.path.join(directory, CHECKPOINT_MODEL)
+    state_path = os.path.join(directory, CHECKPOINT_STATE)
+    # Keras requires the .keras extension on the file it writes
+    tmp_model_path = os.path.join(directory, ".tmp-" + CHECKPOINT_MODEL)
+    model.save(tmp_model_path)
+    with open(state_path + ".tmp", "w") as f:
+        json.dump({"epoch": epoch, "loss_history": history}, f)
+    os.replace(tmp_model_path, model_path)
+    os.replace(state_path + ".tmp", state_path)
+
+
+def has_checkpoint(directory):
+    """
+    Returns whether ``directory`` holds a complete checkpoint.
+    """
+    return all(os.path.exists(os.path.join(directory, name)) for name in (CHECKPOINT_MODEL, CHECKPOINT_STATE))
+
+
+def load_checkpoint(directory):
+    """
+    Loads a checkpoint written by ``save_checkpoint``.
+
+    Returns:
+        tuple: (FiveDNet, state) where state holds ``epoch`` and ``loss_history``,
+        or None if the directory holds no checkpoint.
+    """
+    from .model import FiveDNet
+
+    if not has_checkpoint(directory):
+        return None
+    with open(os.path.join(directory, CHECKPOINT_STATE)) as f:
+        state = json.load(f)
+    model = FiveDNet()
+    model.load(os.path.join(directory, CHECKPOINT_MODEL))
+    return model, state
+
+
+def train_fivednet(data_path, output_dir, hidden_layers, epochs, learning_rate, progress_queue=None,
+                   cancel_event=None, batch_size=32, base_model_path=None, checkpoint_dir=None,
+                   checkpoint_every=1, resume_from=None, n_members=1, jit_compile="auto", precision="float32",
+                   steps_per_execution=1, preprocessing_cache=None, dataset_hash=None):
+    """
+    Trains a FiveDNet on a dataset file and writes its artifacts to ``output_dir``.
+
+    Args:
+        data_path (str): Path of the dataset file, readable by ``load_dataset``.
+        output_dir (str): Existing directory to write the artifacts to.
+        hidden_layers (list): Number of neurons in each hidden layer. Ignored when
+            starting from a base model or a checkpoint.
+        epochs (int): Maximum number of training epochs.
+        learning_rate (float): Learning rate for the optimizer.
+        progress_queue: Optional queue receiving ``(epoch, logs)`` after every epoch.
+        cancel_event: Optional event; once set, training stops at the next batch boundary.
+        batch_size (int): Number of samples per training batch.
+        base_model_path (str): Optional saved FiveDNet to fine-tune. Its weights are the
+            starting point and its scaler is reused, so inputs are scaled as before.
+        checkpoint_dir (str): Optional existing directory to save checkpoints to.
+        checkpoint_every (int): Save a checkpoint after every ``checkpoint_every`` epochs.
+        resume_from (str): Optional checkpoint directory of an interrupted run to continue.
+        n_members (int): Number of ensemble members trained together in one fused model.
+            Ignored when starting from a base model or a checkpoint.
+        jit_compile (bool or str): Passed on to ``FiveDNet``. Ignored when resuming a checkpoint.
+        precision (str): Dtype policy passed on to ``FiveDNet``. A base model or a checkpoint
+            keeps the precision it was trained with.
+        steps_per_execution (int): Passed on to ``FiveDNet``. Ignored when resuming a checkpoint.
+        preprocessing_cache (PreprocessingCache): Optional cache of prepared datasets. Used
+            for new models only, since base models and checkpoints keep their own scaler.
+        dataset_hash (str): Content hash of the dataset for the cache, if already known.
+
+    Returns:
+        dict: ``backend``, ``final_loss``, ``val_loss`` (best validation loss), ``cancelled``,
+        ``hidden_layers``, ``n_members``, ``initial_epoch``, ``train_time``, ``inference_latency_ms``
+        (NumPy engine, single row) and ``files``, a mapping of artifact name to path.
+        No artifacts are written for a cancelled run.
+    """
+    from .data import load_dataset, prepare_dataset
+    from .inference import NumpyMLP
+    from .model import CancelCallback, CheckpointCallback, FiveDNet, ProgressCallback
+
+    if cancel_event is not None and cancel_event.is_set():
+        return {"backend": "fivednet", "final_loss": None, "val_loss": None, "cancelled": True,
+                "hidden_layers": hidden_layers, "n_members": n_members, "initial_epoch": 0, "train_time": None,
+                "inference_latency_ms": None, "files": {}}
+
+    scaler_file = os.path.join(output_dir, SCALER_ARTIFACT)
+    model_file = os.path.join(output_dir, MODEL_ARTIFACT)
+    numpy_file = os.path.join(output_dir, NUMPY_ARTIFACT)
+
+    # Pick the starting point: a checkpoint (with its optimizer state), a base model, or random weights
+    initial_epoch = 0
+    loss_history = []
+    checkpoint = load_checkpoint(resume_from) if resume_from else None
+    if checkpoint is not None:
+        model, state = checkpoint
+        initial_epoch = state["epoch"]
+        loss_history = state["loss_history"]
+    elif resume_from:
+        raise FileNotFoundError(f"No checkpoint found in {resume_from}")
+    elif base_model_path:
+        model = FiveDNet()
+        model.load(base_model_path)
+        if model.scaler is None:
+            raise ValueError(f"Base model {base_model_path} has no scaler to reuse.")
+        model.learning_rate = learning_rate
+        model.jit_compile = jit_compile
+        model.steps_per_execution = steps_per_execution
+        model.compile()
+    else:
+        model = FiveDNet(hidden_layers=hidden_layers, n_members=n_members, jit_compile=jit_compile,
+                         precision=precision, steps_per_execution=steps_per_execution)
+    model.max_epochs = epochs
+    model.batch_size = batch_size
+    model.verbose = 0
+
+    # A resumed or fine-tuned model keeps the input scaling its weights were trained with
+    if preprocessing_cache is not None and model.scaler is None:
+        data = preprocessing_cache.prepare(data_path, dataset_hash, dtype=np.float32)
+        data["scaler"].save(scaler_file)
+    else:
+        X, y = load_dataset(data_path, drop_missing=False)
+        data = prepare_dataset(X, y, scaler=model.scaler, save_path=scaler_file, dtype=np.float32)
+        del X, y
+    X_train_scaled, y_train = data["X_train"], data["y_train"]
+    X_val_scaled, y_val = data["X_val"], data["y_val"]
+    # Keep the scaler with the model so both are saved (and checkpointed) together
+    model.scaler = data["scaler"]
+
+    def report(epoch, logs):
+        if progress_queue is not None:
+            progress_queue.put((epoch, {key: float(value) for key, value in logs.items()}))
+
+    # Replay the progress of the interrupted run so the job shows the whole curve
+    for entry in loss_history:
+        report(entry["epoch"] - 1, {"loss": entry["loss"]})
+
+    callbacks = [ProgressCallback(report)]
+    if checkpoint_dir and checkpoint_every > 0:
+        def save(epoch, history):
+            save_checkpoint(model, checkpoint_dir, epoch, history)
+
+        callbacks.append(CheckpointCallback(save, every=checkpoint_every, history=loss_history))
+    cancel = None
+    if cancel_event is not None:
+        cancel = CancelCallback(cancel_event.is_set)
+        callbacks.append(cancel)
+
+    start = time.perf_counter()
+    history = model.fit(
+        X_train_scaled, y_train, callbacks=callbacks, validation_data=(X_val_scaled, y_val),
+        initial_epoch=initial_epoch
+    )
+    train_time = time.perf_counter() - start
+
+    if history and hasattr(history, 'history') and history.history.get('loss'):
+        final_loss = float(history.history['loss'][-1])
+    elif loss_history:
+        final_loss = loss_history[-1]["loss"]
+    else:
+        final_loss = 0.0
+
+    val_losses = history.history.get('val_loss') if history and hasattr(history, 'history') else None
+    result = {
+        "backend": "fivednet",
+        "final_loss": final_loss,
+        # Early stopping restores the weights of the best epoch
+        "val_loss": float(min(val_losses)) if val_losses else None,
+        "cancelled": False,
+        "hidden_layers": model.hidden_layers,
+        "n_members": model.n_members,
+        "initial_epoch": initial_epoch,
+        "train_time": train_time,
+        "inference_latency_ms": None,
+        "files": {},
+    }
+    if cancel is not None and cancel.cancelled:
+        result["cancelled"] = True
+        return result
+
+    model.save(model_file)
+    engine = NumpyMLP.from_fivednet(model, model.scaler)
+    engine.save(numpy_file)
+    result["inference_latency_ms"] = measure_latency(engine, X_train_scaled.shape[1])
+    result["files"] = {MODEL_ARTIFACT: model_file, NUMPY_ARTIFACT: numpy_file, SCALER_ARTIFACT: scaler_file}
+    return result
+
+
+def train_surrogate(data_path, output_dir, backend, params=None, cancel_event=None, preprocessing_cache=None,
+                    dataset_hash=None):
+    """
+    Fits a surrogate backend (see ``fivedreg.surrogates``) on a dataset file and writes
+    its artifacts to ``output_dir``.
+
+    Uses the same split and standardization as ``train_fivednet``, so validation
+    losses of all backends are comparable.
+
+    Args:
+        data_path (str): Path of the dataset file, readable by ``load_dataset``.
+        output_dir (str): Existing directory to write the artifacts to.
+        backend (str): Name of the surrogate, e.g. "rbf", "knn" or "ridge".
+        params (dict): Constructor arguments of the surrogate.
+        cancel_event: Optional event checked before and after fitting; surrogates
+            fit in a single call and cannot be interrupted in between.
+        preprocessing_cache (PreprocessingCache): Optional cache of prepared datasets.
+        dataset_hash (str): Content hash of the dataset for the cache, if already known.
+
+    Returns:
+        dict: The same keys as ``train_fivednet``. ``final_loss`` is the training MSE.
+    """
+    from .data import load_dataset, prepare_dataset
+    from .surrogates import make_surrogate
+
+    model = make_surrogate(backend, params)
+    result = {"backend": backend, "final_loss": None, "val_loss": None, "cancelled": True, "hidden_layers": None,
+              "n_members": 1, "initial_epoch": 0, "train_time": None, "inference_latency_ms": None, "files": {}}
+    if cancel_event is not None and cancel_event.is_set():
+        return result
+
+    scaler_file = os.path.join(output_dir, SCALER_ARTIFACT)
+    surrogate_file = os.path.join(output_dir, SURROGATE_ARTIFACT)
+
+    # The surrogates solve in float64, so the data is prepared in float64 too
+    if preprocessing_cache is not None:
+        data = preprocessing_cache.prepare(data_path, dataset_hash, dtype=np.float64)
+        data["scaler"].save(scaler_file)
+    else:
+        X, y = load_dataset(data_path, drop_missing=False)
+        data = prepare_dataset(X, y, save_path=scaler_file, dtype=np.float64)
+        del X, y
+    X_train_scaled, y_train = data["X_train"], data["y_train"]
+    X_val_scaled, y_val = data["X_val"], data["y_val"]
+    model.scaler = data["scaler"]
+
+    start = time.perf_counter()
+    model.fit(X_train_scaled, y_train)
+    result["train_time"] = time.perf_counter() - start
+    if cancel_event is not None and cancel_event.is_set():
+        return result
+
+    result["cancelled"] = False
+    result["final_loss"] = float(np.mean((model.predict(X_train_scaled) - y_train) ** 2))
+    result["val_loss"] = float(np.mean((model.predict(X_val_scaled) - y_val) ** 2))
+    result["inference_latency_ms"] = measure_latency(model, X_train_scaled.shape[1])
+
+    model.save(surrogate_file)
+    result["files"] = {SURROGATE_ARTIFACT: surrogate_file, SCALER_ARTIFACT: scaler_file}
+    return result
@@ -1,9 +1,12 @@
+import asyncio
+import threading
 import time
 from typing import Any, Dict, List
 
-import uvicorn
-from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 # --- FastAPI App ---
@@ -29,17 +32,54 @@ app.add_middleware(
 async def health_check():
     return {"status": "healthy"}
 
+# Readiness check endpoint
+@app.get("/ready")
+async def readiness_check():
+    """
+    Reports whether a warmed-up model is in service.
+    Unlike /health, this returns 503 until traffic can actually be served.
+    """
+    if models.get("my_nn_model") is None:
+        raise HTTPException(status_code=503, detail="Model is not loaded.")
+    return {"status": "ready"}
+
 # Test endpoint
 @app.get("/api/test")
 async def test_endpoint():
     return {"message": "Hello from the backend!"}
 
-from fivedreg.data import load_dataset, split_data, standardize_data, Scaler
-from fivedreg.model import FiveDNet
+# TensorFlow is only imported (through fivedreg.model) when a training job
+# starts or a Keras model is loaded, so the API starts serving in well under
+# a second. Keep module-level imports here free of TensorFlow.
+from fivedreg.data import Scaler
+from fivedreg.datasets import DatasetStore
+from fivedreg.preprocessing import PreprocessingCache
+from fivedreg.batching import MicroBatcher
+from fivedreg.cache import LRUCache, PredictionCache
+from fivedreg.inference import NumpyMLP
+from fivedreg.jobs import Job, JobCancelled, JobManager, QueueFullError
+from fivedreg.registry import ModelRegistry, read_metadata
+from fivedreg.surrogates import BACKENDS, FIVEDNET_BACKEND, load_surrogate, make_surrogate
+from fivedreg.training import (
+    MODEL_ARTIFACT, NUMPY_ARTIFACT, SURROGATE_ARTIFACT, configure_worker, has_checkpoint,
+    parse_cpu_list, train_fivednet, train_surrogate
+)
+from fivedreg.streaming import iter_feature_chunks, prefetch
+from fivedreg.sweep import expand_search_space, prepare_split, run_sweep
+from fivedreg.cv import cross_validate, prepare_cv
+from fivedreg.codecs import decode_features, encode_predictions, negotiate_media_type, parse_media_type
+import itertools
+import json
+import multiprocessing
+import pickle
+import queue
 import shutil
 import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import numpy as np
-from fastapi import UploadFile, File
+from fastapi import UploadFile, File, Form
 
 # --- Global Objects ---
 
@@ -47,20 +87,124 @@ from fastapi import UploadFile, File
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, "saved_model.keras")
 SCALER_PATH = os.path.join(BASE_DIR, "scaler_params.json")
+NUMPY_MODEL_PATH = os.path.join(BASE_DIR, "saved_model.npz")
 DATA_DIR = os.path.join(BASE_DIR, "data")
 
+# Uploaded datasets are stored by content hash under DATASET_STORE_DIR, with their
+# parsed arrays cached as .npy files, and linked into DATA_DIR under their file name
+# unless a file the store did not create (e.g. a bundled dataset) already has that name.
+DATASET_STORE_DIR = os.environ.get("DATASET_STORE_DIR", os.path.join(DATA_DIR, "store"))
+
+# Training runs cache their split and standardized arrays under PREPROCESSING_CACHE_DIR,
+# keyed by dataset hash, split and dtype, so repeat runs on a dataset skip preprocessing.
+# Least recently used entries are deleted beyond PREPROCESSING_CACHE_MB (0 disables the cache).
+PREPROCESSING_CACHE_DIR = os.environ.get("PREPROCESSING_CACHE_DIR", os.path.join(BASE_DIR, "preprocessed"))
+PREPROCESSING_CACHE_MB = float(os.environ.get("PREPROCESSING_CACHE_MB", "2048"))
+
+# Versioned model artifacts. Each training run publishes an immutable version
+# directory holding these files; loaded versions are kept in memory within
+# MODEL_MEMORY_BUDGET_MB (estimated from artifact size).
+MODEL_REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR", os.path.join(BASE_DIR, "models"))
+MODEL_MEMORY_BUDGET_MB = float(os.environ.get("MODEL_MEMORY_BUDGET_MB", "512"))
+
+# Training runs in a separate pool of worker processes so it never competes with
+# prediction serving for the GIL. Each worker is limited to TRAINING_THREADS
+# threads and, optionally, pinned to the CPUs in TRAINING_CPUS (e.g. "2-3").
+TRAINING_WORKERS = int(os.environ.get("TRAINING_WORKERS", "1"))
+TRAINING_THREADS = int(os.environ.get("TRAINING_THREADS", str(max(1, (os.cpu_count() or 2) // 2))))
+TRAINING_CPUS = os.environ.get("TRAINING_CPUS", "")
+
+# Training job queue: jobs running at the same time (defaults to one per worker)
+# and jobs allowed to wait for a slot before /train answers 429.
+TRAINING_MAX_CONCURRENT_JOBS = int(os.environ.get("TRAINING_MAX_CONCURRENT_JOBS", str(TRAINING_WORKERS)))
+TRAINING_MAX_QUEUED_JOBS = int(os.environ.get("TRAINING_MAX_QUEUED_JOBS", "8"))
+
+# Hyperparameter sweeps run their trials in a separate pool of up to SWEEP_WORKERS
+# processes, each capped at SWEEP_TRIAL_THREADS threads. A sweep may have at most
+# MAX_SWEEP_TRIALS trials.
+SWEEP_WORKERS = int(os.environ.get("SWEEP_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+SWEEP_TRIAL_THREADS = int(os.environ.get("SWEEP_TRIAL_THREADS", "1"))
+MAX_SWEEP_TRIALS = int(os.environ.get("MAX_SWEEP_TRIALS", "100"))
+
+# Cross-validation jobs train their folds in parallel in a separate pool of up to
+# CV_WORKERS processes, each capped at CV_FOLD_THREADS threads, with at most MAX_CV_FOLDS folds.
+CV_WORKERS = int(os.environ.get("CV_WORKERS", str(SWEEP_WORKERS)))
+CV_FOLD_THREADS = int(os.environ.get("CV_FOLD_THREADS", str(SWEEP_TRIAL_THREADS)))
+MAX_CV_FOLDS = int(os.environ.get("MAX_CV_FOLDS", "20"))
+
+# Largest ensemble /train accepts; an ensemble costs about as much as one network n_members times wider
+MAX_ENSEMBLE_MEMBERS = int(os.environ.get("MAX_ENSEMBLE_MEMBERS", "32"))
+
+# Training jobs save a checkpoint every TRAINING_CHECKPOINT_EVERY epochs (0 disables)
+# to TRAINING_CHECKPOINT_DIR/<job_id>. A job whose worker crashes is resumed from its
+# checkpoint up to TRAINING_MAX_RETRIES times; other interrupted jobs can be resumed
+# through /train with resume_job_id. Checkpoints are removed once a job succeeds.
+TRAINING_CHECKPOINT_DIR = os.environ.get("TRAINING_CHECKPOINT_DIR", os.path.join(BASE_DIR, "checkpoints"))
+TRAINING_CHECKPOINT_EVERY = int(os.environ.get("TRAINING_CHECKPOINT_EVERY", "5"))
+TRAINING_MAX_RETRIES = int(os.environ.get("TRAINING_MAX_RETRIES", "1"))
+
+# Compilation settings of the models /train builds (see scripts/benchmark.py --compare-modes):
+# XLA ("auto", "true" or "false"), the dtype policy ("float32", "mixed_bfloat16" or
+# "mixed_float16") and the number of batches per call into the compiled training step.
+TRAINING_JIT_COMPILE = os.environ.get("TRAINING_JIT_COMPILE", "auto").lower()
+TRAINING_JIT_COMPILE = {"true": True, "false": False}.get(TRAINING_JIT_COMPILE, TRAINING_JIT_COMPILE)
+TRAINING_PRECISION = os.environ.get("TRAINING_PRECISION", "float32")
+TRAINING_STEPS_PER_EXECUTION = int(os.environ.get("TRAINING_STEPS_PER_EXECUTION", "1"))
+
+# Which engine serves predictions: "keras" (FiveDNet) or "numpy" (exported
+# weights with the scaler folded in, no TensorFlow needed at serving time).
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "keras")
+
+# Number of rows sent to the model in a single forward pass by /predict/batch.
+PREDICT_CHUNK_SIZE = int(os.environ.get("PREDICT_CHUNK_SIZE", "8192"))
+
+# Micro-batching of concurrent single-point /predict calls.
+# Requests are held for at most PREDICT_BATCH_MAX_WAIT_MS or until
+# PREDICT_BATCH_MAX_SIZE rows are waiting, then served in one forward pass.
+PREDICT_MICROBATCH = os.environ.get("PREDICT_MICROBATCH", "1") == "1"
+PREDICT_BATCH_MAX_SIZE = int(os.environ.get("PREDICT_BATCH_MAX_SIZE", "64"))
+PREDICT_BATCH_MAX_WAIT_MS = float(os.environ.get("PREDICT_BATCH_MAX_WAIT_MS", "2"))
+
+# Accept pickled feature files in /predict/file. Unpickling an upload can run
+# arbitrary code and loads the whole file at once, so only enable this for trusted clients.
+PREDICT_FILE_ALLOW_PICKLE = os.environ.get("PREDICT_FILE_ALLOW_PICKLE", "0") == "1"
+
+# Optional LRU cache of single-point predictions. Feature vectors are rounded
+# to PREDICTION_CACHE_TOLERANCE before lookup; a size of 0 disables the cache.
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TOLERANCE = float(os.environ.get("PREDICTION_CACHE_TOLERANCE", "1e-6"))
+
+# Slices evaluated by /predict/slice are memoized per model (0 disables),
+# and a single slice may contain at most MAX_SLICE_POINTS grid points.
+SLICE_CACHE_SIZE = int(os.environ.get("SLICE_CACHE_SIZE", "64"))
+MAX_SLICE_POINTS = int(os.environ.get("MAX_SLICE_POINTS", "1000000"))
+
+# Load the saved model at startup, and the batch sizes used for warm-up
+# forward passes before a model is put into service.
+PRELOAD_MODEL = os.environ.get("PRELOAD_MODEL", "1") == "1"
+WARMUP_BATCH_SIZES = [
+    int(size) for size in os.environ.get(
+        "WARMUP_BATCH_SIZES", f"1,{PREDICT_BATCH_MAX_SIZE},{PREDICT_CHUNK_SIZE}"
+    ).split(",") if size.strip()
+]
+
 # Dictionary to hold loaded model(s).
 # Loading them into memory at startup is much faster than loading on every request.
 models: Dict[str, Any] = {}
+# The registry version currently in service (None for a model loaded from MODEL_PATH)
+serving_state: Dict[str, Any] = {"version": None}
 # Global variable to hold the loaded dataset
-loaded_data: Dict[str, Any] = {"X": None, "y": None}
+# The selected dataset, used by training jobs that are not given a data_path
+loaded_data: Dict[str, Any] = {"X": None, "y": None, "path": None, "name": None, "sha256": None}
 
 
 # --- Functions ---
 
-def load_model(model_path: str = MODEL_PATH) -> Any:
+def load_model(model_path: str = MODEL_PATH, scaler_path: str = SCALER_PATH) -> Any:
     """
     Loads your neural network model from a file path.
+    The scaler is loaded once here and kept on the model, so predictions do no file I/O.
+    Models saved without an embedded scaler fall back to the standalone scaler file.
     """
     print(f"Loading model from {model_path}...")
     
@@ -69,8 +213,14 @@ def load_model(model_path: str = MODEL_PATH) -> Any:
         return None
 
     try:
+        from fivedreg.model import FiveDNet
+
         model = FiveDNet()
         model.load(model_path)
+        if model.scaler is None and os.path.exists(scaler_path):
+            print(f"No scaler embedded in model, loading {scaler_path}.")
+            model.scaler = Scaler()
+            model.scaler.load(scaler_path)
         print("Model loaded successfully.")
         return model
     except Exception as e:
@@ -78,9 +228,133 @@ def load_model(model_path: str = MODEL_PATH) -> Any:
         return None
 
 
-def run_prediction(model: Any, features: List[float], config: Dict | None) -> float:
+def load_numpy_model(model_path: str = NUMPY_MODEL_PATH, keras_path: str | None = MODEL_PATH) -> Any:
+    """
+    Loads the exported NumPy inference engine from a file path.
+    If only the Keras model at ``keras_path`` exists, it is exported once with the scaler folded in.
+    """
+    print(f"Loading NumPy engine from {model_path}...")
+
+    try:
+        if not os.path.exists(model_path):
+            if keras_path is None or not os.path.exists(keras_path):
+                print(f"Model file {model_path} not found.")
+                return None
+            print(f"Exporting {keras_path} to {model_path}...")
+            export_numpy_model(load_model(keras_path), model_path)
+
+        engine = NumpyMLP()
+        engine.load(model_path)
+        print("NumPy engine loaded successfully.")
+        return engine
+    except Exception as e:
+        print(f"Failed to load NumPy engine: {e}")
+        return None
+
+
+def load_surrogate_model(model_path: str) -> Any:
+    """
+    Loads a surrogate backend (RBF, kNN or ridge) together with its embedded scaler.
+    """
+    print(f"Loading surrogate from {model_path}...")
+    try:
+        model = load_surrogate(model_path)
+        print(f"Surrogate ({model.name}) loaded successfully.")
+        return model
+    except Exception as e:
+        print(f"Failed to load surrogate: {e}")
+        return None
+
+
+def export_numpy_model(model: Any, model_path: str = NUMPY_MODEL_PATH):
+    """
+    Exports the Dense weights of a trained FiveDNet, folding in its scaler if it has one.
+    """
+    NumpyMLP.from_fivednet(model, model.scaler).save(model_path)
+
+
+def load_artifact(artifact_dir: str) -> Any:
+    """
+    Loads one registry version. Surrogates are loaded as they are; FiveDNet
+    versions are loaded for the configured INFERENCE_BACKEND.
+    """
+    backend = read_metadata(artifact_dir).get("backend", FIVEDNET_BACKEND)
+    if backend != FIVEDNET_BACKEND:
+        return load_surrogate_model(os.path.join(artifact_dir, SURROGATE_ARTIFACT))
+    if INFERENCE_BACKEND == "numpy":
+        return load_numpy_model(os.path.join(artifact_dir, NUMPY_ARTIFACT), keras_path=None)
+    return load_model(os.path.join(artifact_dir, MODEL_ARTIFACT))
+
+
+# Registry of versioned model artifacts and the loaded models kept in memory
+model_registry = ModelRegistry(
+    MODEL_REGISTRY_DIR,
+    loader=load_artifact,
+    memory_budget_bytes=int(MODEL_MEMORY_BUDGET_MB * 1024 * 1024),
+)
+
+# Content-addressed store of uploaded datasets
+dataset_store = DatasetStore(DATASET_STORE_DIR, link_dir=DATA_DIR)
+
+# Prepared training arrays shared by training runs, passed on to the worker processes
+preprocessing_cache = PreprocessingCache(
+    PREPROCESSING_CACHE_DIR, budget_bytes=int(PREPROCESSING_CACHE_MB * 1024 * 1024)
+) if PREPROCESSING_CACHE_MB > 0 else None
+
+
+def select_dataset(key: str) -> Dict[str, Any]:
+    """
+    Makes a stored dataset, by name or hash, the one training uses by default.
+    Its cached arrays are memory-mapped, so selecting a dataset reads nothing up front.
+    """
+    metadata = dataset_store.metadata(key)
+    X, y = dataset_store.load(key)
+    loaded_data["X"] = X
+    loaded_data["y"] = y
+    loaded_data["path"] = dataset_store.path(key)
+    loaded_data["name"] = metadata.get("name")
+    loaded_data["sha256"] = metadata["sha256"]
+    return metadata
+
+
+def load_serving_model() -> Any:
+    """
+    Loads the model for the configured INFERENCE_BACKEND.
+    This is the promoted registry version if there is one, otherwise the model at MODEL_PATH.
+    """
+    version = model_registry.active_version()
+    if version is not None:
+        try:
+            return model_registry.get(version)
+        except Exception as e:
+            print(f"Failed to load model version {version}: {e}")
+            return None
+    if INFERENCE_BACKEND == "numpy":
+        return load_numpy_model(NUMPY_MODEL_PATH)
+    return load_model(MODEL_PATH)
+
+
+def scale_features(model: Any, features: np.ndarray) -> np.ndarray:
+    """
+    Standardizes raw features with the scaler held in memory alongside the model.
+    The NumPy engine has the scaler folded into its first layer, so its inputs are left as they are.
+    """
+    if isinstance(model, NumpyMLP):
+        return features
+
+    scaler = getattr(model, "scaler", None)
+    if scaler is None:
+        print("Warning: Model has no scaler. Using raw features.")
+        return features
+    return scaler.transform(features)
+
+
+def run_prediction(model: Any, features: List[float], config: Dict | None) -> tuple:
     """
     Runs the actual prediction using the loaded model.
+
+    Returns:
+        tuple: (prediction, spread). The spread across ensemble members is None for single models.
     """
     print(f"Running prediction...")
     print(f"Input features: {features}")
@@ -88,22 +362,9 @@ def run_prediction(model: Any, features: List[float], config: Dict | None) -> fl
     # Convert features to numpy array and reshape
     features_arr = np.array(features).reshape(1, -1)
     
-    # Load scaler and transform features
-    if os.path.exists(SCALER_PATH):
-        try:
-            scaler = Scaler()
-            scaler.load(SCALER_PATH)
-            features_arr = scaler.transform(features_arr)
-            print("Features scaled successfully.")
-        except Exception as e:
-            print(f"Warning: Failed to load scaler: {e}. Using raw features.")
-    else:
-        print("Warning: Scaler file not found. Using raw features.")
-    
     try:
-        prediction = model.predict(features_arr)
-        # Prediction is a numpy array, take the first element
-        result = float(prediction[0])
+        prediction, spread = run_point_predictions(model, features_arr)[0]
+        result = (float(prediction), None if np.isnan(spread) else float(spread))
         
         print(f"Prediction complete: {result}")
         return result
@@ -112,8 +373,188 @@ def run_prediction(model: Any, features: List[float], config: Dict | None) -> fl
         raise e
 
 
-# Global variable to track training status
+def is_ensemble(model: Any) -> bool:
+    return getattr(model, "n_members", 1) > 1
+
+
+def run_batch_prediction(model: Any, features: np.ndarray, chunk_size: int = PREDICT_CHUNK_SIZE,
+                         return_std: bool = False) -> Any:
+    """
+    Runs vectorized predictions over an (N, 5) feature matrix.
+    The scaler is loaded once and applied to all rows in one call, then the
+    model is called once per chunk of at most ``chunk_size`` rows.
+
+    With ``return_std``, returns ``(predictions, spread)``, where the spread is the
+    standard deviation across ensemble members (None for single models). All members
+    are evaluated in the same forward pass.
+    """
+    print(f"Running batch prediction on {features.shape[0]} samples (chunk size {chunk_size})...")
+
+    features = scale_features(model, features)
+    with_spread = return_std and is_ensemble(model)
+
+    predictions = np.empty(features.shape[0], dtype=np.float64)
+    spread = np.empty(features.shape[0], dtype=np.float64) if with_spread else None
+    for start in range(0, features.shape[0], chunk_size):
+        chunk = features[start:start + chunk_size]
+        stop = start + chunk.shape[0]
+        if with_spread:
+            members = model.predict_members(chunk, batch_size=chunk.shape[0])
+            predictions[start:stop] = members.mean(axis=1)
+            spread[start:stop] = members.std(axis=1)
+        else:
+            predictions[start:stop] = model.predict(chunk, batch_size=chunk.shape[0])
+
+    print(f"Batch prediction complete.")
+    if return_std:
+        return predictions, spread
+    return predictions
+
+
+def run_point_predictions(model: Any, features: np.ndarray) -> np.ndarray:
+    """
+    Predicts a batch of single-point requests.
+
+    Returns:
+        np.ndarray: (N, 2) rows of prediction and ensemble spread (NaN for single models).
+    """
+    predictions, spread = run_batch_prediction(model, features, return_std=True)
+    if spread is None:
+        spread = np.full_like(predictions, np.nan)
+    return np.stack([predictions, spread], axis=1)
+
+
+def warm_up_model(model: Any, batch_sizes: List[int] = WARMUP_BATCH_SIZES):
+    """
+    Runs forward passes at each serving batch size so that graph tracing and
+    compilation happen before real traffic arrives. Ensembles also run
+    ``predict_members``, which requests for the member spread go through.
+    """
+    print(f"Warming up model at batch sizes {batch_sizes}...")
+    for batch_size in batch_sizes:
+        features = np.zeros((batch_size, 5))
+        run_batch_prediction(model, features, chunk_size=batch_size)
+        if is_ensemble(model):
+            run_batch_prediction(model, features, chunk_size=batch_size, return_std=True)
+    print("Warm-up complete.")
+
+
+def activate_model(model: Any, version: str | None = None):
+    """
+    Warms up a model and then puts it into service in a single swap.
+    Requests already running keep the model they started with.
+    """
+    warm_up_model(model)
+    models["my_nn_model"] = model
+    serving_state["version"] = version
+    invalidate_prediction_caches()
+
+
+def promote_version(version: str):
+    """
+    Loads a registry version, records it as the active one and puts it into service.
+    """
+    model = model_registry.get(version)
+    model_registry.promote(version)
+    activate_model(model, version)
+    print(f"Model version {version} is now in service.")
+
+
+def invalidate_prediction_caches():
+    """
+    Drops every cached result, so nothing computed by a previous model is served.
+    """
+    prediction_cache.clear()
+    slice_cache.clear()
+
+
+def preload_model():
+    """
+    Loads and warms up the saved model, unless a model was put into service in the meantime.
+    """
+    model = load_serving_model()
+    if model is not None and models.get("my_nn_model") is None:
+        activate_model(model, model_registry.active_version())
+
+
+# Cache of single-point predictions, tied to the model that produced them
+prediction_cache = PredictionCache(maxsize=PREDICTION_CACHE_SIZE, tolerance=PREDICTION_CACHE_TOLERANCE)
+
+# Memoized /predict/slice results, tied to the model that produced them
+slice_cache = LRUCache(maxsize=SLICE_CACHE_SIZE)
+
+# Shared queue that coalesces concurrent /predict calls into batched forward passes
+prediction_batcher = MicroBatcher(
+    predict_fn=run_point_predictions,
+    max_batch_size=PREDICT_BATCH_MAX_SIZE,
+    max_wait_ms=PREDICT_BATCH_MAX_WAIT_MS,
+)
+
+
+# Worker pool and IPC manager for training jobs, created on first use
+training_executor: ProcessPoolExecutor | None = None
+training_manager: Any = None
+training_executor_lock = threading.Lock()
+
+
+def get_training_manager() -> Any:
+    """
+    Returns the IPC manager shared with the training workers, starting it on first use.
+    """
+    global training_manager
+    with training_executor_lock:
+        if training_manager is None:
+            training_manager = multiprocessing.get_context("spawn").Manager()
+        return training_manager
+
+
+def get_training_executor() -> ProcessPoolExecutor:
+    """
+    Returns the training process pool, creating it on first use.
+    Workers are spawned (not forked) so they never inherit the serving threads.
+    """
+    global training_executor
+    with training_executor_lock:
+        if training_executor is None:
+            training_executor = ProcessPoolExecutor(
+                max_workers=TRAINING_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=configure_worker,
+                initargs=(TRAINING_THREADS, parse_cpu_list(TRAINING_CPUS)),
+            )
+        return training_executor
+
+
+def shutdown_training_executor(keep_manager: bool = False, executor: ProcessPoolExecutor | None = None):
+    """
+    Stops the training workers and, unless ``keep_manager`` is set, the IPC manager.
+    With ``executor``, the pool is only stopped if it is still that pool: when several
+    jobs see the same pool break, the later ones must not stop the replacement the
+    first one has already resubmitted to.
+    """
+    global training_executor, training_manager
+    with training_executor_lock:
+        if training_executor is not None and (executor is None or training_executor is executor):
+            training_executor.shutdown(wait=False, cancel_futures=True)
+            training_executor = None
+        if training_manager is not None and not keep_manager:
+            training_manager.shutdown()
+            training_manager = None
+
+
+# Queue of training jobs. At most TRAINING_MAX_CONCURRENT_JOBS run at a time and
+# at most TRAINING_MAX_QUEUED_JOBS wait for a slot; further requests get a 429.
+# Cancellation events live in the IPC manager so workers can check them.
+job_manager = JobManager(
+    max_concurrent=TRAINING_MAX_CONCURRENT_JOBS,
+    max_queued=TRAINING_MAX_QUEUED_JOBS,
+    cancel_event_factory=lambda: get_training_manager().Event(),
+)
+
+# Global variable to track training status.
+# This mirrors the most recently started job; see /jobs for every job.
 training_state: Dict[str, Any] = {
+    "job_id": None,
     "training": False,
     "current_epoch": 0,
     "total_epochs": 0,
@@ -122,81 +563,362 @@ training_state: Dict[str, Any] = {
     "loss_history": []
 }
 
-import tensorflow as tf
+def record_epoch(job: Job, epoch: int, logs: Dict[str, Any]):
+    """
+    Records the progress of a running training job after each epoch.
+    """
+    global training_state
+    job.record_epoch(epoch, logs)
+    if training_state["job_id"] == job.id:
+        training_state["current_epoch"] = job.current_epoch
+        training_state["loss_history"] = list(job.loss_history)
 
-class TrainingCallback(tf.keras.callbacks.Callback):
-    def on_epoch_end(self, epoch, logs=None):
-        global training_state
-        logs = logs or {}
-        loss = logs.get('loss')
-        training_state["current_epoch"] = epoch + 1
-        if loss is not None:
-             training_state["loss_history"].append({"epoch": epoch + 1, "loss": float(loss)})
+def resolve_training_data(data_path: str, work_dir: str) -> str:
+    """
+    Returns the dataset file a training worker should read.
+    If data_path is default or doesn't exist, the uploaded dataset is used instead:
+    its file, so workers can memory-map or stream it, or else the data in memory
+    written to ``work_dir``.
+    """
+    if (not os.path.exists(data_path) or data_path == "path/to/default/training_data.csv") and loaded_data["X"] is not None:
+         if loaded_data["path"] is not None and os.path.exists(loaded_data["path"]):
+             print(f"Using uploaded data from {loaded_data['path']}")
+             return loaded_data["path"]
+         print("Using pre-loaded data from memory.")
+         data_file = os.path.join(work_dir, "data.pkl")
+         with open(data_file, "wb") as f:
+             pickle.dump({"X": loaded_data["X"], "y": loaded_data["y"]}, f)
+         return data_file
+    if os.path.exists(data_path):
+         print(f"Loading data from {data_path}")
+         return data_path
+    raise ValueError("No valid data found")
 
-def start_training_job(data_path: str, epochs: int, batch_size: int, learning_rate: float, hidden_layers: List[int]):
+def checkpoint_path(job_id: str) -> str:
+    """
+    Returns the checkpoint directory of a training job.
+    """
+    if not job_id or os.sep in job_id or job_id.startswith("."):
+        raise KeyError(f"Invalid job ID: {job_id!r}")
+    return os.path.join(TRAINING_CHECKPOINT_DIR, job_id)
+
+def run_training(job: Job, data_path: str, epochs: int, batch_size: int, learning_rate: float, hidden_layers: List[int],
+                 base_version: str | None = None, resume_job_id: str | None = None, n_members: int = 1,
+                 backend: str = FIVEDNET_BACKEND, backend_params: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """
+    Trains a model for a job in a worker process, relaying its progress,
+    then publishes and hot-reloads the result.
+
+    Args:
+        base_version (str): Registry version to fine-tune instead of starting from random weights.
+        resume_job_id (str): Job whose checkpoint to continue from.
+        n_members (int): Number of members of a fused ensemble.
+        backend (str): "fivednet", or the name of a surrogate to fit instead of a network.
+        backend_params (dict): Constructor arguments of the surrogate.
+
+    Returns:
+        dict: The published ``version`` and the ``final_loss``.
+    """
+    print(f"Starting training job {job.id} with data from {data_path}...")
+
+    work_dir = tempfile.mkdtemp()
+    checkpoint_dir = checkpoint_path(job.id)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    resume_from = checkpoint_path(resume_job_id) if resume_job_id else None
+    base_model_path = model_registry.artifact_path(base_version, MODEL_ARTIFACT) if base_version else None
+    try:
+        # 1. Resolve the dataset file for the worker
+        data_file = resolve_training_data(data_path, work_dir)
+        # A stored dataset's hash is known; the worker hashes any other file for the cache
+        dataset_hash = loaded_data["sha256"] if data_file == loaded_data["path"] else None
+
+        # 2. Train in a worker process, relaying progress back over a queue.
+        # If the worker dies, retry from the job's own last checkpoint.
+        retries = 0
+        while True:
+            print(f"Submitting {backend} training to a worker process...")
+            executor = get_training_executor()
+            progress_queue = get_training_manager().Queue()
+            try:
+                if backend == FIVEDNET_BACKEND:
+                    future = executor.submit(
+                        train_fivednet, data_file, work_dir, hidden_layers, epochs, learning_rate,
+                        progress_queue, job.cancel_event, batch_size=batch_size, base_model_path=base_model_path,
+                        checkpoint_dir=checkpoint_dir, checkpoint_every=TRAINING_CHECKPOINT_EVERY,
+                        resume_from=resume_from, n_members=n_members, jit_compile=TRAINING_JIT_COMPILE,
+                        precision=TRAINING_PRECISION, steps_per_execution=TRAINING_STEPS_PER_EXECUTION,
+                        preprocessing_cache=preprocessing_cache, dataset_hash=dataset_hash
+                    )
+                else:
+                    future = executor.submit(
+                        train_surrogate, data_file, work_dir, backend, backend_params, job.cancel_event,
+                        preprocessing_cache=preprocessing_cache, dataset_hash=dataset_hash
+                    )
+                while True:
+                    try:
+                        epoch, logs = progress_queue.get(timeout=0.2)
+                        record_epoch(job, epoch, logs)
+                    except queue.Empty:
+                        if future.done():
+                            break
+                result = future.result()
+                break
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool for this and later jobs
+                shutdown_training_executor(keep_manager=True, executor=executor)
+                if retries >= TRAINING_MAX_RETRIES or not has_checkpoint(checkpoint_dir) or job.cancel_requested:
+                    raise
+                retries += 1
+                resume_from = checkpoint_dir
+                print(f"Training worker crashed; resuming job {job.id} from its last checkpoint.")
+        job.final_loss = result["final_loss"]
+        if result["cancelled"]:
+            raise JobCancelled(f"Training job {job.id} was cancelled.")
+
+        # 3. Publish the artifacts as a new immutable version
+        version = model_registry.publish(
+            result["files"],
+            metadata={
+                "job_id": job.id,
+                "backend": result["backend"],
+                "backend_params": backend_params or {},
+                "hidden_layers": result["hidden_layers"],
+                "n_members": result["n_members"],
+                "epochs": epochs,
+                "batch_size": batch_size,
+                "learning_rate": learning_rate,
+                "final_loss": job.final_loss,
+                "val_loss": result["val_loss"],
+                "train_time": result["train_time"],
+                "inference_latency_ms": result["inference_latency_ms"],
+                "fine_tuned_from": base_version,
+                "resumed_from": resume_job_id,
+            }
+        )
+        print(f"Model published as version {version}")
+
+        # 4. Load the new version, warm it up and swap it in
+        promote_version(version)
+
+        # The checkpoints are no longer needed once the model is published
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        if resume_job_id:
+            shutil.rmtree(checkpoint_path(resume_job_id), ignore_errors=True)
+        return {"version": version, "final_loss": job.final_loss, "val_loss": result["val_loss"]}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        # Drop the directory of a job that failed before writing any checkpoint
+        if os.path.isdir(checkpoint_dir) and not os.listdir(checkpoint_dir):
+            os.rmdir(checkpoint_dir)
+
+def start_training_job(job_id: str, data_path: str, epochs: int, batch_size: int, learning_rate: float, hidden_layers: List[int],
+                       base_version: str | None = None, resume_job_id: str | None = None, n_members: int = 1,
+                       backend: str = FIVEDNET_BACKEND, backend_params: Dict[str, Any] | None = None):
     """
     A long-running function to train or fine-tune a model.
-    This runs in the background.
+    This runs in the background: it waits for a free job slot, then runs the job
+    and keeps ``training_state`` in sync with it.
     """
     global training_state
-    training_state["training"] = True
-    training_state["current_epoch"] = 0
-    training_state["total_epochs"] = epochs
-    training_state["final_loss"] = None
-    training_state["error"] = None
-    training_state["loss_history"] = []
-    
-    print(f"Starting training job with data from {data_path}...")
-    
-    try:
-        # 1. Load data
-        # If data_path is default or doesn't exist, try to use loaded_data
-        if (not os.path.exists(data_path) or data_path == "path/to/default/training_data.csv") and loaded_data["X"] is not None:
-             print("Using pre-loaded data from memory.")
-             X = loaded_data["X"]
-             y = loaded_data["y"]
-        elif os.path.exists(data_path):
-             print(f"Loading data from {data_path}")
-             X, y = load_dataset(data_path)
-        else:
-             print("No valid data found for training.")
-             training_state["training"] = False
-             training_state["error"] = "No valid data found"
-             return
-
-        # 2. Prepare data
-        X_train, y_train, X_val, y_val, X_test, y_test = split_data(X, y)
-        X_train_scaled, X_val_scaled, X_test_scaled = standardize_data(X_train, X_val, X_test, save_path=SCALER_PATH)
-        
-        # 3. Initialize and train model
-        print("Initializing and training FiveDNet...")
-        # Using hidden_layers from request
-        model = FiveDNet(hidden_layers=hidden_layers, max_epochs=epochs, learning_rate=learning_rate, verbose=0)
-        
-        # Instantiate callback
-        callback = TrainingCallback()
-        
-        history = model.fit(X_train_scaled, y_train, validation_split=0.2, callbacks=[callback])
-        
-        # 4. Save the model
-        model.save(MODEL_PATH)
-        print(f"Model saved to {MODEL_PATH}")
-        
-        # 5. Reload the model
-        models["my_nn_model"] = load_model(MODEL_PATH)
-        
-        # 6. Update state
+    job = job_manager.get(job_id)
+    if job is None:
+        return
+
+    def run(job):
+        # The status view follows the most recently started job
+        training_state["job_id"] = job.id
+        training_state["training"] = True
+        training_state["current_epoch"] = 0
+        training_state["total_epochs"] = epochs
+        training_state["final_loss"] = None
+        training_state["error"] = None
+        training_state["loss_history"] = []
+        return run_training(
+            job, data_path, epochs, batch_size, learning_rate, hidden_layers,
+            base_version=base_version, resume_job_id=resume_job_id, n_members=n_members,
+            backend=backend, backend_params=backend_params
+        )
+
+    job_manager.run(job, run)
+
+    if job.status == "completed":
+        print(f"Training complete. Final loss: {job.final_loss}")
+    elif job.error:
+        print(f"Training failed: {job.error}")
+    else:
+        print(f"Training job {job.id} {job.status}.")
+
+    if training_state["job_id"] == job.id:
         training_state["training"] = False
-        if history and hasattr(history, 'history') and 'loss' in history.history:
-             training_state["final_loss"] = history.history['loss'][-1]
-        else:
-             training_state["final_loss"] = 0.0
-        print(f"Training complete. Final loss: {training_state['final_loss']}")
-        
+        training_state["final_loss"] = job.final_loss
+        training_state["error"] = job.error
+
+
+def run_sweep_job(job: Job, data_path: str, trials: List[Dict[str, Any]], max_epochs: int, patience: int,
+                  prune_after: int, prune_ratio: float, promote: bool) -> Dict[str, Any]:
+    """
+    Runs a hyperparameter sweep for a job in its own process pool and publishes the best trial.
+
+    Returns:
+        dict: The ``leaderboard``, and the published ``version`` of the winner, if any.
+    """
+    print(f"Starting sweep job {job.id} with {len(trials)} trials...")
+
+    work_dir = tempfile.mkdtemp()
+    executor = None
+    try:
+        data_file = resolve_training_data(data_path, work_dir)
+        executor = ProcessPoolExecutor(
+            max_workers=min(SWEEP_WORKERS, len(trials)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=configure_worker,
+            initargs=(SWEEP_TRIAL_THREADS, parse_cpu_list(TRAINING_CPUS)),
+        )
+
+        # Preprocess once in a worker, so the dataset is never loaded into this process;
+        # every trial memory-maps the same split
+        split_dir = os.path.join(work_dir, "split")
+        os.makedirs(split_dir)
+        executor.submit(prepare_split, data_file, split_dir).result()
+
+        def on_result(board):
+            # Trial artifacts live in the temporary work_dir, so their paths are not reported
+            entries = [{key: value for key, value in result.items() if key != "files"} for result in board]
+            job.result = {"n_trials": len(trials), "finished": len(board), "leaderboard": entries, "version": None}
+
+        best_loss = get_training_manager().Value("d", float("inf"))
+        board = run_sweep(
+            executor, split_dir, os.path.join(work_dir, "trials"), trials, max_epochs, patience=patience,
+            prune_after=prune_after, prune_ratio=prune_ratio, best_loss=best_loss,
+            cancel_event=job.cancel_event, on_result=on_result
+        )
+        on_result(board)
+        if job.cancel_requested:
+            raise JobCancelled(f"Sweep job {job.id} was cancelled.")
+
+        # Publish the winner so it can be promoted now or later
+        winner = board[0] if board and board[0]["status"] == "completed" else None
+        if winner is None:
+            raise RuntimeError("No trial completed.")
+        version = model_registry.publish(
+            winner["files"],
+            metadata={
+                "job_id": job.id,
+                **winner["params"],
+                "epochs": winner["epochs"],
+                "val_loss": winner["val_loss"],
+            }
+        )
+        job.result["version"] = version
+        print(f"Best trial {winner['trial']} published as version {version}")
+
+        if promote:
+            promote_version(version)
+        return job.result
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def start_sweep_job(job_id: str, data_path: str, trials: List[Dict[str, Any]], max_epochs: int, patience: int,
+                    prune_after: int, prune_ratio: float, promote: bool):
+    """
+    Runs a sweep job in the background once a job slot is free.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return
+    job_manager.run(job, lambda job: run_sweep_job(
+        job, data_path, trials, max_epochs, patience, prune_after, prune_ratio, promote
+    ))
+    print(f"Sweep job {job.id} {job.status}." + (f" Error: {job.error}" if job.error else ""))
+
+
+def run_cv_job(job: Job, data_path: str, n_splits: int, params: Dict[str, Any], max_epochs: int, patience: int,
+               shuffle: bool, seed: int) -> Dict[str, Any]:
+    """
+    Runs k-fold cross-validation for a job, training the folds in parallel in their own process pool.
+
+    Returns:
+        dict: The per-fold results in ``folds`` and the aggregated metrics in ``summary``.
+    """
+    print(f"Starting cross-validation job {job.id} with {n_splits} folds...")
+
+    work_dir = tempfile.mkdtemp()
+    executor = None
+    try:
+        data_file = resolve_training_data(data_path, work_dir)
+        executor = ProcessPoolExecutor(
+            max_workers=min(CV_WORKERS, n_splits),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=configure_worker,
+            initargs=(CV_FOLD_THREADS, parse_cpu_list(TRAINING_CPUS)),
+        )
+
+        # Load once in a worker, so the dataset is never loaded into this process;
+        # every fold memory-maps the same arrays and selects its rows by index
+        data_dir = os.path.join(work_dir, "data")
+        os.makedirs(data_dir)
+        n_samples = executor.submit(prepare_cv, data_file, data_dir).result()
+        if n_splits > n_samples:
+            raise ValueError(f"Cannot split {n_samples} samples into {n_splits} folds.")
+
+        def on_result(folds):
+            job.result = {"n_splits": n_splits, "finished": len(folds), "folds": folds, "summary": None}
+
+        result = cross_validate(
+            executor, data_dir, n_splits, params, max_epochs, patience=patience, shuffle=shuffle, seed=seed,
+            cancel_event=job.cancel_event, on_result=on_result
+        )
+        job.result = {"n_splits": n_splits, "finished": n_splits, **result}
+        if job.cancel_requested:
+            raise JobCancelled(f"Cross-validation job {job.id} was cancelled.")
+
+        failed = [fold for fold in result["folds"] if fold["status"] != "completed"]
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {n_splits} folds did not complete: "
+                               + "; ".join(fold.get("error", fold["status"]) for fold in failed))
+        job.final_loss = result["summary"]["mse"]["mean"]
+        print(f"Cross-validation job {job.id}: MSE {job.final_loss:.6f} "
+              f"+/- {result['summary']['mse']['std']:.6f} over {n_splits} folds")
+        return job.result
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def start_cv_job(job_id: str, data_path: str, n_splits: int, params: Dict[str, Any], max_epochs: int, patience: int,
+                 shuffle: bool, seed: int):
+    """
+    Runs a cross-validation job in the background once a job slot is free.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return
+    job_manager.run(job, lambda job: run_cv_job(job, data_path, n_splits, params, max_epochs, patience, shuffle, seed))
+    print(f"Cross-validation job {job.id} {job.status}." + (f" Error: {job.error}" if job.error else ""))
+
+
+async def get_serving_model(version: str | None = None) -> Any:
+    """
+    Returns the model a request should use: the pinned registry version if one
+    is given, otherwise the model currently in service.
+    """
+    if version is None:
+        model = models.get("my_nn_model")
+        if not model:
+            raise HTTPException(
+                status_code=503,  # 503 Service Unavailable
+                detail="Model is not loaded. Please wait or check server status.",
+            )
+        return model
+
+    try:
+        return await run_in_threadpool(model_registry.get, version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {version}")
     except Exception as e:
-        print(f"Training failed: {e}")
-        training_state["training"] = False
-        training_state["error"] = str(e)
+        raise HTTPException(status_code=500, detail=f"Failed to load model version {version}: {e}")
 
 
 # --- Pydantic Schemas (Data Validation) ---
@@ -225,6 +947,73 @@ class PredictionOutput(BaseModel):
     """
     prediction: Any
     input_data: PredictionInput
+    # Standard deviation across ensemble members; None for single models
+    prediction_std: float | None = None
+
+
+class BatchPredictionInput(BaseModel):
+    """
+    The input data structure for a batch prediction request.
+    """
+    feature_matrix: List[List[float]]
+    chunk_size: int | None = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "feature_matrix": [[0.1, 0.2, 0.3, 0.4, 0.5], [0.5, 0.4, 0.3, 0.2, 0.1]],
+                "chunk_size": 8192
+            }
+        }
+
+
+class BatchPredictionOutput(BaseModel):
+    """
+    The output data structure for a batch prediction response.
+    """
+    predictions: List[float]
+    n_samples: int
+    # Standard deviation across ensemble members; None for single models
+    prediction_std: List[float] | None = None
+
+
+class SliceAxis(BaseModel):
+    """
+    A feature swept over an evenly spaced range.
+    """
+    index: int
+    start: float
+    stop: float
+    num: int = 50
+
+
+class SliceInput(BaseModel):
+    """
+    The input data structure for a grid/slice evaluation request.
+    """
+    fixed: List[float]
+    axes: List[SliceAxis]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "fixed": [0.5, 0.5, 0.5, 0.5, 0.5],
+                "axes": [
+                    {"index": 0, "start": 0.0, "stop": 1.0, "num": 50},
+                    {"index": 1, "start": 0.0, "stop": 1.0, "num": 50}
+                ]
+            }
+        }
+
+
+class SliceOutput(BaseModel):
+    """
+    The output data structure for a grid/slice evaluation.
+    ``values[i][j]`` is the prediction at ``axes[0][i]``, ``axes[1][j]``.
+    """
+    axes: List[List[float]]
+    values: List[Any]
+    shape: List[int]
 
 
 class TrainingStatus(BaseModel):
@@ -240,9 +1029,12 @@ class TrainingStatus(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """
-    Print that the app has started.
+    Start loading the saved model, if there is one, and warming it up before serving.
     """
     print("--- App Startup ---")
+    if PRELOAD_MODEL:
+        # Load in the background so /health answers immediately; /ready reports when it is done
+        threading.Thread(target=preload_model, name="model-preload", daemon=True).start()
 
 
 @app.on_event("shutdown")
@@ -251,6 +1043,8 @@ async def shutdown_event():
     On app shutdown, clear the models.
     """
     print("--- App Shutdown ---")
+    prediction_batcher.stop()
+    shutdown_training_executor()
     models.clear()
     print("Models cleared.")
     print("----------------------")
@@ -276,46 +1070,70 @@ async def get_status():
     return {
         "model_loaded": model_loaded,
         "data_loaded": data_loaded,
+        "dataset": loaded_data["name"] or loaded_data["sha256"],
         "model_name": "my_nn_model" if model_loaded else None,
+        "model_version": serving_state["version"] if model_loaded else None,
         "training_state": training_state
     }
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Return serving metrics, such as micro-batching queue depth and batch size histograms.
+    """
+    return {
+        "batcher": {"enabled": PREDICT_MICROBATCH, **prediction_batcher.stats()},
+        "prediction_cache": prediction_cache.stats(),
+        "slice_cache": slice_cache.stats(),
+    }
+
+
 @app.post("/predict", response_model=PredictionOutput)
-async def predict(input_data: PredictionInput):
+async def predict(input_data: PredictionInput, version: str | None = None):
     """
     Endpoint to make a prediction.
     It expects a JSON body matching the PredictionInput schema.
+    Pass ``?version=...`` to pin a specific model version.
     """
-    # 1. Get the loaded model
-    model = models.get("my_nn_model")
-    
-    # 2. Check if model is loaded
-    if not model:
-        raise HTTPException(
-            status_code=503,  # 503 Service Unavailable
-            detail="Model is not loaded. Please wait or check server status.",
-        )
+    # 1. Get the loaded model (or the pinned version), failing if none is loaded
+    model = await get_serving_model(version)
 
-    # 3. Validate input dimensions
+    # 2. Validate input dimensions
     if len(input_data.feature_vector) != 5:
         raise HTTPException(
             status_code=400,
             detail=f"Expected 5 features, got {len(input_data.feature_vector)}"
         )
             
+    # Serve repeated queries from the cache
+    cached_prediction = prediction_cache.get_prediction(model, input_data.feature_vector)
+    if cached_prediction is not None:
+        prediction, prediction_std = cached_prediction
+        return PredictionOutput(prediction=prediction, input_data=input_data, prediction_std=prediction_std)
+
     try:
-        # 3. Run the prediction
-        raw_prediction = run_prediction(
-            model=model,
-            features=input_data.feature_vector,
-            config=input_data.config
-        )
+        # 3. Run the prediction, coalescing with concurrent requests if enabled
+        if PREDICT_MICROBATCH:
+            prediction, prediction_std = await asyncio.wrap_future(
+                prediction_batcher.submit(model, input_data.feature_vector)
+            )
+            if np.isnan(prediction_std):
+                prediction_std = None
+        else:
+            prediction, prediction_std = await run_in_threadpool(
+                run_prediction,
+                model=model,
+                features=input_data.feature_vector,
+                config=input_data.config
+            )
+        prediction_cache.put_prediction(model, input_data.feature_vector, (prediction, prediction_std))
         
         # 4. Format and return the response
         return PredictionOutput(
-            prediction=raw_prediction,
-            input_data=input_data
+            prediction=prediction,
+            input_data=input_data,
+            prediction_std=prediction_std
         )
         
     except Exception as e:
@@ -327,12 +1145,212 @@ async def predict(input_data: PredictionInput):
         )
 
 
+@app.post("/predict/batch", response_model=BatchPredictionOutput)
+async def predict_batch(input_data: BatchPredictionInput, version: str | None = None):
+    """
+    Endpoint to make predictions for many feature vectors at once.
+    It expects a JSON body matching the BatchPredictionInput schema.
+    """
+    model = await get_serving_model(version)
+
+    # Validate the shape of the whole matrix once
+    try:
+        features = np.asarray(input_data.feature_matrix, dtype=np.float64)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="All rows must have the same number of features.")
+
+    if features.ndim != 2 or features.shape[1] != 5:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expected an (N, 5) feature matrix, got shape {features.shape}"
+        )
+
+    chunk_size = input_data.chunk_size or PREDICT_CHUNK_SIZE
+    if chunk_size <= 0:
+        raise HTTPException(status_code=400, detail="chunk_size must be a positive integer.")
+
+    try:
+        # Run the model off the event loop, so other requests are served meanwhile
+        predictions, spread = await run_in_threadpool(
+            run_batch_prediction, model, features, chunk_size=chunk_size, return_std=True
+        )
+        return BatchPredictionOutput(
+            predictions=predictions.tolist(),
+            n_samples=features.shape[0],
+            prediction_std=spread.tolist() if spread is not None else None
+        )
+    except Exception as e:
+        print(f"Error during batch prediction: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred during prediction: {e}"
+        )
+
+
+@app.post("/predict/slice", response_model=SliceOutput)
+async def predict_slice(input_data: SliceInput, version: str | None = None):
+    """
+    Endpoint to evaluate the model on a 1D profile or 2D grid through the 5D input space.
+    The swept features take evenly spaced values over their ranges while the
+    others are held at ``fixed``. The grid is built and evaluated server-side in
+    vectorized chunks, and results are memoized until the model changes.
+    """
+    model = await get_serving_model(version)
+
+    if len(input_data.fixed) != 5:
+        raise HTTPException(status_code=400, detail=f"Expected 5 fixed values, got {len(input_data.fixed)}")
+    if len(input_data.axes) not in (1, 2):
+        raise HTTPException(status_code=400, detail="Expected one or two swept axes.")
+
+    indices = [axis.index for axis in input_data.axes]
+    if any(i < 0 or i >= 5 for i in indices) or len(set(indices)) != len(indices):
+        raise HTTPException(status_code=400, detail="Axis indices must be distinct and between 0 and 4.")
+    shape = [axis.num for axis in input_data.axes]
+    if any(num < 1 for num in shape) or int(np.prod(shape)) > MAX_SLICE_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Each axis needs at least 1 point and the grid at most {MAX_SLICE_POINTS} points."
+        )
+
+    # Values of the swept features in 'fixed' do not affect the result
+    fixed = list(input_data.fixed)
+    for i in indices:
+        fixed[i] = 0.0
+    key = json.dumps({"fixed": fixed, "axes": [axis.model_dump() for axis in input_data.axes]})
+
+    cached_output = slice_cache.get(key, owner=model)
+    if cached_output is not None:
+        return cached_output
+
+    grids = [np.linspace(axis.start, axis.stop, axis.num) for axis in input_data.axes]
+    features = np.tile(np.asarray(fixed, dtype=np.float64), (int(np.prod(shape)), 1))
+    for i, grid in zip(indices, np.meshgrid(*grids, indexing="ij")):
+        features[:, i] = grid.ravel()
+
+    try:
+        predictions = await run_in_threadpool(run_batch_prediction, model, features)
+    except Exception as e:
+        print(f"Error during slice prediction: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred during prediction: {e}"
+        )
+
+    output = SliceOutput(
+        axes=[grid.tolist() for grid in grids],
+        values=predictions.reshape(shape).tolist(),
+        shape=shape
+    )
+    slice_cache.put(key, output, owner=model)
+    return output
+
+
+@app.post("/predict/batch/binary")
+async def predict_batch_binary(
+    request: Request, dtype: str = "float32", chunk_size: int | None = None, version: str | None = None
+):
+    """
+    Endpoint to make predictions for a binary-encoded (N, 5) feature matrix.
+    The body may be raw ``application/octet-stream`` values of the given dtype
+    (row-major), an ``application/x-npy`` array or an Arrow IPC stream
+    (``application/vnd.apache.arrow.stream``) with five numeric columns.
+    Predictions are returned in the format requested by the Accept header,
+    defaulting to the request's own format.
+    """
+    model = await get_serving_model(version)
+
+    chunk_size = chunk_size or PREDICT_CHUNK_SIZE
+    if chunk_size <= 0:
+        raise HTTPException(status_code=400, detail="chunk_size must be a positive integer.")
+
+    content_type = request.headers.get("content-type", "application/octet-stream")
+    try:
+        features = decode_features(await request.body(), content_type, dtype=dtype)
+    except (TypeError, ImportError) as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    media_type = negotiate_media_type(request.headers.get("accept"), default=parse_media_type(content_type))
+    try:
+        predictions = await run_in_threadpool(run_batch_prediction, model, features, chunk_size=chunk_size)
+        body = encode_predictions(predictions, media_type, dtype=dtype)
+    except Exception as e:
+        print(f"Error during batch prediction: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred during prediction: {e}"
+        )
+    return Response(content=body, media_type=media_type)
+
+
+@app.post("/predict/file")
+async def predict_file(
+    file: UploadFile = File(...), chunk_size: int | None = None, format: str = "ndjson", version: str | None = None
+):
+    """
+    Endpoint to score an uploaded feature file (.npy or .csv, and .pkl if
+    PREDICT_FILE_ALLOW_PICKLE is set) chunk by chunk.
+    Predictions are streamed back as they are produced, either as NDJSON lines
+    (``{"chunk": i, "start": row, "predictions": [...]}``) or, with
+    ``format=binary``, as concatenated raw float32 values. Reading the next chunk
+    overlaps with scoring the current one, and memory is bounded by the chunk size.
+    """
+    model = await get_serving_model(version)
+
+    chunk_size = chunk_size or PREDICT_CHUNK_SIZE
+    if chunk_size <= 0:
+        raise HTTPException(status_code=400, detail="chunk_size must be a positive integer.")
+    if format not in ("ndjson", "binary"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'binary'.")
+
+    # Read the first chunk up front so malformed files are rejected with a 400
+    try:
+        chunks = iter_feature_chunks(file.file, file.filename, chunk_size, allow_pickle=PREDICT_FILE_ALLOW_PICKLE)
+        first_chunk = next(chunks, None)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to read feature file: {e}")
+    if first_chunk is not None:
+        chunks = itertools.chain([first_chunk], chunks)
+
+    def generate():
+        start = 0
+        try:
+            for i, chunk in enumerate(prefetch(chunks)):
+                predictions = run_batch_prediction(model, chunk, chunk_size=chunk_size)
+                if format == "binary":
+                    yield predictions.astype(np.float32).tobytes()
+                else:
+                    yield json.dumps({"chunk": i, "start": start, "predictions": predictions.tolist()}) + "\n"
+                start += chunk.shape[0]
+        except Exception as e:
+            print(f"Error during file prediction: {e}")
+            if format == "binary":
+                raise
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    media_type = "application/octet-stream" if format == "binary" else "application/x-ndjson"
+    return StreamingResponse(generate(), media_type=media_type)
+
+
 class TrainingConfig(BaseModel):
     epochs: int = 100
     batch_size: int = 32
     learning_rate: float = 0.001
     hidden_layers: List[int] = [64, 32, 16]
     data_path: str = "path/to/default/training_data.csv"
+    # Train this many networks as one fused ensemble; /predict then reports their spread
+    n_members: int = 1
+    # Start from the weights and scaler of a published model instead of random weights.
+    # base_version defaults to the version currently in service.
+    fine_tune: bool = False
+    base_version: str | None = None
+    # Continue an interrupted job from its last checkpoint
+    resume_job_id: str | None = None
+    # "fivednet", or a surrogate fitted in closed form instead: "rbf", "knn" or "ridge".
+    # backend_params are the surrogate's constructor arguments, e.g. {"k": 16} for knn.
+    backend: str = "fivednet"
+    backend_params: Dict[str, Any] = {}
 
 @app.post("/train", response_model=TrainingStatus)
 async def train_model(background_tasks: BackgroundTasks, config: TrainingConfig):
@@ -341,45 +1359,221 @@ async def train_model(background_tasks: BackgroundTasks, config: TrainingConfig)
     This job runs in the background so the API can respond immediately.
     """
     print(f"Received request to start training job with config: {config}")
+
+    if not 1 <= config.n_members <= MAX_ENSEMBLE_MEMBERS:
+        raise HTTPException(status_code=400, detail=f"n_members must be between 1 and {MAX_ENSEMBLE_MEMBERS}.")
+    if config.backend not in BACKENDS:
+        raise HTTPException(status_code=400, detail=f"Unknown backend {config.backend!r}. Expected one of {BACKENDS}.")
+    if config.backend != FIVEDNET_BACKEND:
+        if config.fine_tune or config.resume_job_id is not None or config.n_members != 1:
+            raise HTTPException(
+                status_code=400, detail="fine_tune, resume_job_id and n_members only apply to the fivednet backend."
+            )
+        try:
+            make_surrogate(config.backend, config.backend_params)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    base_version = None
+    if config.fine_tune:
+        base_version = config.base_version or serving_state["version"] or model_registry.active_version()
+        if base_version is None:
+            raise HTTPException(status_code=400, detail="No published model version to fine-tune.")
+        if not model_registry.exists(base_version):
+            raise HTTPException(status_code=404, detail=f"Unknown model version: {base_version}")
+        if model_registry.metadata(base_version).get("backend", FIVEDNET_BACKEND) != FIVEDNET_BACKEND:
+            raise HTTPException(status_code=400, detail=f"Version {base_version} is not a FiveDNet and cannot be fine-tuned.")
+    if config.resume_job_id is not None:
+        try:
+            resumable = has_checkpoint(checkpoint_path(config.resume_job_id))
+        except KeyError:
+            resumable = False
+        if not resumable:
+            raise HTTPException(status_code=404, detail=f"No checkpoint for job: {config.resume_job_id}")
+        previous = job_manager.get(config.resume_job_id)
+        if previous is not None and previous.status in ("queued", "running"):
+            raise HTTPException(status_code=409, detail=f"Job {config.resume_job_id} is still {previous.status}.")
+
+    try:
+        # Creating the job may start the IPC manager, so keep it off the event loop
+        job = await run_in_threadpool(
+            job_manager.create, "train", params=config.model_dump(), total_epochs=config.epochs
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     
     # Add the long-running task to the background
     background_tasks.add_task(
         start_training_job, 
+        job.id,
         config.data_path,
         config.epochs,
         config.batch_size,
         config.learning_rate,
-        config.hidden_layers
+        config.hidden_layers,
+        base_version=base_version,
+        resume_job_id=config.resume_job_id,
+        n_members=config.n_members,
+        backend=config.backend,
+        backend_params=config.backend_params
     )
     
     # Return an immediate response to the client
     return TrainingStatus(
-        message="Model training started in the background.",
-        job_id="some_unique_job_id_123"  # You could generate a real ID here
+        message="Model training queued in the background.",
+        job_id=job.id
+    )
+
+
+class SweepConfig(BaseModel):
+    """
+    A hyperparameter sweep. ``search_space`` maps hidden_layers, learning_rate and/or
+    batch_size to lists of candidates (or, for random search, ``{"low", "high", "log"}`` ranges).
+    """
+    search_space: Dict[str, Any]
+    strategy: str = "grid"
+    n_trials: int | None = None
+    seed: int | None = None
+    max_epochs: int = 50
+    patience: int = 5
+    prune_after: int = 10
+    prune_ratio: float = 3.0
+    promote: bool = False
+    data_path: str = "path/to/default/training_data.csv"
+
+@app.post("/sweep", response_model=TrainingStatus)
+async def start_sweep(background_tasks: BackgroundTasks, config: SweepConfig):
+    """
+    Endpoint to start a hyperparameter sweep job.
+    Trials train in parallel on a shared preprocessed split; the leaderboard is
+    reported in the job's result and the best model is published (and optionally promoted).
+    """
+    try:
+        trials = expand_search_space(config.search_space, config.strategy, config.n_trials, config.seed)
+    except (ValueError, TypeError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid search space: {e}")
+    if not trials or len(trials) > MAX_SWEEP_TRIALS:
+        raise HTTPException(status_code=400, detail=f"A sweep must have between 1 and {MAX_SWEEP_TRIALS} trials.")
+
+    try:
+        job = await run_in_threadpool(job_manager.create, "sweep", params=config.model_dump())
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    background_tasks.add_task(
+        start_sweep_job, job.id, config.data_path, trials, config.max_epochs, config.patience,
+        config.prune_after, config.prune_ratio, config.promote
+    )
+    return TrainingStatus(
+        message=f"Sweep of {len(trials)} trials queued in the background.",
+        job_id=job.id
+    )
+
+
+class CVConfig(BaseModel):
+    """
+    A k-fold cross-validation run of one model configuration.
+    """
+    n_splits: int = 5
+    hidden_layers: List[int] = [64, 32, 16]
+    learning_rate: float = 0.001
+    batch_size: int = 32
+    n_members: int = 1
+    max_epochs: int = 50
+    patience: int = 5
+    shuffle: bool = True
+    seed: int = 42
+    data_path: str = "path/to/default/training_data.csv"
+
+@app.post("/cv", response_model=TrainingStatus)
+async def start_cross_validation(background_tasks: BackgroundTasks, config: CVConfig):
+    """
+    Endpoint to start a k-fold cross-validation job.
+    Folds train in parallel; the per-fold and aggregated validation metrics are
+    reported in the job's result. No model is published.
+    """
+    if not 2 <= config.n_splits <= MAX_CV_FOLDS:
+        raise HTTPException(status_code=400, detail=f"n_splits must be between 2 and {MAX_CV_FOLDS}.")
+    if not 1 <= config.n_members <= MAX_ENSEMBLE_MEMBERS:
+        raise HTTPException(status_code=400, detail=f"n_members must be between 1 and {MAX_ENSEMBLE_MEMBERS}.")
+
+    try:
+        job = await run_in_threadpool(job_manager.create, "cv", params=config.model_dump())
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    params = {
+        "hidden_layers": config.hidden_layers,
+        "learning_rate": config.learning_rate,
+        "batch_size": config.batch_size,
+        "n_members": config.n_members,
+    }
+    background_tasks.add_task(
+        start_cv_job, job.id, config.data_path, config.n_splits, params, config.max_epochs, config.patience,
+        config.shuffle, config.seed
+    )
+    return TrainingStatus(
+        message=f"{config.n_splits}-fold cross-validation queued in the background.",
+        job_id=job.id
     )
 
 
+@app.get("/jobs")
+async def list_jobs():
+    """
+    List the known jobs, oldest first, with the number of queued and running jobs.
+    """
+    return {
+        **job_manager.counts(),
+        "max_concurrent": job_manager.max_concurrent,
+        "max_queued": job_manager.max_queued,
+        "jobs": [job.to_dict() for job in job_manager.list()],
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Return the status and loss history of a job.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job.to_dict()
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """
+    Cancel a job. Queued jobs are dropped; running jobs stop at the next training batch.
+    """
+    job = await run_in_threadpool(job_manager.cancel, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if job.status in ("completed", "failed"):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} has already {job.status}.")
+    return job.to_dict()
+
+
 @app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(file: UploadFile = File(...), name: str | None = Form(None)):
     """
-    Endpoint to upload a dataset file (.pkl).
-    The file is saved and then loaded into memory.
+    Endpoint to upload a dataset file in any format ``load_dataset`` reads
+    (.pkl, .npy, .npz, .csv, .parquet, .arrow/.feather, .h5/.hdf5) and select it.
+    The file is streamed into the dataset store while it is hashed. Content that is
+    already stored is not parsed again; either way the cached arrays are memory-mapped.
+    The dataset is stored under ``name``, or else under its file name.
     """
     try:
-        os.makedirs(DATA_DIR, exist_ok=True)
-        file_location = os.path.join(DATA_DIR, file.filename)
-        with open(file_location, "wb+") as file_object:
-            shutil.copyfileobj(file.file, file_object)
-            
-        # Load the dataset
-        X, y = load_dataset(file_location)
-        
-        # Update global state
-        loaded_data["X"] = X
-        loaded_data["y"] = y
+        metadata = await run_in_threadpool(dataset_store.add, file.file, file.filename, name)
+        await run_in_threadpool(select_dataset, metadata["name"])
+        X, y = loaded_data["X"], loaded_data["y"]
         
         return {
             "message": f"File '{file.filename}' uploaded and loaded successfully.",
+            "dataset": metadata["name"],
+            "sha256": metadata["sha256"],
+            "deduplicated": metadata["deduplicated"],
             "n_samples": X.shape[0],
             "n_features": X.shape[1],
             "data_shape": {
@@ -387,11 +1581,82 @@ async def upload_file(file: UploadFile = File(...)):
                 "y": y.shape
             }
         }
+    except ValueError as e:
+        # Invalid names, unsupported formats and unreadable files
+        raise HTTPException(status_code=400, detail=f"Invalid dataset upload: {str(e)}")
     except Exception as e:
         print(f"Error uploading file: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to upload and load data: {str(e)}")
 
 
+@app.get("/datasets")
+async def list_datasets():
+    """
+    List the stored datasets and which one is selected.
+    """
+    return {
+        "selected": loaded_data["name"] or loaded_data["sha256"],
+        "datasets": await run_in_threadpool(dataset_store.datasets),
+    }
+
+
+@app.post("/datasets/{name}/select")
+async def select_stored_dataset(name: str):
+    """
+    Endpoint to select a stored dataset, by name or content hash, for training.
+    """
+    try:
+        metadata = await run_in_threadpool(select_dataset, name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {name}")
+    return {"message": f"Dataset {name} selected.", **metadata}
+
+
+@app.delete("/datasets/{name}")
+async def delete_dataset(name: str):
+    """
+    Endpoint to delete a stored dataset name. The content is deleted once no name refers to it.
+    """
+    try:
+        await run_in_threadpool(dataset_store.remove, name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {name}")
+    if loaded_data["name"] == name:
+        for key in loaded_data:
+            loaded_data[key] = None
+    return {"message": f"Dataset {name} deleted."}
+
+
+@app.get("/models")
+async def list_models():
+    """
+    List the published model versions and which ones are active and loaded.
+    """
+    return {
+        "active_version": model_registry.active_version(),
+        "serving_version": serving_state["version"],
+        "loaded_versions": model_registry.loaded_versions(),
+        "memory_usage_bytes": model_registry.memory_usage(),
+        "memory_budget_bytes": model_registry.memory_budget_bytes,
+        "versions": model_registry.versions(),
+    }
+
+
+@app.post("/models/{version}/promote")
+async def promote_model(version: str):
+    """
+    Endpoint to put a published model version into service.
+    In-flight predictions finish on the previous version.
+    """
+    if not model_registry.exists(version):
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {version}")
+    try:
+        await run_in_threadpool(promote_version, version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to promote model version {version}: {e}")
+    return {"message": f"Model version {version} promoted.", "version": version}
+
+
 @app.delete("/model")
 async def delete_model():
     """
@@ -399,6 +1664,8 @@ async def delete_model():
     """
     if "my_nn_model" in models:
         del models["my_nn_model"]
+    serving_state["version"] = None
+    invalidate_prediction_caches()
         
     # Reset training state
     training_state["training"] = False
@@ -416,8 +1683,11 @@ async def reset_state():
     Endpoint to clear all data and models.
     """
     models.clear()
-    loaded_data["X"] = None
-    loaded_data["y"] = None
+    model_registry.unload_all()
+    serving_state["version"] = None
+    invalidate_prediction_caches()
+    for key in loaded_data:
+        loaded_data[key] = None
 
     # Reset training state
     training_state["training"] = False
@@ -431,6 +1701,8 @@ async def reset_state():
 
 # --- Main execution ---
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
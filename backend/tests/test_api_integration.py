@@ -1,7 +1,7 @@
 import os
 import sys
-import time
 import pickle
+import unittest
 import numpy as np
 from fastapi.testclient import TestClient
 
@@ -21,75 +21,155 @@ def create_dummy_dataset(filename):
         pickle.dump(data, f)
     return filename
 
-def test_full_flow():
-    print("Starting full flow integration test...")
-    
-    # 0. Create dummy dataset
-    dataset_path = "dummy_dataset.pkl"
-    create_dummy_dataset(dataset_path)
-    
-    try:
-        # 1. Upload Dataset
-        print("Uploading dataset...")
-        with open(dataset_path, "rb") as f:
-            response = client.post("/upload", files={"file": ("dummy_dataset.pkl", f, "application/octet-stream")})
-        
-        assert response.status_code == 200
-        print("Upload successful.")
-        
-        # 2. Trigger Training
-        print("Triggering training...")
-        # The upload saves to data/dummy_dataset.pkl
-        uploaded_path = "data/dummy_dataset.pkl"
-        
-        training_payload = {
-            "data_path": uploaded_path,
-            "hidden_layers": [32, 16]
-        }
-        
-        response = client.post("/train", json=training_payload)
-        assert response.status_code == 200
-        print("Training started.")
-            # 3. Wait for training to complete
-        # TestClient runs background tasks synchronously, so training is already done.
-        print("Training completed (synchronous).")
-        
-        if not os.path.exists("scaler_params.json"):
-             print("Error: scaler_params.json not found after training.")
-             
-        if not os.path.exists("saved_model.keras"):
-             print("Error: saved_model.keras not found after training.")
-        
-        # 4. Predict
-        print("Testing prediction...")
-        # 5 features
-        payload = {
-            "feature_vector": [0.5, 0.5, 0.5, 0.5, 0.5],
-            "config": {}
-        }
-        response = client.post("/predict", json=payload)
-        
-        if response.status_code != 200:
-            print(f"Prediction failed: {response.text}")
-        
-        assert response.status_code == 200
+class TestAPIIntegration(unittest.TestCase):
+    """
+    End-to-end checks through the API. The dataset is uploaded and a base model
+    trained once; each test then exercises one feature on top of them.
+    """
+
+    dataset_name = "test_integration.pkl"
+    # The upload is linked under its file name in the data directory
+    uploaded_path = os.path.join("data", dataset_name)
+
+    @classmethod
+    def setUpClass(cls):
+        create_dummy_dataset(cls.dataset_name)
+        try:
+            with open(cls.dataset_name, "rb") as f:
+                response = client.post("/upload", files={"file": (cls.dataset_name, f, "application/octet-stream")})
+        finally:
+            os.remove(cls.dataset_name)
+        assert response.status_code == 200, response.text
+
+        # TestClient runs background tasks synchronously, so training is done when this returns
+        response = client.post("/train", json={"data_path": cls.uploaded_path, "hidden_layers": [32, 16]})
+        assert response.status_code == 200, response.text
+        cls.job_id = response.json()["job_id"]
+        cls.training_state = client.get("/status").json()["training_state"]
+        cls.job = client.get(f"/jobs/{cls.job_id}").json()
+        assert cls.job["status"] == "completed", cls.job["error"]
+        cls.version = cls.job["result"]["version"]
+
+    @classmethod
+    def tearDownClass(cls):
+        client.delete(f"/datasets/{cls.dataset_name}")
+
+    def serve_base_model(self):
+        """Puts the model trained in setUpClass back into service."""
+        response = client.post(f"/models/{self.version}/promote")
+        self.assertEqual(response.status_code, 200)
+
+    def test_training_progress(self):
+        # Progress is relayed back from the training worker process
+        state = self.training_state
+        self.assertIsNone(state["error"])
+        self.assertIsNotNone(state["final_loss"])
+        self.assertTrue(len(state["loss_history"]) == state["current_epoch"] > 0)
+        self.assertEqual(state["job_id"], self.job_id)
+        # The job keeps its own status and loss history
+        self.assertEqual(self.job["loss_history"], state["loss_history"])
+
+    def test_predict_and_batch(self):
+        self.serve_base_model()
+        response = client.post("/predict", json={"feature_vector": [0.5, 0.5, 0.5, 0.5, 0.5], "config": {}})
+        self.assertEqual(response.status_code, 200, response.text)
         result = response.json()
-        print(f"Prediction result: {result}")
-        assert "prediction" in result
-        assert isinstance(result["prediction"], float)
-        
-        # Verify scaler was used (we can't easily verify the exact value without mocking, 
-        # but we verified the file exists)
-        assert os.path.exists("scaler_params.json")
-        
-        print("Full flow test passed!")
-        
-    finally:
-        # Cleanup
-        if os.path.exists(dataset_path):
-            os.remove(dataset_path)
-        # We might want to keep the model/scaler for inspection, or clean them up.
-        # For now, keep them.
+        self.assertIsInstance(result["prediction"], float)
+
+        payload = {"feature_matrix": [[0.5, 0.5, 0.5, 0.5, 0.5]] * 3, "chunk_size": 2}
+        response = client.post("/predict/batch", json=payload)
+        self.assertEqual(response.status_code, 200, response.text)
+        batch_result = response.json()
+        self.assertEqual(batch_result["n_samples"], 3)
+        self.assertEqual(len(batch_result["predictions"]), 3)
+        np.testing.assert_allclose(batch_result["predictions"][0], result["prediction"], atol=1e-5)
+
+    def test_registry_versions(self):
+        # The trained model is published as a new version and can be put back into service
+        self.serve_base_model()
+        registry_info = client.get("/models").json()
+        self.assertEqual(registry_info["active_version"], self.version)
+        self.assertEqual(registry_info["serving_version"], self.version)
+        self.assertIn(self.version, [v["version"] for v in registry_info["versions"]])
+
+        # Predictions can pin that version while another one is in service
+        expected = client.post("/predict", json={"feature_vector": [0.5] * 5}).json()["prediction"]
+        response = client.post("/train", json={"data_path": self.uploaded_path, "backend": "ridge"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(client.get("/models").json()["active_version"], self.version)
+        response = client.post(f"/predict?version={self.version}", json={"feature_vector": [0.5] * 5})
+        self.assertEqual(response.status_code, 200)
+        np.testing.assert_allclose(response.json()["prediction"], expected, atol=1e-5)
+
+    def test_fine_tune(self):
+        # Fine-tune the served model on the same data, starting from its weights
+        self.serve_base_model()
+        response = client.post("/train", json={"data_path": self.uploaded_path, "epochs": 2, "fine_tune": True})
+        self.assertEqual(response.status_code, 200)
+        job = client.get(f"/jobs/{response.json()['job_id']}").json()
+        self.assertEqual(job["status"], "completed", job["error"])
+        tuned = client.get("/models").json()
+        self.assertEqual(tuned["active_version"], job["result"]["version"])
+        self.assertNotEqual(tuned["active_version"], self.version)
+        self.assertEqual(tuned["versions"][-1]["fine_tuned_from"], self.version)
+        self.assertEqual(tuned["versions"][-1]["hidden_layers"], [32, 16])
+
+    def test_sweep(self):
+        # Sweep two configurations in parallel and promote the winner
+        response = client.post("/sweep", json={
+            "data_path": self.uploaded_path,
+            "search_space": {"hidden_layers": [[8], [16, 8]], "learning_rate": [0.01]},
+            "max_epochs": 2,
+            "promote": True,
+        })
+        self.assertEqual(response.status_code, 200)
+        job = client.get(f"/jobs/{response.json()['job_id']}").json()
+        self.assertEqual(job["status"], "completed", job["error"])
+        board = job["result"]["leaderboard"]
+        self.assertEqual(len(board), 2)
+        self.assertTrue(all(trial["status"] == "completed" and trial["train_time"] > 0 for trial in board))
+        self.assertLessEqual(board[0]["val_loss"], board[1]["val_loss"])
+        swept = client.get("/models").json()
+        self.assertEqual(swept["active_version"], job["result"]["version"])
+        self.assertEqual(swept["versions"][-1]["hidden_layers"], board[0]["params"]["hidden_layers"])
+
+    def test_knn_surrogate(self):
+        # Fit a kNN surrogate instead of a network; it is published and served like one
+        response = client.post("/train", json={
+            "data_path": self.uploaded_path,
+            "backend": "knn",
+            "backend_params": {"k": 4},
+        })
+        self.assertEqual(response.status_code, 200)
+        job = client.get(f"/jobs/{response.json()['job_id']}").json()
+        self.assertEqual(job["status"], "completed", job["error"])
+        surrogate = client.get("/models").json()
+        self.assertEqual(surrogate["active_version"], job["result"]["version"])
+        self.assertEqual(surrogate["versions"][-1]["backend"], "knn")
+        self.assertEqual(surrogate["versions"][-1]["backend_params"], {"k": 4})
+        response = client.post("/predict", json={"feature_vector": [0.1, 0.2, 0.3, 0.4, 0.5]})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()["prediction_std"])
+
+    def test_cross_validation(self):
+        # Cross-validate a configuration over three folds trained in parallel
+        versions = client.get("/models").json()["versions"]
+        response = client.post("/cv", json={
+            "data_path": self.uploaded_path,
+            "n_splits": 3,
+            "hidden_layers": [8],
+            "max_epochs": 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        job = client.get(f"/jobs/{response.json()['job_id']}").json()
+        self.assertEqual(job["kind"], "cv")
+        self.assertEqual(job["status"], "completed", job["error"])
+        folds = job["result"]["folds"]
+        self.assertEqual([fold["fold"] for fold in folds], [0, 1, 2])
+        self.assertEqual(sum(fold["n_val"] for fold in folds), 100)
+        self.assertEqual(job["final_loss"], job["result"]["summary"]["mse"]["mean"])
+        # Cross-validation publishes nothing
+        self.assertEqual(client.get("/models").json()["versions"], versions)
 
 if __name__ == "__main__":
-    test_full_flow()
+    unittest.main()
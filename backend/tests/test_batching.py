@@ -0,0 +1,83 @@
+import threading
+import unittest
+
+import numpy as np
+
+from fivedreg.batching import MicroBatcher
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.batch_sizes = []
+
+        def predict_fn(model, X):
+            self.batch_sizes.append(X.shape[0])
+            return X.sum(axis=1) * model
+
+        self.predict_fn = predict_fn
+
+    def test_concurrent_requests_are_coalesced(self):
+        batcher = MicroBatcher(self.predict_fn, max_batch_size=64, max_wait_ms=200)
+        barrier = threading.Barrier(10)
+        futures = [None] * 10
+
+        def submit(i):
+            barrier.wait()
+            futures[i] = batcher.submit(1.0, [i, 0, 0, 0, 0])
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        results = [f.result(timeout=5) for f in futures]
+        batcher.stop()
+
+        self.assertEqual(results, [float(i) for i in range(10)])
+        self.assertLess(len(self.batch_sizes), 10)
+        self.assertEqual(sum(self.batch_sizes), 10)
+
+        stats = batcher.stats()
+        self.assertEqual(stats["n_requests"], 10)
+        self.assertEqual(stats["n_batches"], len(self.batch_sizes))
+        self.assertEqual(sum(stats["batch_size_histogram"].values()), stats["n_batches"])
+
+    def test_max_batch_size_is_respected(self):
+        batcher = MicroBatcher(self.predict_fn, max_batch_size=3, max_wait_ms=50)
+        futures = [batcher.submit(1.0, np.ones(5)) for _ in range(7)]
+        results = [f.result(timeout=5) for f in futures]
+        batcher.stop()
+
+        self.assertEqual(results, [5.0] * 7)
+        self.assertTrue(all(size <= 3 for size in self.batch_sizes))
+
+    def test_rows_are_grouped_by_model(self):
+        batcher = MicroBatcher(self.predict_fn, max_batch_size=8, max_wait_ms=50)
+        first = batcher.submit(1.0, np.ones(5))
+        second = batcher.submit(2.0, np.ones(5))
+        self.assertEqual(first.result(timeout=5), 5.0)
+        self.assertEqual(second.result(timeout=5), 10.0)
+        batcher.stop()
+
+    def test_errors_are_propagated(self):
+        def failing_fn(model, X):
+            raise RuntimeError("boom")
+
+        batcher = MicroBatcher(failing_fn, max_wait_ms=0)
+        future = batcher.submit(None, np.ones(5))
+        with self.assertRaises(RuntimeError):
+            future.result(timeout=5)
+        batcher.stop()
+
+    def test_row_results_are_returned_as_tuples(self):
+        batcher = MicroBatcher(lambda model, X: np.stack([X.sum(axis=1), X.max(axis=1)], axis=1), max_wait_ms=0)
+        batcher.start()
+        try:
+            self.assertEqual(batcher.submit(None, [1, 2, 3, 0, 0]).result(timeout=5), (6.0, 3.0))
+        finally:
+            batcher.stop()
+
+if __name__ == "__main__":
+    unittest.main()
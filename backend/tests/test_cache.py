@@ -0,0 +1,73 @@
+import unittest
+
+from fivedreg.cache import LRUCache, PredictionCache
+
+
+class Model:
+    pass
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_hit_miss_counters(self):
+        cache = LRUCache(maxsize=2)
+        cache.get("a")
+        cache.put("a", 1)
+        cache.get("a")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_disabled_cache(self):
+        cache = LRUCache(maxsize=0)
+        cache.put("a", 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_entries_per_owner(self):
+        active, pinned = Model(), Model()
+        cache = LRUCache(maxsize=4)
+        cache.put("a", 1, owner=active)
+        self.assertIsNone(cache.get("a", owner=pinned))
+        cache.put("a", 2, owner=pinned)
+
+        # Lookups for one owner leave the entries of the other in place
+        self.assertEqual(cache.get("a", owner=active), 1)
+        self.assertEqual(cache.get("a", owner=pinned), 2)
+        self.assertEqual(cache.get("a", owner=active), 1)
+
+    def test_owner_tokens_are_not_reused(self):
+        cache = LRUCache(maxsize=4)
+        model = Model()
+        cache.put("a", 1, owner=model)
+        del model
+        # Even if a new model reuses the old one's address, it gets its own entries
+        for _ in range(10):
+            self.assertIsNone(cache.get("a", owner=Model()))
+
+
+class TestPredictionCache(unittest.TestCase):
+
+    def test_quantized_keys(self):
+        model = Model()
+        cache = PredictionCache(maxsize=4, tolerance=1e-3)
+        cache.get_prediction(model, [0.1, 0.2, 0.3, 0.4, 0.5])
+        cache.put_prediction(model, [0.1, 0.2, 0.3, 0.4, 0.5], 1.5)
+
+        self.assertEqual(cache.get_prediction(model, [0.1001, 0.2, 0.3, 0.4, 0.5]), 1.5)
+        self.assertIsNone(cache.get_prediction(model, [0.11, 0.2, 0.3, 0.4, 0.5]))
+
+
+if __name__ == "__main__":
+    unittest.main()
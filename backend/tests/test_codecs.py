@@ -0,0 +1,68 @@
+import io
+import unittest
+
+import numpy as np
+
+from fivedreg.codecs import (
+    MEDIA_ARROW, MEDIA_NPY, MEDIA_OCTET_STREAM, decode_features, encode_predictions, negotiate_media_type
+)
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class TestCodecs(unittest.TestCase):
+
+    def setUp(self):
+        self.X = np.random.rand(4, 5)
+
+    def test_raw_roundtrip_is_zero_copy(self):
+        body = self.X.astype(np.float32).tobytes()
+        features = decode_features(body, MEDIA_OCTET_STREAM, dtype="float32")
+        np.testing.assert_array_equal(features, self.X.astype(np.float32))
+        self.assertFalse(features.flags.owndata)
+
+    def test_raw_rejects_bad_length_and_dtype(self):
+        with self.assertRaises(ValueError):
+            decode_features(b"\x00" * 12, MEDIA_OCTET_STREAM)
+        with self.assertRaises(ValueError):
+            decode_features(b"", MEDIA_OCTET_STREAM, dtype="int8")
+
+    def test_npy_roundtrip(self):
+        buffer = io.BytesIO()
+        np.save(buffer, self.X)
+        features = decode_features(buffer.getvalue(), MEDIA_NPY)
+        np.testing.assert_array_equal(features, self.X)
+
+        body = encode_predictions(self.X[:, 0], MEDIA_NPY, dtype="float64")
+        np.testing.assert_array_equal(np.load(io.BytesIO(body)), self.X[:, 0])
+
+    def test_npy_rejects_wrong_shape(self):
+        buffer = io.BytesIO()
+        np.save(buffer, np.zeros((3, 4)))
+        with self.assertRaises(ValueError):
+            decode_features(buffer.getvalue(), MEDIA_NPY)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_arrow_roundtrip(self):
+        table = pyarrow.table({f"x{i}": self.X[:, i] for i in range(5)})
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        features = decode_features(sink.getvalue().to_pybytes(), MEDIA_ARROW)
+        np.testing.assert_array_equal(features, self.X)
+
+        body = encode_predictions(self.X[:, 0], MEDIA_ARROW, dtype="float64")
+        result = pyarrow.ipc.open_stream(body).read_all()
+        np.testing.assert_array_equal(result.column("prediction").to_numpy(), self.X[:, 0])
+
+    def test_negotiate_media_type(self):
+        self.assertEqual(negotiate_media_type("application/x-npy, */*", MEDIA_OCTET_STREAM), MEDIA_NPY)
+        self.assertEqual(negotiate_media_type("*/*", MEDIA_OCTET_STREAM), MEDIA_OCTET_STREAM)
+        self.assertEqual(negotiate_media_type(None, MEDIA_NPY), MEDIA_NPY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from fivedreg.cv import aggregate_metrics, cross_validate, prepare_cv, regression_metrics
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_regression_metrics(self):
+        metrics = regression_metrics([1.0, 2.0, 3.0], [1.0, 2.0, 5.0])
+        self.assertAlmostEqual(metrics["mse"], 4 / 3)
+        self.assertAlmostEqual(metrics["mae"], 2 / 3)
+        self.assertAlmostEqual(metrics["r2"], -1.0)
+        self.assertIsNone(regression_metrics([1.0, 1.0], [1.0, 2.0])["r2"])
+
+    def test_aggregate_skips_unfinished_folds(self):
+        results = [
+            {"status": "completed", "metrics": {"mse": 1.0, "mae": 0.5, "r2": None}},
+            {"status": "completed", "metrics": {"mse": 3.0, "mae": 1.5, "r2": None}},
+            {"status": "failed", "metrics": None},
+        ]
+        summary = aggregate_metrics(results)
+        self.assertEqual(summary["mse"], {"mean": 2.0, "std": 1.0, "min": 1.0, "max": 3.0})
+        self.assertIsNone(summary["r2"])
+
+
+class TestCrossValidate(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        data_file = os.path.join(self.work_dir, "data.pkl")
+        self.X = np.random.rand(91, 5)
+        self.X[40, 3] = np.nan
+        with open(data_file, "wb") as f:
+            pickle.dump({"X": self.X, "y": self.X.sum(axis=1)}, f)
+        self.data_dir = os.path.join(self.work_dir, "cv")
+        os.makedirs(self.data_dir)
+        # A small chunk size, so the arrays are written over several chunks
+        self.n_samples = prepare_cv(data_file, self.data_dir, chunk_size=16)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_prepare_cv_writes_float32_without_missing_rows(self):
+        X = np.load(os.path.join(self.data_dir, "X.npy"), mmap_mode="r")
+        y = np.load(os.path.join(self.data_dir, "y.npy"), mmap_mode="r")
+        self.assertEqual(X.dtype, np.float32)
+        expected = np.delete(self.X, 40, axis=0)
+        np.testing.assert_allclose(X, expected, rtol=1e-6)
+        np.testing.assert_allclose(y, expected.sum(axis=1), rtol=1e-6)
+
+    def test_folds_run_in_parallel_and_aggregate(self):
+        updates = []
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            result = cross_validate(
+                executor, self.data_dir, 3, {"hidden_layers": [8], "batch_size": 16}, max_epochs=2,
+                on_result=updates.append
+            )
+
+        self.assertEqual(self.n_samples, 90)
+        self.assertEqual([len(update) for update in updates], [1, 2, 3])
+        self.assertEqual([fold["fold"] for fold in result["folds"]], [0, 1, 2])
+        for fold in result["folds"]:
+            self.assertEqual(fold["status"], "completed")
+            self.assertEqual((fold["n_train"], fold["n_val"]), (60, 30))
+            self.assertEqual(fold["epochs"], 2)
+        mse = [fold["metrics"]["mse"] for fold in result["folds"]]
+        self.assertAlmostEqual(result["summary"]["mse"]["mean"], np.mean(mse), places=6)
+
+    def test_cancelled_folds_are_not_scored(self):
+        cancel_event = threading.Event()
+        cancel_event.set()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            result = cross_validate(executor, self.data_dir, 2, {}, max_epochs=2, cancel_event=cancel_event)
+
+        self.assertEqual([fold["status"] for fold in result["folds"]], ["cancelled", "cancelled"])
+        self.assertIsNone(result["summary"]["mse"])
+
+
+if __name__ == "__main__":
+    unittest.main()
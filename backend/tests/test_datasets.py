@@ -0,0 +1,104 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from fivedreg.datasets import DatasetStore
+
+
+def csv_bytes(X, y):
+    return ("x0,x1,x2,x3,x4,y\n" + "".join(
+        ",".join(str(v) for v in row) + f",{target}\n" for row, target in zip(X, y)
+    )).encode()
+
+
+class TestDatasetStore(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.links = os.path.join(self.root, "data")
+        # A small chunk size, so uploads are hashed and written over several reads
+        self.store = DatasetStore(os.path.join(self.root, "store"), link_dir=self.links, chunk_size=64)
+        self.X = np.random.rand(50, 5)
+        self.y = np.random.rand(50)
+        self.X[3, 1] = np.nan
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_add_hashes_parses_and_caches(self):
+        content = csv_bytes(self.X, self.y)
+        metadata = self.store.add(io.BytesIO(content), "train.csv")
+        self.assertEqual(metadata["sha256"], hashlib.sha256(content).hexdigest())
+        self.assertEqual(metadata["name"], "train.csv")
+        self.assertEqual(metadata["size_bytes"], len(content))
+        self.assertEqual(metadata["n_samples"], 49)
+        self.assertFalse(metadata["deduplicated"])
+
+        # The cached arrays are memory-mapped and hold the rows without missing values
+        X, y = self.store.load("train.csv")
+        self.assertIsInstance(X, np.memmap)
+        np.testing.assert_allclose(X, np.delete(self.X, 3, axis=0))
+        np.testing.assert_allclose(y, np.delete(self.y, 3))
+        self.assertEqual(self.store.resolve(metadata["sha256"]), metadata["sha256"])
+
+        # The upload is linked under its file name with its original bytes
+        with open(os.path.join(self.links, "train.csv"), "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_deduplication_and_names(self):
+        content = csv_bytes(self.X, self.y)
+        first = self.store.add(io.BytesIO(content), "train.csv")
+        second = self.store.add(io.BytesIO(content), "copy.csv", name="copy")
+        self.assertTrue(second["deduplicated"])
+        self.assertEqual(self.store.path("copy"), self.store.path("train.csv"))
+        self.assertEqual([d["name"] for d in self.store.datasets()], ["copy", "train.csv"])
+
+        # The name moves to the new content; the old content is kept for the other name
+        changed = self.store.add(io.BytesIO(csv_bytes(self.X[:10], self.y[:10])), "train.csv")
+        self.assertNotEqual(changed["sha256"], first["sha256"])
+        self.assertEqual(self.store.resolve("copy"), first["sha256"])
+
+        self.store.remove("copy")
+        self.assertFalse(self.store.exists(first["sha256"]))
+        self.assertTrue(self.store.exists(changed["sha256"]))
+        with self.assertRaises(KeyError):
+            self.store.resolve("copy")
+
+    def test_links_never_replace_other_files(self):
+        os.makedirs(self.links)
+        existing = os.path.join(self.links, "train.csv")
+        with open(existing, "wb") as f:
+            f.write(b"not from the store")
+
+        metadata = self.store.add(io.BytesIO(csv_bytes(self.X, self.y)), "train.csv")
+        self.assertEqual(self.store.metadata("train.csv")["sha256"], metadata["sha256"])
+        self.store.remove("train.csv")
+        with open(existing, "rb") as f:
+            self.assertEqual(f.read(), b"not from the store")
+
+        # A link the store created is replaced by a new upload under the same file name
+        os.remove(existing)
+        self.store.add(io.BytesIO(csv_bytes(self.X, self.y)), "train.csv")
+        content = csv_bytes(self.X[:10], self.y[:10])
+        self.store.add(io.BytesIO(content), "train.csv")
+        with open(existing, "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_invalid_uploads(self):
+        with self.assertRaises(ValueError):
+            self.store.add(io.BytesIO(b"data"), "train.txt")
+        with self.assertRaises(ValueError):
+            self.store.add(io.BytesIO(b"data"), "../train.csv")
+        with self.assertRaises(ValueError):
+            self.store.add(io.BytesIO(b"not a pickle"), "train.pkl")
+        # Failed uploads leave nothing behind
+        self.assertEqual(os.listdir(self.store.root_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,8 @@ import unittest
 import numpy as np
 import pickle
 import os
-from fivedreg.data import load_dataset, split_data, standardize_data
+import tracemalloc
+from fivedreg.data import Scaler, kfold_indices, load_dataset, prepare_dataset, split_data, standardize_data
 
 class TestFivedregData(unittest.TestCase):
     
@@ -41,6 +42,70 @@ class TestFivedregData(unittest.TestCase):
         self.assertEqual(X.shape, (98, 5))
         self.assertEqual(y.shape, (98,))
 
+    def test_load_dataset_formats(self):
+        import shutil
+        import tempfile
+        
+        work_dir = tempfile.mkdtemp()
+        try:
+            table = np.column_stack([self.X_nan, self.y_nan])
+            npy_file = os.path.join(work_dir, 'data.npy')
+            np.save(npy_file, table)
+            csv_file = os.path.join(work_dir, 'data.csv')
+            np.savetxt(csv_file, table, delimiter=',', header='a,b,c,d,e,y', comments='')
+            npz_file = os.path.join(work_dir, 'data.npz')
+            np.savez(npz_file, X=self.X_nan, y=self.y_nan)
+            
+            for path in (npy_file, csv_file, npz_file):
+                X, y = load_dataset(path, chunk_size=16)
+                self.assertEqual(X.shape, (98, 5))
+                np.testing.assert_allclose(X, self.X[2:], rtol=1e-6)
+                np.testing.assert_allclose(y, self.y[2:], rtol=1e-6)
+                
+            # Without missing values, .npy datasets stay memory-mapped
+            np.save(npy_file, np.column_stack([self.X, self.y]))
+            self.assertIsInstance(load_dataset(npy_file)[0], np.memmap)
+            
+            # Chunked formats can be written to memory maps instead of RAM
+            X, y = load_dataset(csv_file, cache_dir=os.path.join(work_dir, 'cache'), chunk_size=16)
+            self.assertIsInstance(X, np.memmap)
+            self.assertEqual(X.shape, (98, 5))
+            
+            json_file = os.path.join(work_dir, 'data.json')
+            with open(json_file, 'w') as f:
+                f.write('{}')
+            with self.assertRaises(ValueError):
+                load_dataset(json_file)
+        finally:
+            shutil.rmtree(work_dir)
+        
+    def test_load_dataset_parquet_and_hdf5(self):
+        import shutil
+        import tempfile
+        try:
+            import h5py
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            self.skipTest("pyarrow and h5py are optional")
+            
+        work_dir = tempfile.mkdtemp()
+        try:
+            columns = {f'x{i}': self.X_nan[:, i] for i in range(5)}
+            parquet_file = os.path.join(work_dir, 'data.parquet')
+            pq.write_table(pa.table({**columns, 'target': self.y_nan}), parquet_file, row_group_size=30)
+            h5_file = os.path.join(work_dir, 'data.h5')
+            with h5py.File(h5_file, 'w') as f:
+                f.create_dataset('X', data=self.X_nan, chunks=(10, 5), compression='gzip')
+                f.create_dataset('target', data=self.y_nan)
+                
+            for path in (parquet_file, h5_file):
+                X, y = load_dataset(path, target='target', chunk_size=16)
+                self.assertEqual(X.shape, (98, 5))
+                np.testing.assert_allclose(y, self.y[2:], rtol=1e-6)
+        finally:
+            shutil.rmtree(work_dir)
+            
     def test_split_data(self):
         X_train, y_train, X_val, y_val, X_test, y_test = split_data(self.X, self.y, 0.7, 0.15, 0.15)
         self.assertEqual(X_train.shape[0], 70)
@@ -54,6 +119,113 @@ class TestFivedregData(unittest.TestCase):
         # Check mean is approx 0 and std is approx 1 for train set
         self.assertTrue(np.allclose(np.mean(X_train_s, axis=0), 0, atol=1e-6))
         self.assertTrue(np.allclose(np.std(X_train_s, axis=0), 1, atol=1e-6))
+        
+    def test_split_data_order(self):
+        # The split must stay the one earlier versions drew from the global seed
+        np.random.seed(42)
+        indices = np.arange(100)
+        np.random.shuffle(indices)
+        X_train, _, X_val, _, X_test, _ = split_data(self.X, self.y)
+        self.assertTrue(np.array_equal(np.concatenate([X_train, X_val, X_test]), self.X[indices]))
+        
+    def test_scaler_transform_in_place(self):
+        scaler = Scaler()
+        scaler.fit(self.X)
+        expected = scaler.transform(self.X)
+        X = self.X.copy()
+        self.assertIs(scaler.transform(X, copy=False, chunk_size=7), X)
+        self.assertEqual(X.dtype, np.float32)
+        self.assertTrue(np.allclose(X, expected, atol=1e-5))
+        
+    def test_scaler_partial_fit(self):
+        X = np.random.rand(1000, 5) * 100 + 1e6
+        expected = Scaler()
+        expected.fit(X)
+        self.assertTrue(np.allclose(expected.std, np.std(X, axis=0)))
+        
+        # Streamed batches, and scalers fitted on separate chunks, give the same statistics
+        streamed = Scaler()
+        for start in range(0, 1000, 300):
+            streamed.partial_fit(X[start:start + 300], chunk_size=64)
+        merged = Scaler().fit(X[:123]).merge(Scaler().fit(X[123:])).merge(Scaler())
+        for scaler in (streamed, merged):
+            self.assertEqual(scaler.n_samples, 1000)
+            self.assertTrue(np.allclose(scaler.mean, expected.mean))
+            self.assertTrue(np.allclose(scaler.std, expected.std))
+            
+        # Statistics without a sample count cannot be extended
+        legacy = Scaler().from_dict({"mean": [0.0] * 5, "std": [1.0] * 5})
+        with self.assertRaises(ValueError):
+            legacy.partial_fit(X)
+        with self.assertRaises(ValueError):
+            Scaler().merge(legacy)
+            
+    def test_scaler_save_load(self):
+        scaler = Scaler().fit(self.X)
+        for path in ('test_scaler.bin', 'test_scaler.json'):
+            try:
+                scaler.save(path)
+                loaded = Scaler().load(path)
+                self.assertTrue(np.array_equal(loaded.mean, scaler.mean))
+                self.assertTrue(np.array_equal(loaded.std, scaler.std))
+                # The running statistics are kept, so a loaded scaler can be updated
+                loaded.partial_fit(self.X)
+                self.assertEqual(loaded.n_samples, 200)
+                self.assertTrue(np.allclose(loaded.mean, scaler.mean))
+            finally:
+                os.remove(path)
+                
+    def test_prepare_dataset(self):
+        data = prepare_dataset(self.X_nan, self.y_nan, dtype=np.float64, chunk_size=16)
+        self.assertEqual(data["n_dropped"], 2)
+        
+        # Same split and scaling as dropping the missing rows, splitting and standardizing
+        X, y = self.X[2:], self.y[2:]
+        X_train, y_train, X_val, y_val, X_test, y_test = split_data(X, y)
+        X_train_s, X_val_s, X_test_s = standardize_data(X_train, X_val, X_test)
+        for name, expected in (("X_train", X_train_s), ("X_val", X_val_s), ("X_test", X_test_s),
+                               ("y_train", y_train), ("y_val", y_val), ("y_test", y_test)):
+            self.assertTrue(np.allclose(data[name], expected), name)
+        # The three sets are views of a single array
+        self.assertIs(data["X_val"].base, data["X_train"].base)
+        
+        # A given scaler is applied instead of fitting a new one
+        data = prepare_dataset(self.X, self.y, scaler=data["scaler"])
+        self.assertEqual(data["X_train"].dtype, np.float32)
+        self.assertTrue(np.allclose(data["scaler"].mean, np.mean(X_train, axis=0)))
+        
+    def test_prepare_dataset_memory(self):
+        X = np.random.rand(200000, 5)
+        y = np.random.rand(200000)
+        tracemalloc.start()
+        X_train, y_train, X_val, y_val, X_test, y_test = split_data(X, y)
+        standardize_data(X_train, X_val, X_test)
+        legacy_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del X_train, y_train, X_val, y_val, X_test, y_test
+        
+        self.assertIsNone(prepare_dataset(X, y)["peak_mb"])
+        data = prepare_dataset(X, y, chunk_size=4096, report_memory=True)
+        self.assertLess(data["peak_mb"] * 1024 * 1024, legacy_peak / 2)
+        self.assertLess(data["peak_mb"], 2 * data["data_mb"])
+
+    def test_kfold_indices(self):
+        folds = kfold_indices(103, n_splits=5, seed=0)
+        self.assertEqual([len(val) for _, val in folds], [21, 21, 21, 20, 20])
+        # Every row is held out exactly once and never trains on its own fold
+        self.assertTrue(np.array_equal(np.sort(np.concatenate([val for _, val in folds])), np.arange(103)))
+        for train, val in folds:
+            self.assertEqual(len(train) + len(val), 103)
+            self.assertFalse(np.intersect1d(train, val).size)
+            
+        train, val = kfold_indices(103, n_splits=5, fold=2, seed=0)
+        self.assertTrue(np.array_equal(val, folds[2][1]))
+        self.assertTrue(np.array_equal(kfold_indices(10, 2, shuffle=False)[0][1], np.arange(5)))
+        
+        with self.assertRaises(ValueError):
+            kfold_indices(10, n_splits=1)
+        with self.assertRaises(ValueError):
+            kfold_indices(10, n_splits=2, fold=2)
 
 if __name__ == '__main__':
     unittest.main()
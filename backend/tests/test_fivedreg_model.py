@@ -0,0 +1,133 @@
+import os
+import unittest
+
+import numpy as np
+
+from fivedreg.data import Scaler
+from fivedreg.model import FiveDNet
+
+
+class TestFiveDNet(unittest.TestCase):
+
+    def setUp(self):
+        self.test_file = "test_model.keras"
+        self.X = np.random.rand(50, 5)
+        self.y = np.random.rand(50)
+
+    def tearDown(self):
+        if os.path.exists(self.test_file):
+            os.remove(self.test_file)
+
+    def test_save_load_embeds_scaler(self):
+        model = FiveDNet(hidden_layers=[4], max_epochs=1, verbose=0)
+        model.fit(self.X, self.y)
+        model.scaler = Scaler()
+        model.scaler.fit(self.X)
+        model.save(self.test_file)
+
+        loaded = FiveDNet()
+        loaded.load(self.test_file)
+        self.assertIsNotNone(loaded.scaler)
+        np.testing.assert_allclose(loaded.scaler.mean, model.scaler.mean)
+        np.testing.assert_allclose(loaded.scaler.std, model.scaler.std)
+        np.testing.assert_allclose(loaded.predict(self.X), model.predict(self.X), rtol=1e-5)
+
+    def test_load_without_scaler(self):
+        model = FiveDNet(hidden_layers=[4], max_epochs=1, verbose=0)
+        model.fit(self.X, self.y)
+        model.save(self.test_file)
+
+        loaded = FiveDNet()
+        loaded.load(self.test_file)
+        self.assertIsNone(loaded.scaler)
+
+    def test_fit_uses_batch_size_and_validation_data(self):
+        import tensorflow as tf
+
+        batches = []
+        count = tf.keras.callbacks.LambdaCallback(on_train_batch_end=lambda batch, logs: batches.append(batch))
+        model = FiveDNet(hidden_layers=[4], max_epochs=1, batch_size=16, verbose=0)
+        history = model.fit(self.X, self.y, callbacks=[count], validation_data=(self.X[:10], self.y[:10]))
+
+        # All 50 rows are used for training since validation data is given explicitly
+        self.assertEqual(len(batches), 4)
+        self.assertIn("val_loss", history.history)
+
+    def test_predict_is_silent(self):
+        import contextlib
+        import io
+
+        model = FiveDNet(hidden_layers=[4], max_epochs=1, n_members=2, verbose=0)
+        model.fit(self.X, self.y)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            model.predict(self.X)
+            model.predict_members(self.X)
+        # Serving calls predict for every batch, so it must not print progress bars
+        self.assertEqual(output.getvalue(), "")
+
+    def test_make_dataset_reshuffles_every_epoch(self):
+        def epoch_targets(dataset):
+            return np.concatenate([y.numpy() for _, y in dataset])
+
+        dataset = FiveDNet(batch_size=16, seed=7).make_dataset(self.X, self.y, shuffle=True)
+        first, second = epoch_targets(dataset), epoch_targets(dataset)
+        # A seeded pipeline still visits the rows in a new order each epoch...
+        self.assertFalse(np.array_equal(first, second))
+        np.testing.assert_allclose(np.sort(first), np.sort(second))
+        # ...and the sequence of orders is reproducible
+        repeat = FiveDNet(batch_size=16, seed=7).make_dataset(self.X, self.y, shuffle=True)
+        np.testing.assert_array_equal(epoch_targets(repeat), first)
+        np.testing.assert_array_equal(epoch_targets(repeat), second)
+
+    def test_make_dataset_batches_float32(self):
+        model = FiveDNet(batch_size=16, seed=0)
+        batches = list(model.make_dataset(self.X, self.y, shuffle=True))
+
+        self.assertEqual([len(y) for _, y in batches], [16, 16, 16, 2])
+        self.assertEqual(batches[0][0].dtype.name, "float32")
+        targets = np.concatenate([y.numpy() for _, y in batches])
+        np.testing.assert_allclose(np.sort(targets), np.sort(self.y.astype(np.float32)))
+
+    def test_ensemble_trains_members_in_one_model(self):
+        model = FiveDNet(hidden_layers=[8, 4], max_epochs=2, n_members=3, verbose=0)
+        history = model.fit(self.X, self.y)
+
+        members = model.predict_members(self.X)
+        self.assertEqual(members.shape, (50, 3))
+        # Members start from different weights, so their predictions differ
+        self.assertGreater(members.std(axis=1).mean(), 0)
+        np.testing.assert_allclose(model.predict(self.X), members.mean(axis=1), rtol=1e-5)
+        self.assertEqual(len(history.history["loss"]), 2)
+        self.assertEqual([kernel.shape for kernel, _, _ in model.export_weights()], [(3, 5, 8), (3, 8, 4), (3, 4, 1)])
+
+        model.save(self.test_file)
+        loaded = FiveDNet()
+        loaded.load(self.test_file)
+        self.assertEqual(loaded.n_members, 3)
+        self.assertEqual(loaded.hidden_layers, [8, 4])
+        np.testing.assert_allclose(loaded.predict_members(self.X), members, rtol=1e-5)
+
+    def test_compilation_modes(self):
+        model = FiveDNet(hidden_layers=[8], max_epochs=2, batch_size=10, verbose=0, jit_compile=True,
+                         precision="mixed_bfloat16", steps_per_execution=4)
+        history = model.fit(self.X, self.y)
+
+        self.assertTrue(model.model.jit_compile)
+        self.assertEqual(model.model.steps_per_execution, 4)
+        self.assertEqual(len(history.history["loss"]), 2)
+        # Hidden layers compute in bfloat16, the weights and the output stay float32
+        self.assertEqual(model.model.layers[0].compute_dtype, "bfloat16")
+        self.assertEqual(model.predict(self.X).dtype, np.float32)
+        self.assertTrue(all(kernel.dtype == np.float32 for kernel, _, _ in model.export_weights()))
+
+        model.save(self.test_file)
+        loaded = FiveDNet()
+        loaded.load(self.test_file)
+        self.assertEqual(loaded.precision, "mixed_bfloat16")
+
+        with self.assertRaises(ValueError):
+            FiveDNet(precision="float64")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import unittest
+
+import numpy as np
+
+from fivedreg.data import Scaler
+from fivedreg.inference import NumpyMLP
+from fivedreg.model import FiveDNet
+
+
+class TestNumpyMLP(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.X = rng.random((64, 5))
+        cls.y = cls.X.sum(axis=1)
+        cls.model = FiveDNet(hidden_layers=[8, 4], max_epochs=1, verbose=0)
+        cls.model.fit(cls.X, cls.y)
+
+    def setUp(self):
+        self.test_file = "test_engine.npz"
+
+    def tearDown(self):
+        if os.path.exists(self.test_file):
+            os.remove(self.test_file)
+
+    def test_matches_keras_predictions(self):
+        engine = NumpyMLP.from_fivednet(self.model)
+        np.testing.assert_allclose(engine.predict(self.X), self.model.predict(self.X), rtol=1e-4, atol=1e-5)
+
+    def test_folded_scaler_matches_scaled_predictions(self):
+        scaler = Scaler()
+        scaler.fit(self.X * 3.0 + 1.0)
+        engine = NumpyMLP.from_fivednet(self.model, scaler)
+
+        expected = self.model.predict(scaler.transform(self.X))
+        np.testing.assert_allclose(engine.predict(self.X), expected, rtol=1e-4, atol=1e-5)
+
+    def test_save_load_roundtrip(self):
+        engine = NumpyMLP.from_fivednet(self.model)
+        engine.save(self.test_file)
+
+        loaded = NumpyMLP()
+        loaded.load(self.test_file)
+        np.testing.assert_array_equal(loaded.predict(self.X), engine.predict(self.X))
+
+    def test_unloaded_engine_raises(self):
+        with self.assertRaises(ValueError):
+            NumpyMLP().predict(self.X)
+
+    def test_ensemble_matches_keras_members(self):
+        ensemble = FiveDNet(hidden_layers=[8, 4], max_epochs=1, n_members=4, verbose=0)
+        ensemble.fit(self.X, self.y)
+        scaler = Scaler()
+        scaler.fit(self.X)
+
+        engine = NumpyMLP.from_fivednet(ensemble, scaler)
+        self.assertEqual(engine.n_members, 4)
+        expected = ensemble.predict_members(scaler.transform(self.X))
+        np.testing.assert_allclose(engine.predict_members(self.X), expected, rtol=1e-4, atol=1e-5)
+        np.testing.assert_allclose(engine.predict(self.X), expected.mean(axis=1), rtol=1e-4, atol=1e-5)
+
+        engine.save(self.test_file)
+        loaded = NumpyMLP()
+        loaded.load(self.test_file)
+        np.testing.assert_array_equal(loaded.predict_members(self.X), engine.predict_members(self.X))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import threading
+import time
+import unittest
+
+from fivedreg.jobs import JobCancelled, JobManager, QueueFullError
+
+
+class TestJobManager(unittest.TestCase):
+
+    def run_in_thread(self, manager, job, fn):
+        thread = threading.Thread(target=manager.run, args=(job, fn))
+        thread.start()
+        return thread
+
+    def test_jobs_get_unique_ids_and_record_results(self):
+        manager = JobManager()
+        first = manager.create("train")
+        second = manager.create("train")
+        self.assertNotEqual(first.id, second.id)
+
+        manager.run(first, lambda job: {"value": 1})
+        self.assertEqual(first.status, "completed")
+        self.assertEqual(first.result, {"value": 1})
+        self.assertIs(manager.get(first.id), first)
+
+        def fail(job):
+            raise ValueError("boom")
+
+        manager.run(second, fail)
+        self.assertEqual(second.status, "failed")
+        self.assertEqual(second.error, "boom")
+
+    def test_queue_limit(self):
+        manager = JobManager(max_queued=2)
+        manager.create("train")
+        manager.create("train")
+        with self.assertRaises(QueueFullError):
+            manager.create("train")
+
+    def test_concurrency_limit_and_fifo_order(self):
+        manager = JobManager(max_concurrent=1)
+        release = threading.Event()
+        order = []
+
+        def work(job):
+            order.append(job.id)
+            release.wait(5)
+
+        jobs = [manager.create("train") for _ in range(3)]
+        # Start the waiting jobs first to check they still run in submission order
+        threads = [self.run_in_thread(manager, job, work) for job in reversed(jobs)]
+        deadline = time.time() + 5
+        while manager.counts()["running"] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(manager.counts(), {"queued": 2, "running": 1})
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(order, [job.id for job in jobs])
+        self.assertTrue(all(job.status == "completed" for job in jobs))
+
+    def test_cancel_queued_and_running_jobs(self):
+        manager = JobManager(max_concurrent=1)
+        started = threading.Event()
+
+        def work(job):
+            started.set()
+            while not job.cancel_requested:
+                time.sleep(0.01)
+            raise JobCancelled()
+
+        running = manager.create("train")
+        queued = manager.create("train")
+        running_thread = self.run_in_thread(manager, running, work)
+        queued_thread = self.run_in_thread(manager, queued, work)
+        self.assertTrue(started.wait(5))
+
+        manager.cancel(queued.id)
+        queued_thread.join(5)
+        self.assertEqual(queued.status, "cancelled")
+        self.assertIsNone(queued.started_at)
+
+        manager.cancel(running.id)
+        running_thread.join(5)
+        self.assertEqual(running.status, "cancelled")
+        self.assertEqual(manager.counts(), {"queued": 0, "running": 0})
+
+    def test_replayed_epochs_replace_history(self):
+        job = JobManager().create("train")
+        for epoch in (0, 1, 2, 1, 2, 3):
+            job.record_epoch(epoch, {"loss": float(epoch)})
+        self.assertEqual([entry["epoch"] for entry in job.loss_history], [1, 2, 3, 4])
+        self.assertEqual(job.current_epoch, 4)
+
+    def test_finished_jobs_are_trimmed(self):
+        manager = JobManager(max_history=1)
+        for _ in range(3):
+            manager.run(manager.create("train"), lambda job: None)
+        manager.create("train")
+        self.assertEqual(len(manager.list()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from fivedreg.data import load_dataset, prepare_dataset
+from fivedreg.preprocessing import PreprocessingCache
+
+
+class TestPreprocessingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = PreprocessingCache(os.path.join(self.root, "cache"))
+        self.data_path = os.path.join(self.root, "data.pkl")
+        X = np.random.rand(200, 5)
+        X[7, 2] = np.nan
+        with open(self.data_path, "wb") as f:
+            pickle.dump({"X": X, "y": np.random.rand(200)}, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_prepare_caches_arrays(self):
+        first = self.cache.prepare(self.data_path)
+        self.assertFalse(first["cached"])
+        second = self.cache.prepare(self.data_path)
+        self.assertTrue(second["cached"])
+        self.assertIsInstance(second["X_train"], np.memmap)
+        self.assertEqual(second["n_dropped"], 1)
+
+        # A hit returns what prepare_dataset computes
+        X, y = load_dataset(self.data_path, drop_missing=False)
+        expected = prepare_dataset(X, y)
+        for name in ("X_train", "y_train", "X_val", "y_val", "X_test", "y_test"):
+            np.testing.assert_array_equal(second[name], expected[name])
+        np.testing.assert_array_equal(second["scaler"].mean, expected["scaler"].mean)
+
+        # Another split, dtype or dataset is another entry
+        self.assertFalse(self.cache.prepare(self.data_path, seed=1)["cached"])
+        self.assertFalse(self.cache.prepare(self.data_path, dtype=np.float64)["cached"])
+        self.assertFalse(self.cache.prepare(self.data_path, dataset_hash="other")["cached"])
+        self.assertEqual(len(self.cache.entries()), 4)
+
+    def test_eviction(self):
+        data = self.cache.prepare(self.data_path)
+        entry_size = self.cache.usage()
+        self.cache.budget_bytes = 2 * entry_size
+        self.cache.prepare(self.data_path, seed=1)
+        # The modification times order the entries; make the first entry the most recently used
+        time.sleep(0.01)
+        self.assertTrue(self.cache.prepare(self.data_path)["cached"])
+
+        self.cache.prepare(self.data_path, seed=2)
+        self.assertEqual(len(self.cache.entries()), 2)
+        self.assertTrue(self.cache.prepare(self.data_path)["cached"])
+        self.assertFalse(self.cache.prepare(self.data_path, seed=1)["cached"])
+
+        # Entries larger than the budget are not stored
+        self.cache.budget_bytes = entry_size - 1
+        self.cache.clear()
+        self.cache.put(self.cache.make_key("big"), data)
+        self.assertEqual(self.cache.entries(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
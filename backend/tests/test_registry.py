@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from fivedreg.registry import ModelRegistry
+
+
+def read_loader(artifact_dir):
+    with open(os.path.join(artifact_dir, "model.txt")) as f:
+        return f.read()
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.source = os.path.join(self.root, "source.txt")
+        self.registry = ModelRegistry(os.path.join(self.root, "models"), loader=read_loader)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def publish(self, content, **metadata):
+        with open(self.source, "w") as f:
+            f.write(content)
+        return self.registry.publish({"model.txt": self.source}, metadata=metadata)
+
+    def test_publish_is_immutable(self):
+        first = self.publish("one", final_loss=0.5)
+        second = self.publish("two")
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.registry.get(first), "one")
+        self.assertEqual(self.registry.get(second), "two")
+        self.assertEqual([v["version"] for v in self.registry.versions()], [first, second])
+        self.assertEqual(self.registry.versions()[0]["final_loss"], 0.5)
+        self.assertEqual(self.registry.metadata(first)["final_loss"], 0.5)
+
+    def test_promote_and_active_version(self):
+        self.assertIsNone(self.registry.active_version())
+        version = self.publish("one")
+        self.registry.promote(version)
+        self.assertEqual(self.registry.active_version(), version)
+
+        with self.assertRaises(KeyError):
+            self.registry.promote("missing")
+
+    def test_unknown_versions(self):
+        for version in ("missing", "../models", ".tmp"):
+            with self.assertRaises(KeyError):
+                self.registry.get(version)
+
+    def test_lru_eviction_under_memory_budget(self):
+        registry = ModelRegistry(
+            os.path.join(self.root, "models"), loader=read_loader,
+            memory_budget_bytes=2, sizeof=lambda artifact_dir, model: 1
+        )
+        self.registry = registry
+        first, second, third = self.publish("a"), self.publish("b"), self.publish("c")
+
+        registry.get(first)
+        registry.get(second)
+        registry.get(first)
+        registry.get(third)
+        self.assertEqual(registry.loaded_versions(), [first, third])
+        self.assertEqual(registry.memory_usage(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+import unittest
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_app_import_does_not_load_tensorflow(self):
+        """Importing the API must not import TensorFlow, so /health is served immediately."""
+        code = "import sys, main; sys.exit('tensorflow' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True)
+        self.assertEqual(result.returncode, 0, "TensorFlow was imported by 'import main'")
+
+    def test_package_import_does_not_load_tensorflow(self):
+        code = "import sys, fivedreg, fivedreg.inference; sys.exit('tensorflow' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True)
+        self.assertEqual(result.returncode, 0, "TensorFlow was imported by 'import fivedreg'")
+
+
+if __name__ == "__main__":
+    unittest.main()
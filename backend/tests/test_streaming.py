@@ -0,0 +1,71 @@
+import io
+import pickle
+import unittest
+
+import numpy as np
+
+from fivedreg.streaming import iter_feature_chunks, prefetch
+
+
+class TestIterFeatureChunks(unittest.TestCase):
+
+    def setUp(self):
+        self.X = np.random.rand(7, 5)
+
+    def assertChunks(self, chunks, sizes):
+        chunks = list(chunks)
+        self.assertEqual([c.shape[0] for c in chunks], sizes)
+        np.testing.assert_allclose(np.concatenate(chunks), self.X)
+
+    def test_npy_chunks(self):
+        buffer = io.BytesIO()
+        np.save(buffer, self.X)
+        buffer.seek(0)
+        self.assertChunks(iter_feature_chunks(buffer, "features.npy", 3), [3, 3, 1])
+
+    def test_csv_chunks_with_and_without_header(self):
+        body = "\n".join(",".join(repr(float(v)) for v in row) for row in self.X)
+        self.assertChunks(iter_feature_chunks(io.BytesIO(body.encode()), "features.csv", 4), [4, 3])
+
+        body = "a,b,c,d,e\n" + body
+        self.assertChunks(iter_feature_chunks(io.BytesIO(body.encode()), "features.csv", 4), [4, 3])
+
+    def test_pickle_chunks(self):
+        buffer = io.BytesIO(pickle.dumps({"X": self.X, "y": np.zeros(7)}))
+        self.assertChunks(iter_feature_chunks(buffer, "features.pkl", 5, allow_pickle=True), [5, 2])
+
+        # Pickles are only read when explicitly allowed
+        buffer.seek(0)
+        with self.assertRaises(ValueError):
+            iter_feature_chunks(buffer, "features.pkl", 5)
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            iter_feature_chunks(io.BytesIO(), "features.txt", 3)
+
+        buffer = io.BytesIO()
+        np.save(buffer, np.zeros((3, 4)))
+        buffer.seek(0)
+        with self.assertRaises(ValueError):
+            list(iter_feature_chunks(buffer, "features.npy", 3))
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def test_preserves_order(self):
+        self.assertEqual(list(prefetch(iter(range(10)), depth=2)), list(range(10)))
+
+    def test_reraises_errors(self):
+        def failing():
+            yield 1
+            raise RuntimeError("boom")
+
+        results = []
+        with self.assertRaises(RuntimeError):
+            for item in prefetch(failing()):
+                results.append(item)
+        self.assertEqual(results, [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from fivedreg.data import Scaler
+from fivedreg.surrogates import (
+    BACKENDS, KNNRegressor, RBFRegressor, RidgeRegressor, SurrogateRegressor, load_surrogate, make_surrogate
+)
+
+
+def smooth_function(X):
+    return np.sin(X[:, 0]) + X[:, 1] * X[:, 2] - 0.5 * X[:, 3] ** 2 + X[:, 4]
+
+
+class TestSurrogates(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.X = rng.uniform(-1, 1, (400, 5))
+        self.y = smooth_function(self.X)
+        self.X_test = rng.uniform(-0.8, 0.8, (100, 5))
+        self.y_test = smooth_function(self.X_test)
+        self.work_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_backends_fit_smooth_function(self):
+        self.assertEqual(BACKENDS, ("fivednet", "rbf", "knn", "ridge"))
+        variance = np.var(self.y_test)
+        for model, max_relative_mse in (
+            (RBFRegressor(), 0.05),
+            (RBFRegressor(neighbors=50), 0.05),
+            (KNNRegressor(k=5), 0.5),
+            (RidgeRegressor(degree=2), 0.05),
+        ):
+            model.fit(self.X, self.y)
+            mse = np.mean((model.predict(self.X_test) - self.y_test) ** 2)
+            self.assertLess(mse / variance, max_relative_mse, model.name)
+
+    def test_save_load_round_trip(self):
+        for name in ("rbf", "knn", "ridge"):
+            model = make_surrogate(name).fit(self.X, self.y)
+            model.scaler = Scaler().from_dict({"mean": [0.0] * 5, "std": [1.0] * 5})
+            path = os.path.join(self.work_dir, f"{name}.npz")
+            model.save(path)
+
+            loaded = load_surrogate(path)
+            self.assertIsInstance(loaded, type(model))
+            self.assertEqual(loaded.get_params(), model.get_params())
+            np.testing.assert_allclose(loaded.scaler.std, model.scaler.std)
+            np.testing.assert_allclose(loaded.predict(self.X_test), model.predict(self.X_test), rtol=1e-10)
+
+    def test_knn_weights(self):
+        model = KNNRegressor(k=3).fit(self.X, self.y)
+        # A query on a training point returns its target exactly
+        np.testing.assert_allclose(model.predict(self.X[:10]), self.y[:10])
+        uniform = KNNRegressor(k=len(self.y), weights="uniform").fit(self.X, self.y)
+        np.testing.assert_allclose(uniform.predict(self.X[:2]), [self.y.mean()] * 2)
+
+    def test_ridge_recovers_quadratic(self):
+        y = 1.0 + 2.0 * self.X[:, 0] - 3.0 * self.X[:, 1] * self.X[:, 4] + self.X[:, 2] ** 2
+        model = RidgeRegressor(alpha=1e-9, degree=2, chunk_size=64).fit(self.X, y)
+        np.testing.assert_allclose(model.predict(self.X_test), 1.0 + 2.0 * self.X_test[:, 0]
+                                   - 3.0 * self.X_test[:, 1] * self.X_test[:, 4] + self.X_test[:, 2] ** 2,
+                                   atol=1e-6)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            make_surrogate("gaussian_process")
+        with self.assertRaises(ValueError):
+            make_surrogate("knn", {"n_neighbours": 3})
+        with self.assertRaises(ValueError):
+            RBFRegressor(max_points=100).fit(self.X, self.y)
+        with self.assertRaises(ValueError):
+            KNNRegressor(k=1000).fit(self.X, self.y)
+        with self.assertRaises(ValueError):
+            RidgeRegressor().predict(self.X)
+
+        # A backend that does not implement the whole interface cannot be created
+        class Incomplete(SurrogateRegressor):
+            def fit(self, X, y):
+                return self
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+if __name__ == "__main__":
+    unittest.main()
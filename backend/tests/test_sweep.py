@@ -0,0 +1,103 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+
+from fivedreg.sweep import expand_search_space, leaderboard, prepare_split, run_sweep
+
+
+class TestSearchSpace(unittest.TestCase):
+
+    def test_grid(self):
+        trials = expand_search_space({"hidden_layers": [[8], [8, 4]], "learning_rate": [0.1, 0.01]})
+        self.assertEqual(len(trials), 4)
+        self.assertIn({"hidden_layers": [8, 4], "learning_rate": 0.01}, trials)
+        self.assertEqual(len(expand_search_space({"batch_size": [16, 32, 64]}, n_trials=2)), 2)
+
+    def test_random(self):
+        space = {"learning_rate": {"low": 1e-4, "high": 1e-1, "log": True}, "batch_size": {"low": 16, "high": 64}}
+        trials = expand_search_space(space, strategy="random", n_trials=20, seed=0)
+        self.assertEqual(len(trials), 20)
+        self.assertTrue(all(1e-4 <= t["learning_rate"] <= 1e-1 for t in trials))
+        self.assertTrue(all(isinstance(t["batch_size"], int) for t in trials))
+        self.assertEqual(trials, expand_search_space(space, strategy="random", n_trials=20, seed=0))
+
+    def test_invalid(self):
+        for space, strategy in (
+            ({"dropout": [0.1]}, "grid"),
+            ({"batch_size": []}, "grid"),
+            ({"batch_size": {"low": 16, "high": 64}}, "grid"),
+            ({"batch_size": [16]}, "bayesian"),
+            ({"batch_size": [16]}, "random"),
+        ):
+            with self.assertRaises(ValueError):
+                expand_search_space(space, strategy=strategy)
+
+    def test_leaderboard_order(self):
+        results = [
+            {"status": "pruned", "val_loss": 0.1},
+            {"status": "completed", "val_loss": 0.5},
+            {"status": "failed", "val_loss": None},
+            {"status": "completed", "val_loss": 0.2},
+        ]
+        self.assertEqual(
+            [(r["status"], r["val_loss"]) for r in leaderboard(results)],
+            [("completed", 0.2), ("completed", 0.5), ("pruned", 0.1), ("failed", None)],
+        )
+
+
+class TestRunSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        data_file = os.path.join(self.work_dir, "data.pkl")
+        X = np.random.rand(80, 5)
+        with open(data_file, "wb") as f:
+            pickle.dump({"X": X, "y": X.sum(axis=1)}, f)
+        self.split_dir = os.path.join(self.work_dir, "split")
+        os.makedirs(self.split_dir)
+        prepare_split(data_file, self.split_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_trials_share_split_and_produce_leaderboard(self):
+        trials = expand_search_space({"hidden_layers": [[4], [8]], "batch_size": [16]})
+        boards = []
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            board = run_sweep(
+                executor, self.split_dir, os.path.join(self.work_dir, "trials"), trials, max_epochs=2,
+                on_result=boards.append
+            )
+
+        self.assertEqual([len(b) for b in boards], [1, 2])
+        self.assertEqual(sorted(r["trial"] for r in board), [0, 1])
+        for result in board:
+            self.assertEqual(result["status"], "completed")
+            self.assertGreater(result["inference_latency_ms"], 0)
+            self.assertEqual(result["epochs"], 2)
+            for path in result["files"].values():
+                self.assertTrue(os.path.exists(path))
+        self.assertLessEqual(board[0]["val_loss"], board[1]["val_loss"])
+
+    def test_hopeless_trials_are_pruned(self):
+        best_loss = SimpleNamespace(value=1e-12)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            board = run_sweep(
+                executor, self.split_dir, os.path.join(self.work_dir, "trials"), [{"hidden_layers": [4]}],
+                max_epochs=5, prune_after=1, best_loss=best_loss
+            )
+
+        self.assertEqual(board[0]["status"], "pruned")
+        self.assertEqual(board[0]["epochs"], 1)
+        self.assertEqual(board[0]["files"], {})
+        self.assertEqual(best_loss.value, 1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,17 @@
 import os
 import sys
+import time
 import unittest
 from fastapi.testclient import TestClient
 
 # Add backend to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from main import app, models, loaded_data, training_state
+import numpy as np
+
+from fivedreg.data import Scaler
+from fivedreg.inference import NumpyMLP
+from main import app, models, loaded_data, training_state, job_manager, run_batch_prediction, warm_up_model
 
 client = TestClient(app)
 
@@ -26,6 +31,47 @@ class TestSystemOps(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {"status": "healthy"})
 
+    def test_readiness_without_model(self):
+        """Test the readiness check fails while no model is in service."""
+        response = client.get("/ready")
+        self.assertEqual(response.status_code, 503)
+
+    def test_startup_preloads_saved_model(self):
+        """Test that startup loads the saved model so the app becomes ready."""
+        with TestClient(app) as startup_client:
+            # Loading happens in the background, so poll the readiness check
+            deadline = time.time() + 60
+            while startup_client.get("/ready").status_code != 200 and time.time() < deadline:
+                time.sleep(0.1)
+            self.assertEqual(startup_client.get("/ready").status_code, 200)
+            self.assertIsNotNone(models.get("my_nn_model"))
+
+    def test_warm_up_model_batch_sizes(self):
+        """Test warm-up runs a forward pass at each configured batch size."""
+        class CountingModel:
+            def __init__(self):
+                self.calls = []
+
+            def predict(self, X, batch_size=None):
+                self.calls.append(X.shape[0])
+                return np.zeros(X.shape[0])
+
+        model = CountingModel()
+        warm_up_model(model, batch_sizes=[1, 8])
+        self.assertEqual(model.calls, [1, 8])
+
+        # Ensembles also warm up the per-member predictions used for the spread
+        class CountingEnsemble(CountingModel):
+            n_members = 3
+
+            def predict_members(self, X, batch_size=None):
+                self.calls.append(("members", X.shape[0]))
+                return np.zeros((X.shape[0], self.n_members))
+
+        model = CountingEnsemble()
+        warm_up_model(model, batch_sizes=[1, 8])
+        self.assertEqual(model.calls, [1, ("members", 1), 8, ("members", 8)])
+
     def test_status_initial(self):
         """Test status endpoint returns correct initial state."""
         response = client.get("/status")
@@ -80,5 +126,309 @@ class TestSystemOps(unittest.TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertIn("Expected 5 features", response.json()["detail"])
 
+    def test_predict_batch_no_model_error(self):
+        """Test batch predict endpoint returns 503 when no model is loaded."""
+        payload = {"feature_matrix": [[0.1, 0.2, 0.3, 0.4, 0.5]]}
+        response = client.post("/predict/batch", json=payload)
+        self.assertEqual(response.status_code, 503)
+
+    def test_predict_batch_invalid_input_shape(self):
+        """Test batch predict endpoint validates the matrix shape."""
+        models["my_nn_model"] = "dummy_model_for_validation"
+
+        for matrix in ([[0.1, 0.2, 0.3, 0.4]], [[0.1, 0.2, 0.3, 0.4, 0.5], [0.1]], []):
+            response = client.post("/predict/batch", json={"feature_matrix": matrix})
+            self.assertEqual(response.status_code, 400)
+
+    def test_run_batch_prediction_chunks(self):
+        """Test that batch prediction makes one model call per chunk."""
+        class CountingModel:
+            def __init__(self):
+                self.calls = []
+
+            def predict(self, X, batch_size=None):
+                self.calls.append(X.shape[0])
+                return np.zeros(X.shape[0])
+
+        model = CountingModel()
+        predictions = run_batch_prediction(model, np.random.rand(5, 5), chunk_size=2)
+        self.assertEqual(model.calls, [2, 2, 1])
+        self.assertEqual(predictions.shape, (5,))
+
+    def test_predict_batch_numpy_engine(self):
+        """Test the NumPy engine is served on raw features without rescaling."""
+        models["my_nn_model"] = NumpyMLP([(np.ones((5, 1)), np.zeros(1), "linear")])
+
+        payload = {"feature_matrix": [[1, 2, 3, 4, 5], [0, 0, 0, 0, 1]]}
+        response = client.post("/predict/batch", json=payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["predictions"], [15.0, 1.0])
+
+    def test_predict_batch_uses_resident_scaler(self):
+        """Test predictions are scaled with the scaler kept on the model."""
+        class FirstFeatureModel:
+            scaler = Scaler().from_dict({"mean": [1.0] * 5, "std": [2.0] * 5})
+
+            def predict(self, X, batch_size=None):
+                return X[:, 0]
+
+        models["my_nn_model"] = FirstFeatureModel()
+
+        response = client.post("/predict/batch", json={"feature_matrix": [[5, 0, 0, 0, 0]]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["predictions"], [2.0])
+
+    def test_predict_batch_binary_formats(self):
+        """Test raw float32 and .npy bodies are decoded and answered in kind."""
+        import io
+
+        models["my_nn_model"] = NumpyMLP([(np.ones((5, 1)), np.zeros(1), "linear")])
+        X = np.arange(10, dtype=np.float32).reshape(2, 5)
+
+        response = client.post(
+            "/predict/batch/binary",
+            content=X.tobytes(),
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        self.assertEqual(response.status_code, 200)
+        np.testing.assert_array_equal(np.frombuffer(response.content, dtype=np.float32), [10, 35])
+
+        buffer = io.BytesIO()
+        np.save(buffer, X.astype(np.float64))
+        response = client.post(
+            "/predict/batch/binary?dtype=float64",
+            content=buffer.getvalue(),
+            headers={"Content-Type": "application/x-npy"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-npy")
+        np.testing.assert_array_equal(np.load(io.BytesIO(response.content)), [10, 35])
+
+    def test_predict_batch_binary_invalid_body(self):
+        """Test malformed binary bodies are rejected."""
+        models["my_nn_model"] = "dummy_model_for_validation"
+
+        response = client.post(
+            "/predict/batch/binary",
+            content=np.zeros(7, dtype=np.float32).tobytes(),
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = client.post(
+            "/predict/batch/binary", content=b"1,2,3,4,5", headers={"Content-Type": "text/csv"}
+        )
+        self.assertEqual(response.status_code, 415)
+
+    def test_predict_file_streams_chunks(self):
+        """Test an uploaded .npy file is scored and streamed back chunk by chunk."""
+        import io
+        import json
+
+        models["my_nn_model"] = NumpyMLP([(np.ones((5, 1)), np.zeros(1), "linear")])
+        X = np.arange(35, dtype=np.float64).reshape(7, 5)
+        buffer = io.BytesIO()
+        np.save(buffer, X)
+
+        response = client.post(
+            "/predict/file?chunk_size=3",
+            files={"file": ("features.npy", buffer.getvalue(), "application/octet-stream")},
+        )
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([line["start"] for line in lines], [0, 3, 6])
+        predictions = [p for line in lines for p in line["predictions"]]
+        np.testing.assert_allclose(predictions, X.sum(axis=1))
+
+        response = client.post(
+            "/predict/file?chunk_size=3&format=binary",
+            files={"file": ("features.npy", buffer.getvalue(), "application/octet-stream")},
+        )
+        self.assertEqual(response.status_code, 200)
+        np.testing.assert_allclose(np.frombuffer(response.content, dtype=np.float32), X.sum(axis=1))
+
+    def test_predict_file_rejects_bad_file(self):
+        """Test unsupported feature files are rejected before streaming starts."""
+        models["my_nn_model"] = "dummy_model_for_validation"
+        response = client.post(
+            "/predict/file", files={"file": ("features.txt", b"hello", "text/plain")}
+        )
+        self.assertEqual(response.status_code, 400)
+
+        # Pickles are rejected unless PREDICT_FILE_ALLOW_PICKLE is set
+        import pickle
+        response = client.post(
+            "/predict/file",
+            files={"file": ("features.pkl", pickle.dumps(np.zeros((2, 5))), "application/octet-stream")},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_predict_cache_hits_and_invalidation(self):
+        """Test repeated /predict calls are cached and dropped when the model changes."""
+        class CountingModel:
+            scaler = None
+
+            def __init__(self, value):
+                self.value = value
+                self.rows = 0
+
+            def predict(self, X, batch_size=None):
+                self.rows += X.shape[0]
+                return np.full(X.shape[0], self.value)
+
+        payload = {"feature_vector": [0.1, 0.2, 0.3, 0.4, 0.5]}
+        models["my_nn_model"] = first = CountingModel(1.0)
+        self.assertEqual(client.post("/predict", json=payload).json()["prediction"], 1.0)
+        self.assertEqual(client.post("/predict", json=payload).json()["prediction"], 1.0)
+        self.assertEqual(first.rows, 1)
+        self.assertGreaterEqual(client.get("/metrics").json()["prediction_cache"]["hits"], 1)
+
+        models["my_nn_model"] = second = CountingModel(2.0)
+        self.assertEqual(client.post("/predict", json=payload).json()["prediction"], 2.0)
+        self.assertEqual(second.rows, 1)
+
+    def test_predict_slice_grid_and_memoization(self):
+        """Test a 2D slice is evaluated server-side and memoized per model."""
+        engine = NumpyMLP([(np.ones((5, 1)), np.zeros(1), "linear")])
+        calls = []
+        original_predict = engine.predict
+        engine.predict = lambda X, batch_size=None: calls.append(len(X)) or original_predict(X)
+        models["my_nn_model"] = engine
+
+        payload = {
+            "fixed": [1, 9, 1, 1, 1],
+            "axes": [
+                {"index": 0, "start": 0, "stop": 1, "num": 2},
+                {"index": 1, "start": 0, "stop": 2, "num": 3}
+            ]
+        }
+        response = client.post("/predict/slice", json=payload)
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result["shape"], [2, 3])
+        self.assertEqual(result["axes"], [[0, 1], [0, 1, 2]])
+        self.assertEqual(result["values"], [[3, 4, 5], [4, 5, 6]])
+        self.assertEqual(calls, [6])
+
+        # Same slice with a different value on a swept axis is served from the memo
+        payload["fixed"][1] = 0
+        self.assertEqual(client.post("/predict/slice", json=payload).json(), result)
+        self.assertEqual(calls, [6])
+
+    def test_predict_slice_invalid_spec(self):
+        """Test invalid slice specifications are rejected."""
+        models["my_nn_model"] = "dummy_model_for_validation"
+        axis = {"index": 0, "start": 0, "stop": 1, "num": 5}
+        for payload in (
+            {"fixed": [0, 0, 0, 0], "axes": [axis]},
+            {"fixed": [0, 0, 0, 0, 0], "axes": []},
+            {"fixed": [0, 0, 0, 0, 0], "axes": [axis, axis]},
+            {"fixed": [0, 0, 0, 0, 0], "axes": [dict(axis, index=5)]},
+            {"fixed": [0, 0, 0, 0, 0], "axes": [dict(axis, num=0)]},
+        ):
+            response = client.post("/predict/slice", json=payload)
+            self.assertEqual(response.status_code, 400)
+
+    def test_predict_unknown_version(self):
+        """Test pinning an unknown model version returns 404."""
+        payload = {"feature_vector": [0.1, 0.2, 0.3, 0.4, 0.5]}
+        response = client.post("/predict?version=does-not-exist", json=payload)
+        self.assertEqual(response.status_code, 404)
+
+        response = client.post("/models/does-not-exist/promote")
+        self.assertEqual(response.status_code, 404)
+    def test_predict_ensemble_spread(self):
+        """Test ensembles report the mean and spread of their members."""
+        # Member k predicts (k + 1) * sum(features)
+        kernel = np.stack([np.full((5, 1), k + 1.0) for k in range(3)])
+        models["my_nn_model"] = NumpyMLP([(kernel, np.zeros((3, 1)), "linear")])
+
+        response = client.post("/predict", json={"feature_vector": [1, 0, 0, 0, 0]})
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(response.json()["prediction"], 2.0, places=5)
+        self.assertAlmostEqual(response.json()["prediction_std"], np.std([1, 2, 3]), places=5)
+
+        response = client.post("/predict/batch", json={"feature_matrix": [[1, 0, 0, 0, 0], [0, 2, 0, 0, 0]]})
+        self.assertEqual(response.status_code, 200)
+        np.testing.assert_allclose(response.json()["predictions"], [2.0, 4.0], rtol=1e-6)
+        np.testing.assert_allclose(response.json()["prediction_std"], np.std([1, 2, 3]) * np.array([1, 2]), rtol=1e-6)
+
+        models["my_nn_model"] = NumpyMLP([(np.ones((5, 1)), np.zeros(1), "linear")])
+        response = client.post("/predict", json={"feature_vector": [1, 0, 0, 0, 0]})
+        self.assertIsNone(response.json()["prediction_std"])
+
+    def test_broken_pool_replaced_once(self):
+        """Test a second job seeing the same broken pool does not stop its replacement."""
+        import main
+
+        broken = main.get_training_executor()
+        main.shutdown_training_executor(keep_manager=True, executor=broken)
+        replacement = main.get_training_executor()
+        self.assertIsNot(replacement, broken)
+        main.shutdown_training_executor(keep_manager=True, executor=broken)
+        self.assertIs(main.training_executor, replacement)
+        main.shutdown_training_executor(keep_manager=True, executor=replacement)
+        self.assertIsNone(main.training_executor)
+
+    def test_unknown_job(self):
+        """Test querying or cancelling an unknown job returns 404."""
+        self.assertEqual(client.get("/jobs/does-not-exist").status_code, 404)
+        self.assertEqual(client.post("/jobs/does-not-exist/cancel").status_code, 404)
+
+    def test_fine_tune_and_resume_validation(self):
+        """Test fine-tuning needs a published model and resuming needs a checkpoint."""
+        from main import model_registry, serving_state
+
+        version = serving_state["version"]
+        serving_state["version"] = None
+        try:
+            if model_registry.active_version() is None:
+                response = client.post("/train", json={"fine_tune": True})
+                self.assertEqual(response.status_code, 400)
+            response = client.post("/train", json={"fine_tune": True, "base_version": "does-not-exist"})
+            self.assertEqual(response.status_code, 404)
+        finally:
+            serving_state["version"] = version
+
+        response = client.post("/train", json={"resume_job_id": "does-not-exist"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_sweep_invalid_search_space(self):
+        """Test /sweep rejects invalid or oversized search spaces."""
+        for payload in (
+            {"search_space": {"dropout": [0.1]}},
+            {"search_space": {"batch_size": [16]}, "strategy": "random"},
+            {"search_space": {"batch_size": list(range(1, 1000))}},
+        ):
+            response = client.post("/sweep", json=payload)
+            self.assertEqual(response.status_code, 400)
+
+    def test_train_invalid_backend(self):
+        """Test /train rejects unknown backends, bad backend parameters and network-only options."""
+        for payload in (
+            {"backend": "gaussian_process"},
+            {"backend": "knn", "backend_params": {"neighbours": 3}},
+            {"backend": "ridge", "n_members": 4},
+            {"backend": "rbf", "fine_tune": True},
+        ):
+            response = client.post("/train", json=payload)
+            self.assertEqual(response.status_code, 400)
+
+    def test_cv_invalid_config(self):
+        """Test /cv rejects out-of-range fold and ensemble sizes."""
+        for payload in ({"n_splits": 1}, {"n_splits": 1000}, {"n_members": 0}):
+            response = client.post("/cv", json=payload)
+            self.assertEqual(response.status_code, 400)
+
+    def test_train_rejected_when_queue_full(self):
+        """Test /train answers 429 when no more jobs may be queued."""
+        max_queued = job_manager.max_queued
+        job_manager.max_queued = 0
+        try:
+            response = client.post("/train", json={"epochs": 1})
+        finally:
+            job_manager.max_queued = max_queued
+        self.assertEqual(response.status_code, 429)
+
 if __name__ == "__main__":
     unittest.main()
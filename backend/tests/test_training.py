@@ -0,0 +1,145 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from fivedreg.surrogates import load_surrogate
+from fivedreg.training import (
+    SCALER_ARTIFACT, SURROGATE_ARTIFACT, has_checkpoint, load_checkpoint, parse_cpu_list, train_fivednet,
+    train_surrogate
+)
+
+
+class TestTraining(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.work_dir, "data.pkl")
+        with open(self.data_file, "wb") as f:
+            pickle.dump({"X": np.random.rand(60, 5), "y": np.random.rand(60)}, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def test_parse_cpu_list(self):
+        self.assertEqual(parse_cpu_list("0-2,5"), {0, 1, 2, 5})
+        self.assertEqual(parse_cpu_list(""), set())
+
+    def test_train_fivednet_writes_artifacts(self):
+        import queue
+
+        progress = queue.Queue()
+        result = train_fivednet(self.data_file, self.work_dir, [4], 2, 0.01, progress_queue=progress)
+
+        for path in result["files"].values():
+            self.assertTrue(os.path.exists(path))
+        self.assertIsInstance(result["final_loss"], float)
+        epochs = [progress.get_nowait()[0] for _ in range(progress.qsize())]
+        self.assertEqual(epochs, [0, 1])
+        self.assertFalse(result["cancelled"])
+        self.assertEqual(result["backend"], "fivednet")
+        self.assertIsInstance(result["val_loss"], float)
+        self.assertGreater(result["inference_latency_ms"], 0)
+
+    def test_train_surrogate_writes_artifacts(self):
+        result = train_surrogate(self.data_file, self.work_dir, "knn", {"k": 3})
+
+        self.assertFalse(result["cancelled"])
+        self.assertEqual(result["backend"], "knn")
+        self.assertEqual(set(result["files"]), {SURROGATE_ARTIFACT, SCALER_ARTIFACT})
+        self.assertIsInstance(result["val_loss"], float)
+        model = load_surrogate(result["files"][SURROGATE_ARTIFACT])
+        self.assertEqual(model.k, 3)
+        self.assertIsNotNone(model.scaler)
+
+    def test_training_uses_preprocessing_cache(self):
+        from fivedreg.preprocessing import PreprocessingCache
+
+        cache = PreprocessingCache(os.path.join(self.work_dir, "cache"))
+        first = train_surrogate(self.data_file, self.work_dir, "ridge", preprocessing_cache=cache)
+        second = train_surrogate(self.data_file, self.work_dir, "ridge", preprocessing_cache=cache)
+        self.assertEqual(len(cache.entries()), 1)
+        self.assertAlmostEqual(first["val_loss"], second["val_loss"])
+
+        # The network prepares float32 arrays, a separate entry
+        train_fivednet(self.data_file, self.work_dir, [4], 1, 0.01, preprocessing_cache=cache)
+        self.assertEqual(len(cache.entries()), 2)
+
+    def test_checkpoint_and_resume(self):
+        import queue
+
+        first_dir = os.path.join(self.work_dir, "first")
+        checkpoint_dir = os.path.join(self.work_dir, "checkpoint")
+        os.makedirs(first_dir)
+        os.makedirs(checkpoint_dir)
+        train_fivednet(self.data_file, first_dir, [4], 2, 0.01, checkpoint_dir=checkpoint_dir, checkpoint_every=1)
+
+        self.assertTrue(has_checkpoint(checkpoint_dir))
+        _, state = load_checkpoint(checkpoint_dir)
+        self.assertEqual(state["epoch"], 2)
+        self.assertEqual([entry["epoch"] for entry in state["loss_history"]], [1, 2])
+
+        second_dir = os.path.join(self.work_dir, "second")
+        os.makedirs(second_dir)
+        progress = queue.Queue()
+        result = train_fivednet(
+            self.data_file, second_dir, [8], 3, 0.01, progress_queue=progress, resume_from=checkpoint_dir
+        )
+
+        # Earlier epochs are replayed, then training continues at epoch 3 with the checkpointed architecture
+        self.assertEqual(result["initial_epoch"], 2)
+        self.assertEqual(result["hidden_layers"], [4])
+        epochs = [progress.get_nowait()[0] for _ in range(progress.qsize())]
+        self.assertEqual(epochs, [0, 1, 2])
+
+    def test_fine_tune_reuses_base_scaler(self):
+        from fivedreg.data import Scaler
+
+        base_dir = os.path.join(self.work_dir, "base")
+        tuned_dir = os.path.join(self.work_dir, "tuned")
+        os.makedirs(base_dir)
+        os.makedirs(tuned_dir)
+        base = train_fivednet(self.data_file, base_dir, [4, 2], 1, 0.01)
+
+        with open(self.data_file, "wb") as f:
+            pickle.dump({"X": np.random.rand(60, 5) * 10, "y": np.random.rand(60)}, f)
+        tuned = train_fivednet(self.data_file, tuned_dir, [16], 1, 0.001, base_model_path=base["files"]["model.keras"])
+
+        self.assertEqual(tuned["hidden_layers"], [4, 2])
+        base_scaler = Scaler()
+        base_scaler.load(base["files"][SCALER_ARTIFACT])
+        tuned_scaler = Scaler()
+        tuned_scaler.load(tuned["files"][SCALER_ARTIFACT])
+        np.testing.assert_allclose(tuned_scaler.mean, base_scaler.mean)
+        np.testing.assert_allclose(tuned_scaler.std, base_scaler.std)
+
+    def test_train_fivednet_cancelled(self):
+        import threading
+
+        cancel_event = threading.Event()
+        cancel_event.set()
+        result = train_fivednet(self.data_file, self.work_dir, [4], 2, 0.01, cancel_event=cancel_event)
+
+        self.assertTrue(result["cancelled"])
+        self.assertEqual(result["files"], {})
+        self.assertEqual(os.listdir(self.work_dir), ["data.pkl"])
+
+    def test_cancel_callback_stops_at_batch_boundary(self):
+        import tensorflow as tf
+        from fivedreg.model import CancelCallback, FiveDNet
+
+        batches = []
+        count = tf.keras.callbacks.LambdaCallback(on_train_batch_end=lambda batch, logs: batches.append(batch))
+        cancel = CancelCallback(lambda: len(batches) >= 3, check_interval=0)
+        model = FiveDNet(hidden_layers=[4], max_epochs=5, batch_size=4, verbose=0)
+        model.fit(np.random.rand(60, 5), np.random.rand(60), callbacks=[count, cancel])
+
+        self.assertTrue(cancel.cancelled)
+        self.assertEqual(len(batches), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
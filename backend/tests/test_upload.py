@@ -2,7 +2,7 @@ import os
 import pickle
 import numpy as np
 from fastapi.testclient import TestClient
-from main import app, loaded_data
+from main import app, dataset_store, loaded_data
 
 client = TestClient(app)
 
@@ -41,8 +41,87 @@ def test_upload_endpoint():
         # Cleanup
         if os.path.exists(test_file):
             os.remove(test_file)
-        if os.path.exists("data/test_upload.pkl"):
-            os.remove("data/test_upload.pkl")
+        client.delete("/datasets/test_upload.pkl")
+
+def test_upload_csv_keeps_file_for_training():
+    X = np.random.rand(10, 5)
+    content = "x0,x1,x2,x3,x4,y\n" + "".join(
+        ",".join(str(v) for v in row) + f",{row.sum()}\n" for row in X
+    )
+    try:
+        response = client.post(
+            "/upload",
+            files={"file": ("test_upload.csv", content.encode(), "text/csv")}
+        )
+        assert response.status_code == 200
+        assert response.json()["data_shape"]["X"] == [10, 5]
+        np.testing.assert_allclose(loaded_data["y"], X.sum(axis=1))
+        # Training memory-maps the arrays cached in the store rather than a copy of the data
+        assert loaded_data["path"] == dataset_store.path("test_upload.csv")
+        assert isinstance(loaded_data["X"], np.memmap)
+    finally:
+        client.delete("/datasets/test_upload.csv")
+
+def test_upload_deduplicates_and_selects_datasets():
+    content_a = pickle.dumps({"X": np.random.rand(10, 5), "y": np.random.rand(10)})
+    content_b = pickle.dumps({"X": np.random.rand(20, 5), "y": np.random.rand(20)})
+    try:
+        first = client.post("/upload", files={"file": ("test_dedup.pkl", content_a)}).json()
+        assert not first["deduplicated"]
+        # The same bytes under another name are stored once
+        second = client.post("/upload", files={"file": ("other.pkl", content_a)}, data={"name": "test_copy"}).json()
+        assert second["deduplicated"]
+        assert second["sha256"] == first["sha256"]
+        assert second["dataset"] == "test_copy"
+        
+        # Uploading new content under a used name keeps both versions
+        third = client.post("/upload", files={"file": ("test_dedup.pkl", content_b)}).json()
+        assert third["sha256"] != first["sha256"]
+        assert loaded_data["X"].shape == (20, 5)
+        names = {d["name"]: d["sha256"] for d in client.get("/datasets").json()["datasets"]}
+        assert names["test_dedup.pkl"] == third["sha256"]
+        assert names["test_copy"] == first["sha256"]
+        
+        response = client.post("/datasets/test_copy/select")
+        assert response.status_code == 200
+        assert response.json()["n_samples"] == 10
+        assert loaded_data["X"].shape == (10, 5)
+        assert client.get("/status").json()["dataset"] == "test_copy"
+        assert client.post("/datasets/missing/select").status_code == 404
+        
+        # Deleting the last name of a content removes it from the store
+        assert client.delete("/datasets/test_copy").status_code == 200
+        assert loaded_data["X"] is None
+        assert not os.path.exists(os.path.join(dataset_store.root_dir, first["sha256"]))
+        assert client.delete("/datasets/test_copy").status_code == 404
+    finally:
+        client.delete("/datasets/test_dedup.pkl")
+        client.delete("/datasets/test_copy")
+        if os.path.exists("data/other.pkl"):
+            os.remove("data/other.pkl")
+
+def test_upload_rejects_invalid_datasets():
+    response = client.post("/upload", files={"file": ("test_upload.txt", b"data")})
+    assert response.status_code == 400
+    response = client.post("/upload", files={"file": ("test_upload.pkl", b"not a pickle")})
+    assert response.status_code == 400
+    response = client.post(
+        "/upload", files={"file": ("test_upload.csv", b"x0,y\n1,2\n")}, data={"name": ".hidden"}
+    )
+    assert response.status_code == 400
+
+def test_upload_keeps_bundled_datasets():
+    with open("data/dummy_dataset.pkl", "rb") as f:
+        original = f.read()
+    content = pickle.dumps({"X": np.random.rand(10, 5), "y": np.random.rand(10)})
+    try:
+        response = client.post("/upload", files={"file": ("dummy_dataset.pkl", content)}, data={"name": "test_bundled"})
+        assert response.status_code == 200
+        assert loaded_data["X"].shape == (10, 5)
+        with open("data/dummy_dataset.pkl", "rb") as f:
+            assert f.read() == original
+    finally:
+        client.delete("/datasets/test_bundled")
 
 if __name__ == "__main__":
     test_upload_endpoint()
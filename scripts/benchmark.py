@@ -1,7 +1,11 @@
 import sys
 import os
+import argparse
+import multiprocessing
+import resource
 import time
 import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
 from sklearn.metrics import mean_squared_error, r2_score
@@ -10,7 +14,7 @@ from sklearn.metrics import mean_squared_error, r2_score
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend')))
 
 from fivedreg.model import FiveDNet
-from fivedreg.data import split_data, standardize_data
+from fivedreg.data import prepare_dataset, split_data, standardize_data
 
 def generate_synthetic_data(n_samples: int):
     """Generates synthetic 5D data for benchmarking."""
@@ -39,7 +43,7 @@ def profile_training(n_samples: int):
     tracemalloc.start()
     start_time = time.time()
     
-    model.fit(X_train_scaled, y_train, validation_split=0.2)
+    model.fit(X_train_scaled, y_train, validation_data=(X_val_scaled, y_val))
     
     end_time = time.time()
     current, peak = tracemalloc.get_traced_memory()
@@ -92,6 +96,115 @@ def profile_prediction(model, n_samples=1000):
     
     return pred_time, pred_peak_mb
 
+# Training/inference modes compared by --compare-modes, as FiveDNet keyword arguments
+MODES = {
+    "baseline": {},
+    "xla": {"jit_compile": True},
+    "bf16": {"precision": "mixed_bfloat16"},
+    "steps32": {"steps_per_execution": 32},
+    "xla+steps32": {"jit_compile": True, "steps_per_execution": 32},
+    "xla+bf16+steps32": {"jit_compile": True, "precision": "mixed_bfloat16", "steps_per_execution": 32},
+}
+
+def profile_mode(mode: str, n_samples: int, max_epochs: int):
+    """
+    Trains and evaluates one mode. Runs in a fresh process, so the peak RSS
+    (which, unlike tracemalloc, includes TensorFlow's own allocations) belongs to this mode alone.
+    """
+    X, y = generate_synthetic_data(n_samples)
+    X_train, y_train, X_val, y_val, X_test, y_test = split_data(X, y)
+    X_train_scaled, X_val_scaled, X_test_scaled = standardize_data(X_train, X_val, X_test, save_path=None)
+    
+    # A fixed number of epochs, so every mode does the same amount of work
+    model = FiveDNet(hidden_layers=[64, 32, 16], max_epochs=max_epochs, patience=max_epochs, verbose=0,
+                     seed=42, **MODES[mode])
+    start_time = time.perf_counter()
+    model.fit(X_train_scaled, y_train, validation_data=(X_val_scaled, y_val))
+    training_time = time.perf_counter() - start_time
+    
+    # The first call traces (and with XLA compiles) the predict step; time the second one
+    model.predict(X_test_scaled, batch_size=1024)
+    start_time = time.perf_counter()
+    y_pred = model.predict(X_test_scaled, batch_size=1024)
+    prediction_time = time.perf_counter() - start_time
+    
+    return {
+        "mode": mode,
+        "samples": n_samples,
+        "training_time_sec": training_time,
+        "epoch_time_ms": training_time / max_epochs * 1000,
+        "prediction_time_sec": prediction_time,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "mse": mean_squared_error(y_test, y_pred),
+        "r2": r2_score(y_test, y_pred),
+    }
+
+def compare_modes(dataset_sizes, max_epochs=20, n_iterations=3):
+    """
+    Compares XLA, bfloat16 and steps_per_execution against the default float32 model
+    on training time, peak memory and test MSE/R².
+    """
+    results = []
+    for size in dataset_sizes:
+        for mode in MODES:
+            print(f"\n=== Mode {mode}, size {size} ({n_iterations} iterations) ===")
+            iteration_results = []
+            for i in range(n_iterations):
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                    res = executor.submit(profile_mode, mode, size, max_epochs).result()
+                print(f"  Iteration {i+1}/{n_iterations}: {res['training_time_sec']:.2f} s, MSE {res['mse']:.5f}")
+                iteration_results.append(res)
+            
+            avg_res = {"mode": mode, "samples": size}
+            for key in ("training_time_sec", "epoch_time_ms", "prediction_time_sec", "peak_rss_mb", "mse", "r2"):
+                avg_res[key] = np.mean([r[key] for r in iteration_results])
+            avg_res["training_time_std"] = np.std([r["training_time_sec"] for r in iteration_results])
+            results.append(avg_res)
+    
+    df = pd.DataFrame(results)
+    baseline = df[df["mode"] == "baseline"].set_index("samples")["training_time_sec"]
+    df["speedup"] = df["samples"].map(baseline) / df["training_time_sec"]
+    print("\n--- Mode comparison ---")
+    print(df.to_string(index=False))
+    
+    df.to_csv("benchmark_modes.csv", index=False)
+    print("\nResults saved to benchmark_modes.csv")
+    return df
+
+def compare_preprocessing(dataset_sizes):
+    """
+    Compares the peak memory and time of split_data + standardize_data with
+    prepare_dataset, on float64 data of each size.
+    """
+    results = []
+    for size in dataset_sizes:
+        X, y = generate_synthetic_data(size)
+        data_mb = (X.nbytes + y.nbytes) / 1024 / 1024
+        
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        X_train, y_train, X_val, y_val, X_test, y_test = split_data(X, y)
+        standardize_data(X_train, X_val, X_test, save_path=None)
+        legacy_time = time.perf_counter() - start_time
+        legacy_peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+        del X_train, y_train, X_val, y_val, X_test, y_test
+        results.append({"pipeline": "split_data+standardize_data", "samples": size, "input_mb": data_mb,
+                        "time_sec": legacy_time, "peak_memory_mb": legacy_peak})
+        
+        for dtype in (np.float64, np.float32):
+            start_time = time.perf_counter()
+            data = prepare_dataset(X, y, dtype=dtype, report_memory=True)
+            results.append({"pipeline": f"prepare_dataset({np.dtype(dtype).name})", "samples": size,
+                            "input_mb": data_mb, "time_sec": time.perf_counter() - start_time,
+                            "peak_memory_mb": data["peak_mb"]})
+            del data
+    
+    df = pd.DataFrame(results)
+    print("\n--- Preprocessing comparison ---")
+    print(df.to_string(index=False))
+    return df
+
 def main():
     dataset_sizes = [1000, 5000, 10000]
     n_iterations = 5
@@ -136,4 +249,19 @@ def main():
     print("\nResults saved to benchmark_results.csv")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Benchmark FiveDNet training and prediction.")
+    parser.add_argument("--compare-modes", action="store_true",
+                        help="Compare XLA, bfloat16 and steps_per_execution instead of dataset sizes.")
+    parser.add_argument("--compare-preprocessing", action="store_true",
+                        help="Compare the memory of split_data + standardize_data with prepare_dataset.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+    
+    if args.compare_modes:
+        compare_modes(args.sizes, max_epochs=args.epochs, n_iterations=args.iterations)
+    elif args.compare_preprocessing:
+        compare_preprocessing(args.sizes)
+    else:
+        main()
@@ -0,0 +1,112 @@
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend'))
+
+
+def measure_import():
+    """Measures the time to import the API module and whether TensorFlow was pulled in."""
+    code = (
+        "import sys, time; t = time.perf_counter(); import main; "
+        "print(time.perf_counter() - t, 'tensorflow' in sys.modules)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(output[-2]), output[-1] == "True"
+
+
+def get_rss_mb(pid: int):
+    """Returns the resident set size of a process in MB (Linux /proc, or psutil if installed)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / 1024 / 1024
+    except ImportError:
+        return float("nan")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_first_health(preload: bool, timeout: float = 120.0):
+    """Starts the API under uvicorn and measures time and RSS at the first /health response."""
+    port = free_port()
+    env = dict(os.environ, PYTHONUNBUFFERED="1", PRELOAD_MODEL="1" if preload else "0")
+    start_time = time.time()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.time() - start_time < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.time() - start_time, get_rss_mb(process.pid)
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError("The API did not answer /health in time.")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API cold start.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--preload", action="store_true",
+                        help="Let the API preload the saved model in the background while measuring.")
+    parser.add_argument("--max-import-seconds", type=float, default=None,
+                        help="Fail if the mean import time exceeds this value.")
+    parser.add_argument("--max-rss-mb", type=float, default=None,
+                        help="Fail if the mean RSS at the first /health response exceeds this value.")
+    args = parser.parse_args()
+
+    import_times, health_times, rss_values = [], [], []
+    for i in range(args.runs):
+        print(f"Run {i + 1}/{args.runs}...")
+        import_time, tf_imported = measure_import()
+        health_time, rss_mb = measure_first_health(args.preload)
+        import_times.append(import_time)
+        health_times.append(health_time)
+        rss_values.append(rss_mb)
+        print(f"  Import: {import_time:.3f}s (TensorFlow imported: {tf_imported})")
+        print(f"  First /health: {health_time:.3f}s, RSS {rss_mb:.1f} MB")
+
+    mean_import = sum(import_times) / len(import_times)
+    mean_health = sum(health_times) / len(health_times)
+    mean_rss = sum(rss_values) / len(rss_values)
+    print("\n--- Summary ---")
+    print(f"Import time: {mean_import:.3f}s")
+    print(f"Time to first /health: {mean_health:.3f}s")
+    print(f"RSS at first /health: {mean_rss:.1f} MB")
+
+    failed = tf_imported
+    if tf_imported:
+        print("FAIL: importing the API loads TensorFlow.")
+    if args.max_import_seconds is not None and mean_import > args.max_import_seconds:
+        print(f"FAIL: import time above {args.max_import_seconds}s.")
+        failed = True
+    if args.max_rss_mb is not None and mean_rss > args.max_rss_mb:
+        print(f"FAIL: RSS above {args.max_rss_mb} MB.")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()